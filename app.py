@@ -7,18 +7,24 @@ st.set_page_config(
     page_icon="📊",
 )
 
+import telemetry
+
+page_span = telemetry.span("page_render_seconds", page="Главная")
+
 from auth import require_auth
 from components.navigation import render_sidebar, find_page_by_part
+from components.profiler import page_run
 
-require_auth()
-render_sidebar()
+with page_run("Главная", page_span):
+    require_auth()
+    render_sidebar()
 
 
-BASE_DIR = Path(__file__).parent
+    BASE_DIR = Path(__file__).parent
 
 
-st.markdown(
-    """
+    st.markdown(
+        """
     <style>
         .main {
             background: #f8fafc;
@@ -118,18 +124,18 @@ st.markdown(
         }
     </style>
     """,
-    unsafe_allow_html=True,
-)
+        unsafe_allow_html=True,
+    )
 
 
-user_name = st.session_state.get("username", "инвестор")
+    user_name = st.session_state.get("username", "инвестор")
 
 
-left, right = st.columns([1.45, 0.85], gap="large")
+    left, right = st.columns([1.45, 0.85], gap="large")
 
-with left:
-    st.markdown(
-        f"""
+    with left:
+        st.markdown(
+            f"""
         <div class="hero">
             <div class="eyebrow">Ваш персональный инвестиционный центр</div>
             <h1>Добро пожаловать, {user_name} 👋</h1>
@@ -140,27 +146,27 @@ with left:
             </p>
         </div>
         """,
-        unsafe_allow_html=True,
-    )
+            unsafe_allow_html=True,
+        )
 
-with right:
-    image_path = BASE_DIR / "data" / "dashboard_hero.png"
+    with right:
+        image_path = BASE_DIR / "data" / "dashboard_hero.png"
 
-    if image_path.exists():
-        st.image(str(image_path), use_container_width=True)
-    else:
-        st.markdown(
-            """
+        if image_path.exists():
+            st.image(str(image_path), use_container_width=True)
+        else:
+            st.markdown(
+                """
             <div class="hero-visual">
                 📊
             </div>
             """,
-            unsafe_allow_html=True,
-        )
+                unsafe_allow_html=True,
+            )
 
 
-st.markdown(
-    """
+    st.markdown(
+        """
     <div class="info-box">
         <h3>Что можно сделать в дашборде?</h3>
         <p>
@@ -170,80 +176,80 @@ st.markdown(
         </p>
     </div>
     """,
-    unsafe_allow_html=True,
-)
-
-
-st.markdown('<div class="section-title">Разделы дашборда</div>', unsafe_allow_html=True)
-st.markdown(
-    '<div class="section-subtitle">Выберите нужный раздел для дальнейшей работы.</div>',
-    unsafe_allow_html=True,
-)
-
+        unsafe_allow_html=True,
+    )
 
-info_page = find_page_by_part("Основная информация")
-analytics_page = find_page_by_part("Углубленная аналитика")
-optimization_page = find_page_by_part("Оптимизация")
-
-
-def render_nav_card(
-    icon: str,
-    title: str,
-    description: str,
-    page: str | None,
-    button_label: str,
-):
-    with st.container(border=True):
-        st.markdown(f'<div class="card-icon">{icon}</div>', unsafe_allow_html=True)
-        st.markdown(f"### {title}")
-        st.write(description)
-
-        if page:
-            st.page_link(
-                page,
-                label=button_label,
-                icon="➡️",
-                use_container_width=True,
-            )
-        else:
-            st.warning("Страница не найдена. Проверьте название файла в папке `pages`.")
 
+    st.markdown('<div class="section-title">Разделы дашборда</div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="section-subtitle">Выберите нужный раздел для дальнейшей работы.</div>',
+        unsafe_allow_html=True,
+    )
 
-col1, col2, col3 = st.columns(3, gap="large")
 
-with col1:
-    render_nav_card(
-        icon="📌",
-        title="Основная информация",
-        description=(
-            "Общая картина портфеля: состав активов, доли инструментов, "
-            "ключевые показатели и базовая информация."
-        ),
-        page=info_page,
-        button_label="Открыть раздел",
-    )
+    info_page = find_page_by_part("Основная информация")
+    analytics_page = find_page_by_part("Углубленная аналитика")
+    optimization_page = find_page_by_part("Оптимизация")
+
+
+    def render_nav_card(
+        icon: str,
+        title: str,
+        description: str,
+        page: str | None,
+        button_label: str,
+    ):
+        with st.container(border=True):
+            st.markdown(f'<div class="card-icon">{icon}</div>', unsafe_allow_html=True)
+            st.markdown(f"### {title}")
+            st.write(description)
+
+            if page:
+                st.page_link(
+                    page,
+                    label=button_label,
+                    icon="➡️",
+                    use_container_width=True,
+                )
+            else:
+                st.warning("Страница не найдена. Проверьте название файла в папке `pages`.")
+
+
+    col1, col2, col3 = st.columns(3, gap="large")
+
+    with col1:
+        render_nav_card(
+            icon="📌",
+            title="Основная информация",
+            description=(
+                "Общая картина портфеля: состав активов, доли инструментов, "
+                "ключевые показатели и базовая информация."
+            ),
+            page=info_page,
+            button_label="Открыть раздел",
+        )
 
-with col2:
-    render_nav_card(
-        icon="📈",
-        title="Углубленная аналитика",
-        description=(
-            "Анализ динамики доходности, сравнение с индексом IMOEX," 
-            "технический анализ ваших акций, "
-            "оценка рисков по Монте-Карло."
-        ),
-        page=analytics_page,
-        button_label="Перейти к аналитике",
-    )
+    with col2:
+        render_nav_card(
+            icon="📈",
+            title="Углубленная аналитика",
+            description=(
+                "Анализ динамики доходности, сравнение с индексом IMOEX," 
+                "технический анализ ваших акций, "
+                "оценка рисков по Монте-Карло."
+            ),
+            page=analytics_page,
+            button_label="Перейти к аналитике",
+        )
 
-with col3:
-    render_nav_card(
-        icon="🚀",
-        title="Оптимизация портфеля",
-        description=(
-            "Инструменты для поиска более эффективного распределения активов "
-            "с учётом риска и доходности."
-        ),
-        page=optimization_page,
-        button_label="Запустить оптимизацию",
-    )
+    with col3:
+        render_nav_card(
+            icon="🚀",
+            title="Оптимизация портфеля",
+            description=(
+                "Инструменты для поиска более эффективного распределения активов "
+                "с учётом риска и доходности."
+            ),
+            page=optimization_page,
+            button_label="Запустить оптимизацию",
+        )
@@ -1,6 +1,9 @@
 # auth.py — с регистрацией
+import os
 import streamlit as st
+from dotenv import load_dotenv
 from db import login, register
+from data.cache import clear_cache
 
 
 def require_auth():
@@ -70,6 +73,31 @@ def require_auth():
 def current_user_id() -> int | None:
     """Возвращает ID авторизованного пользователя или None."""
     return st.session_state.get("user_id")
+
+
+def admin_usernames() -> set[str]:
+    """Логины администраторов: ADMIN_USERS в secrets или .env (через запятую)."""
+    try:
+        raw = st.secrets["ADMIN_USERS"]
+    except Exception:
+        load_dotenv()
+        raw = os.getenv("ADMIN_USERS", "")
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return {name.strip() for name in raw if name.strip()}
+
+
+def is_admin() -> bool:
+    return st.session_state.get("username") in admin_usernames()
+
+
+def require_admin():
+    """Служебные страницы: пускаем только администраторов."""
+    require_auth()
+    if not is_admin():
+        st.error("⛔ Страница доступна только администраторам")
+        st.stop()
+
 def logout_button():
     """Кнопка выхода в сайдбаре"""
     if st.session_state.get("authenticated"):
@@ -81,6 +109,6 @@ def logout_button():
                     st.session_state.pop(key, None)
                 # 2) ВАЖНО: чистим серверный кэш, чтобы данные
                 #    не утекли следующему пользователю
-                st.cache_data.clear()
+                clear_cache()
                 st.rerun()
 
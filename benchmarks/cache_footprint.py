@@ -0,0 +1,105 @@
+# benchmarks/cache_footprint.py
+"""
+Память кэша на одного пользователя: st.cache_data (pickle) против
+Arrow-хранилища из data/cache.py.
+
+Запуск из корня проекта:
+    python -m benchmarks.cache_footprint --users 200 --assets 150
+"""
+import argparse
+import pickle
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from core.cache import to_arrow, from_arrow
+from core.schema import SCHEMAS, apply_schema
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+TYPES  = ['share', 'bond', 'currency']
+
+
+def make_user_frames(n_assets: int, n_years: int, rng) -> dict:
+    """Синтетические кадры одного пользователя в форме ответов API."""
+    names = [f'Эмитент {i} ПАО' for i in range(n_assets)]
+
+    donut_detail = pd.DataFrame({
+        'instrument_type': rng.choice(TYPES, n_assets),
+        'name':            names,
+        'amount':          rng.uniform(1e3, 5e5, n_assets),
+    })
+    top_alltime = pd.DataFrame({
+        'name':          names,
+        'end_yield_pct': rng.normal(5, 20, n_assets),
+        'rank_best':     np.arange(1, n_assets + 1),
+        'rank_worst':    np.arange(n_assets, 0, -1),
+    })
+    monthly_returns = pd.DataFrame({
+        'year':           np.repeat(np.arange(2024 - n_years + 1, 2025), 12),
+        'month_name':     MONTHS * n_years,
+        'monthly_return': rng.normal(1, 4, 12 * n_years),
+    })
+
+    return {
+        "/api/assets/donut_detail":    donut_detail,
+        "/api/assets/top_alltime":     top_alltime,
+        "/api/assets/monthly_returns": monthly_returns,
+    }
+
+
+def measure(frames: dict, typed: bool) -> dict:
+    """Байты в хранилище и байты, выделяемые на одно попадание в кэш."""
+    if typed:
+        frames = {ep: apply_schema(df.copy(), SCHEMAS[ep]) for ep, df in frames.items()}
+
+    pickled    = {ep: pickle.dumps(df) for ep, df in frames.items()}
+    stored_old = sum(len(b) for b in pickled.values())
+
+    tracemalloc.start()
+    for blob in pickled.values():
+        pickle.loads(blob)
+    hit_old = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tables     = {ep: to_arrow(df) for ep, df in frames.items()}
+    stored_new = sum(t.nbytes for t in tables.values())
+
+    tracemalloc.start()
+    for table in tables.values():
+        from_arrow(table)
+    hit_new = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'stored_pickle': stored_old,
+        'hit_pickle':    hit_old,
+        'stored_arrow':  stored_new,
+        'hit_arrow':     hit_new,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users',  type=int, default=100)
+    parser.add_argument('--assets', type=int, default=100)
+    parser.add_argument('--years',  type=int, default=5)
+    parser.add_argument('--seed',   type=int, default=42)
+    args = parser.parse_args()
+
+    rng    = np.random.default_rng(args.seed)
+    frames = make_user_frames(args.assets, args.years, rng)
+
+    for typed in (False, True):
+        m     = measure(frames, typed)
+        label = 'со схемой' if typed else 'без схемы'
+        print(f"── {label} ({args.users} польз.) ──")
+        print(f"  pickle: хранение {m['stored_pickle'] * args.users / 1e6:8.2f} МБ, "
+              f"попадание {m['hit_pickle'] / 1e3:8.1f} КБ/польз.")
+        print(f"  arrow:  хранение {m['stored_arrow'] * args.users / 1e6:8.2f} МБ, "
+              f"попадание {m['hit_arrow'] / 1e3:8.1f} КБ/польз.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/decode.py
+"""
+Декодирование ответов API: стандартный json против core/decode.py
+(orjson, потоковый ijson) на синтетических телах в форме бэкенда.
+
+Для каждого способа — медиана времени и пик памяти Python-аллокаций
+(tracemalloc, отдельным прогоном: под трассировкой время не честное).
+Тело ответа в пик не входит — оно уже скачано до декодирования.
+
+  candles  — {"data": [...]} свечей размером около --mb мегабайт:
+             json + DataFrame (прежний путь ApiClient.get_frame),
+             orjson + DataFrame, ijson по колонкам;
+  backtest — JSON /api/optimization/backtest: json против orjson.
+
+Способ, для которого библиотека не установлена, пропускается.
+
+    python -m benchmarks.decode
+    python -m benchmarks.decode --mb 20 --rounds 5
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import generators as gen
+from core import decode
+from core.schema import get_schema, apply_schema
+
+ENDPOINT = "/api/market/candles/"
+
+
+def _body(df: pd.DataFrame) -> bytes:
+    """Как отдаёт бэкенд: {"data": [записи]} с датами ISO-строками."""
+    return b'{"data": ' + df.to_json(orient="records", date_format="iso").encode() + b'}'
+
+
+def candles_body(mb: float, rng) -> bytes:
+    sample = len(_body(gen.candles(1_000, rng)))
+    bars   = int(mb * 1024 * 1024 / sample * 1_000)
+    return _body(gen.candles(bars, rng))
+
+
+def _json_frame(body: bytes) -> pd.DataFrame:
+    schema = get_schema(ENDPOINT)
+    return apply_schema(pd.DataFrame(json.loads(body).get("data", [])), schema)
+
+
+def _orjson_frame(body: bytes) -> pd.DataFrame:
+    schema = get_schema(ENDPOINT)
+    return apply_schema(pd.DataFrame(decode.orjson.loads(body).get("data", [])), schema)
+
+
+def _ijson_frame(body: bytes) -> pd.DataFrame:
+    schema = get_schema(ENDPOINT)
+    return apply_schema(decode._stream_frame(body, schema), schema)
+
+
+FRAME_METHODS = [
+    ("json + DataFrame",   _json_frame,   True),
+    ("orjson + DataFrame", _orjson_frame, decode.orjson is not None),
+    ("ijson, по колонкам", _ijson_frame,  decode.ijson is not None),
+]
+
+DICT_METHODS = [
+    ("json",   json.loads,   True),
+    ("orjson", decode.loads, decode.orjson is not None),
+]
+
+
+def measure(fn, body: bytes, rounds: int) -> dict:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(body)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"time": statistics.median(times), "peak": peak}
+
+
+def run(name: str, methods: list, body: bytes, rounds: int):
+    print(f"\n{name}: тело {len(body) / 1024 / 1024:.1f} MB")
+    print(f"  {'способ':<20} {'время, с':>10} {'пик, MB':>10}")
+    base = None
+    for label, fn, available in methods:
+        if not available:
+            print(f"  {label:<20} {'—':>10} {'—':>10}  не установлен")
+            continue
+        r    = measure(fn, body, rounds)
+        base = base or r
+        print(f"  {label:<20} {r['time']:10.2f} {r['peak'] / 1024 / 1024:10.1f}"
+              f"  ×{base['time'] / r['time']:.1f} быстрее, "
+              f"×{base['peak'] / max(r['peak'], 1):.1f} меньше памяти", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mb',     type=float, default=100, help="размер тела свечей, MB")
+    parser.add_argument('--years',  type=int,   default=20,  help="длина бэктеста, лет")
+    parser.add_argument('--rounds', type=int,   default=3)
+    parser.add_argument('--seed',   type=int,   default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    run("candles", FRAME_METHODS, candles_body(args.mb, rng), args.rounds)
+    run("backtest", DICT_METHODS,
+        json.dumps(gen.backtest_response(args.years, rng)).encode(), args.rounds)
+
+
+if __name__ == '__main__':
+    main()
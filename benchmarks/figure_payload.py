@@ -0,0 +1,157 @@
+# benchmarks/figure_payload.py
+"""
+Размер фигур Plotly, уходящих в браузер, и время их отрисовки — до и
+после components.charts.optimize_figure (Scattergl, типизированные
+массивы, пустые скрытые трассы) на синтетических данных бенчмарков.
+
+Для каждой фигуры:
+  json, KB    — fig.to_json(), то, что st.plotly_chart отправляет в браузер;
+  to_json, ms — сериализация на сервере;
+  render, ms  — Plotly.newPlot в headless Chromium (нужен playwright:
+                pip install playwright && playwright install chromium;
+                без него колонка пустая).
+
+Объединение трасс Bollinger сделано в самом build_candle_chart и в
+сравнении «до / после» не участвует.
+
+    python -m benchmarks.figure_payload
+    python -m benchmarks.figure_payload --no-browser --rounds 3
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks import generators as gen
+from components import charts
+from core import loaders
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:     # необязательная зависимость
+    sync_playwright = None
+
+FIGI = "BBG004730N88"
+
+_PAGE = """<html><head><meta charset="utf-8"><script>{plotly}</script></head>
+<body><div id="plot" style="width:1200px;height:600px"></div></body></html>"""
+
+_RENDER = """async (spec) => {
+    const fig = JSON.parse(spec);
+    const div = document.getElementById('plot');
+    Plotly.purge(div);
+    const start = performance.now();
+    await Plotly.newPlot(div, fig.data, fig.layout);
+    await new Promise(requestAnimationFrame);
+    return performance.now() - start;
+}"""
+
+
+def _candles(n_bars):
+    def build(rng):
+        client = gen.FakeClient({"/api/market/candles/": gen.candles(n_bars, rng)})
+        df_full, df_display = loaders.candles(client, FIGI, 'ALL')
+        return charts.build_candle_chart(df_full, df_display, "SBER", 'ALL')
+    return build
+
+
+def _frontier(n_assets, n_random):
+    def build(rng):
+        return charts.build_frontier_chart(gen.frontier_response(n_assets, 40, n_random, rng))
+    return build
+
+
+def _backtest(years):
+    def build(rng):
+        return charts.build_backtest_charts(gen.backtest_response(years, rng)["equity_curve"])[0]
+    return build
+
+
+def _portfolio(years):
+    def build(rng):
+        client = gen.FakeClient({"/api/portfolio/metrics": gen.portfolio_history(years, rng)})
+        return charts.build_portfolio_chart(*loaders.portfolio_metrics(client))
+    return build
+
+
+DATASETS = [
+    ("candles[bars=1000]",            _candles(1_000)),
+    ("candles[bars=100000]",          _candles(100_000)),
+    ("frontier[assets=10,rnd=2000]",  _frontier(10, 2_000)),
+    ("frontier[assets=100,rnd=5000]", _frontier(100, 5_000)),
+    ("backtest[years=5]",             _backtest(5)),
+    ("backtest[years=20]",            _backtest(20)),
+    ("portfolio[years=20]",           _portfolio(20)),
+]
+
+
+def build(fn, optimize: bool, seed: int):
+    charts.FIGURE_OPTIMIZE = optimize
+    try:
+        return fn(np.random.default_rng(seed))
+    finally:
+        charts.FIGURE_OPTIMIZE = True
+
+
+def measure(fig, rounds: int, page=None) -> dict:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        spec  = fig.to_json()
+        times.append(time.perf_counter() - start)
+    result = {
+        "bytes":   len(spec.encode()),
+        "to_json": statistics.median(times),
+        "traces":  ",".join(sorted({trace.type for trace in fig.data})),
+        "render":  None,
+    }
+    if page is not None:
+        result["render"] = statistics.median(
+            page.evaluate(_RENDER, spec) / 1000 for _ in range(rounds)
+        )
+    return result
+
+
+def _row(name: str, label: str, r: dict) -> str:
+    render = f"{r['render'] * 1e3:10.1f}" if r["render"] is not None else f"{'—':>10}"
+    return (f"{name:<31} {label:<6} {r['bytes'] / 1024:10.1f} {r['to_json'] * 1e3:10.1f} "
+            f"{render}  {r['traces']}")
+
+
+def run(rounds: int, seed: int, page=None):
+    print(f"{'figure':<31} {'':<6} {'json, KB':>10} {'to_json':>10} {'render, ms':>10}  traces")
+    for name, fn in DATASETS:
+        before = measure(build(fn, False, seed), rounds, page)
+        after  = measure(build(fn, True, seed), rounds, page)
+        print(_row(name, "before", before))
+        print(_row(name, "after", after)
+              + f"  ×{before['bytes'] / after['bytes']:.1f} меньше", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds',     type=int, default=5)
+    parser.add_argument('--seed',       type=int, default=42)
+    parser.add_argument('--no-browser', action='store_true', help="без замера отрисовки")
+    args = parser.parse_args()
+
+    if args.no_browser or sync_playwright is None:
+        if not args.no_browser:
+            print("playwright не установлен — отрисовка не замеряется")
+        run(args.rounds, args.seed)
+        return
+
+    from plotly.offline import get_plotlyjs
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(args=["--use-gl=swiftshader", "--enable-webgl"])
+        page    = browser.new_page()
+        page.set_content(_PAGE.replace("{plotly}", get_plotlyjs()))
+        run(args.rounds, args.seed, page)
+        browser.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+# benchmarks/generators.py
+"""
+Синтетические данные в форме ответов API — для бенчмарков и заглушки.
+
+Все генераторы принимают rng = np.random.default_rng(seed) и при одном
+seed дают одни и те же данные. Фреймы — как после ApiClient.get_frame
+(типы из core/schema.py), словари — как JSON эндпоинтов оптимизации.
+"""
+import numpy as np
+import pandas as pd
+
+from core import kernels
+from core.schema import get_schema, apply_schema
+
+TYPES  = ['share', 'bond', 'currency']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+END    = pd.Timestamp('2024-12-31')
+
+
+def _typed(endpoint: str, df: pd.DataFrame) -> pd.DataFrame:
+    return apply_schema(df, get_schema(endpoint))
+
+
+def _names(n: int) -> list:
+    return [f'Эмитент {i} ПАО' for i in range(n)]
+
+
+def _walk(rng, n: int, start: float = 100.0, sigma: float = 0.01) -> np.ndarray:
+    """Геометрическое блуждание — цены, капитал."""
+    return start * np.exp(np.cumsum(rng.normal(0, sigma, n)))
+
+
+# ───────────── Портфель ─────────────
+
+def portfolio_history(years: int, rng) -> pd.DataFrame:
+    """/api/portfolio/metrics: дневная стоимость и доходность за years лет."""
+    days  = pd.date_range(end=END, periods=365 * years, freq='D')
+    total = _walk(rng, len(days), 1e6, 0.005)
+    return _typed("/api/portfolio/metrics", pd.DataFrame({
+        'date':           days,
+        'total_amount':   total,
+        'expected_yield': total * rng.uniform(0.01, 0.1, len(days)),
+    }))
+
+
+def coupons(n: int, rng) -> pd.DataFrame:
+    """/api/portfolio/coupon_list: n выплат в пределах текущего года."""
+    names = _names(max(n // 20, 1))
+    return _typed("/api/portfolio/coupon_list", pd.DataFrame({
+        'payment_date': END - pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+        'amount':       rng.uniform(100, 5000, n),
+        'name':         rng.choice(names, n),
+    }))
+
+
+def monthly_returns(years: int, rng) -> pd.DataFrame:
+    return _typed("/api/assets/monthly_returns", pd.DataFrame({
+        'year':           np.repeat(np.arange(END.year - years + 1, END.year + 1), 12),
+        'month_name':     MONTHS * years,
+        'monthly_return': rng.normal(1, 4, 12 * years),
+    }))
+
+
+def market_comparison(years: int, rng) -> pd.DataFrame:
+    days = pd.date_range(end=END, periods=365 * years, freq='D')
+    return _typed("/api/assets/market_comparison", pd.DataFrame({
+        'dt':           days,
+        'Мой портфель': np.cumsum(rng.normal(0.02, 1, len(days))),
+        'Рынок':        np.cumsum(rng.normal(0.01, 1, len(days))),
+    }))
+
+
+# ───────────── Активы ─────────────
+
+def holdings(n: int, rng) -> dict:
+    """Портфель из n бумаг: эндпоинт → DataFrame, плюс positions для оптимизации."""
+    names = _names(n)
+    types = rng.choice(TYPES, n)
+    value = rng.uniform(1e3, 5e5, n)
+    ranks = np.arange(1, n + 1)
+    return {
+        "/api/assets/donut_detail": _typed("/api/assets/donut_detail", pd.DataFrame({
+            'instrument_type': types,
+            'name':            names,
+            'amount':          value,
+        })),
+        "/api/assets/top_alltime": _typed("/api/assets/top_alltime", pd.DataFrame({
+            'name':          names,
+            'end_yield_pct': rng.normal(5, 20, n),
+            'rank_best':     ranks,
+            'rank_worst':    ranks[::-1],
+        })),
+        "/api/assets/top_daily": _typed("/api/assets/top_daily", pd.DataFrame({
+            'name':       names,
+            'diff_pct':   rng.normal(0, 2, n),
+            'rank_best':  ranks,
+            'rank_worst': ranks[::-1],
+        })),
+        "positions": [
+            {"ticker": f"T{i:04d}", "name": names[i], "instrument_type": str(types[i]),
+             "value": float(value[i])}
+            for i in range(n)
+        ],
+    }
+
+
+def user_responses(n_assets: int, years: int, rng) -> dict:
+    """Все ответы API страниц одного пользователя: эндпоинт → DataFrame."""
+    per_type = {t: [rng.uniform(1e5, 1e6)] for t in TYPES}
+    assets   = holdings(n_assets, rng)
+    return {
+        "/api/portfolio/metrics":       portfolio_history(years, rng),
+        "/api/portfolio/bar_money":     pd.DataFrame({'nm': ['Вложено'], **per_type}),
+        "/api/portfolio/coupon_suma":   pd.DataFrame({'suma':   [rng.uniform(1e4, 1e5)]}),
+        "/api/portfolio/coupon_amount": pd.DataFrame({'coupon': [rng.uniform(1e3, 1e4)]}),
+        "/api/portfolio/coupon_list":   coupons(n_assets * 4, rng),
+        "/api/assets/donut_top":        pd.DataFrame({'nm': ['По факту'], **per_type}),
+        "/api/assets/donut_detail":     assets["/api/assets/donut_detail"],
+        "/api/assets/top_alltime":      assets["/api/assets/top_alltime"],
+        "/api/assets/top_daily":        assets["/api/assets/top_daily"],
+        "/api/assets/market_comparison": market_comparison(years, rng),
+        "/api/assets/monthly_returns":  monthly_returns(years, rng),
+    }
+
+
+# ───────────── Рынок ─────────────
+
+def candles(n_bars: int, rng, freq: str = '1min', end: pd.Timestamp = END) -> pd.DataFrame:
+    """/api/market/candles/{figi}: n_bars свечей с шагом freq, заканчивая end."""
+    index = pd.date_range(end=end, periods=n_bars, freq=freq)
+    close = _walk(rng, n_bars, 100.0, 0.001)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, n_bars)) * close
+    return _typed("/api/market/candles/", pd.DataFrame({
+        'time':   index,
+        'open':   open_,
+        'high':   np.maximum(open_, close) + spread,
+        'low':    np.minimum(open_, close) - spread,
+        'close':  close,
+        'volume': rng.integers(1, 10_000, n_bars).astype(float),
+    }))
+
+
+def daily_closes(n_days: int, rng) -> pd.DataFrame:
+    """/api/market/candles_close/{figi}: дневные close."""
+    return _typed("/api/market/candles_close/", pd.DataFrame({
+        'time':  pd.date_range(end=END, periods=n_days, freq='D'),
+        'close': _walk(rng, n_days, 100.0, 0.02),
+    }))
+
+
+# ───────────── Оптимизация ─────────────
+
+def _portfolio_point(rng, tickers: list) -> dict:
+    weights = rng.dirichlet(np.ones(len(tickers)))
+    return {
+        "expected_return": float(rng.uniform(0.05, 0.3)),
+        "volatility":      float(rng.uniform(0.1, 0.4)),
+        "sharpe":          float(rng.uniform(0, 2)),
+        "weights_detail":  [
+            {"ticker": t, "name": t, "weight": float(w)} for t, w in zip(tickers, weights)
+        ],
+    }
+
+
+def frontier_response(n_assets: int, n_points: int, n_random: int, rng) -> dict:
+    """JSON /api/optimization/efficient_frontier."""
+    tickers = [f"T{i:04d}" for i in range(n_assets)]
+    vol     = np.sort(rng.uniform(0.1, 0.4, n_points))
+    return {
+        "frontier": [
+            {"volatility": float(v), "return": float(0.05 + 0.6 * v), "sharpe": float(rng.uniform(0, 2))}
+            for v in vol
+        ],
+        "random_portfolios": [
+            {"volatility": float(v), "return": float(r), "sharpe": float(r / v)}
+            for v, r in zip(rng.uniform(0.1, 0.5, n_random), rng.uniform(0, 0.3, n_random))
+        ],
+        "max_sharpe":   _portfolio_point(rng, tickers),
+        "min_variance": _portfolio_point(rng, tickers),
+        "current":      _portfolio_point(rng, tickers),
+    }
+
+
+def backtest_response(years: int, rng, n_assets: int = 10, rebalance_every: int = 21,
+                      tickers: list = None) -> dict:
+    """
+    JSON /api/optimization/backtest: дневные кривые капитала — walk-forward
+    с новыми целевыми весами каждые rebalance_every дней, «купить и
+    держать» и индекс.
+    """
+    days    = pd.date_range(end=END, periods=252 * years, freq='B')
+    tickers = tickers or [f"T{i:04d}" for i in range(n_assets)]
+    step    = rebalance_every or len(days)
+    returns = rng.normal(0.0004, 0.015, (len(days), len(tickers)))
+    targets = rng.dirichlet(np.ones(len(tickers)), len(range(0, len(days), step)))
+    curves  = {
+        "optimal": kernels.rebalance(returns, targets, rebalance_every),
+        "current": kernels.rebalance(returns, rng.dirichlet(np.ones(len(tickers))), 0),
+        "imoex":   _walk(rng, len(days), 1.0, 0.01),
+    }
+    return {
+        "equity_curve": [
+            {"date": d.strftime('%Y-%m-%d'), **{k: float(v[i]) for k, v in curves.items()}}
+            for i, d in enumerate(days)
+        ],
+        "metrics": {},
+        "rebalance_log": [
+            {"date": days[start].strftime('%Y-%m-%d'),
+             "weights": {t: float(w) for t, w in zip(tickers, weights)}}
+            for start, weights in zip(range(0, len(days), step), targets)
+        ],
+    }
+
+
+class FakeClient:
+    """Вместо ApiClient для core.loaders: get_frame отдаёт копию готового ответа."""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+
+    def get_frame(self, endpoint: str, params: dict = None) -> pd.DataFrame:
+        df = self.responses.get(endpoint)
+        if df is None:
+            # Эндпоинты с параметром в пути: /api/market/candles/{figi}
+            df = self.responses[endpoint.rsplit('/', 1)[0] + '/']
+        # Окно свечей [start, end), как у бэкенда
+        params = params or {}
+        if "start" in params:
+            df = df[df['time'] >= pd.Timestamp(params["start"])]
+        if "end" in params:
+            df = df[df['time'] < pd.Timestamp(params["end"])]
+        return df.copy()
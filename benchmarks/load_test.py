@@ -0,0 +1,204 @@
+# benchmarks/load_test.py
+"""
+Нагрузочный тест: N пользователей одновременно ходят по страницам в
+одном процессе Streamlit (streamlit.testing AppTest) против заглушки API.
+
+Каждый пользователь — свой поток и свои AppTest-сессии, кэши процесса
+общие (как у настоящего сервера). Сценарий пользователя:
+  главная → «Основная информация» (переключатели графика, доходности,
+  активов) → «Углубленная аналитика» (▶ / ◀ по бумагам, период,
+  слайдеры Монте-Карло) → «Оптимизация» (кнопка «Оптимизировать» и
+  ожидание фоновой задачи).
+
+Отчёт по каждому уровню нагрузки: перезапусков в секунду, p50/p95
+времени перезапуска, ошибки страниц, RSS процесса в начале, пик и в конце.
+
+    python -m benchmarks.load_test --users 1,5,10,20 --latency 0.05
+    python -m benchmarks.load_test --users 10 --api-url http://localhost:8000
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_backend import StubConfig, make_server
+from core.client import login
+
+HOME     = "app.py"
+MAIN     = "pages/Основная информация.py"
+ANALYSIS = "pages/Углубленная аналитика.py"
+OPTIMIZE = "pages/4_📈_Оптимизация_портфеля.py"
+
+
+def rss_mb() -> float:
+    """Текущий RSS процесса, МБ (Linux: /proc; иначе — пик по getrusage)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval: float = 0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak     = rss_mb()
+        self._done    = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class User:
+    """Один пользователь: сессии страниц и замеры перезапусков."""
+
+    def __init__(self, credentials, username: str, timeout: float):
+        self.credentials = credentials
+        self.username    = username
+        self.timeout     = timeout
+        self.latencies   = []       # (страница, шаг, секунды)
+        self.errors      = []
+
+    def open(self, path: str):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(path, default_timeout=self.timeout)
+        at.session_state["authenticated"] = True
+        at.session_state["jwt_token"]     = self.credentials.token
+        at.session_state["user_id"]       = self.credentials.user_id
+        at.session_state["username"]      = self.username
+        return at
+
+    def step(self, at, page: str, name: str, action=None):
+        """Действие на странице + перезапуск скрипта; время — только перезапуск."""
+        if action is not None:
+            action(at)
+        start = time.perf_counter()
+        try:
+            at.run()
+        except Exception as e:
+            self.errors.append(f"{page}/{name}: {e!r}")
+            return at
+        self.latencies.append((page, name, time.perf_counter() - start))
+        if at.exception:
+            self.errors.append(f"{page}/{name}: {at.exception[0].value}")
+        return at
+
+    def scenario(self):
+        self.step(self.open(HOME), "home", "open")
+
+        at = self.step(self.open(MAIN), "main", "open")
+        for key in ("toggle_chart_btn", "yield_button", "assets_button"):
+            self.step(at, "main", key, lambda at, k=key: at.button(key=k).click())
+
+        at = self.step(self.open(ANALYSIS), "analysis", "open")
+        for label in ("▶", "▶", "◀"):
+            self.step(at, "analysis", label,
+                      lambda at, l=label: next(b for b in at.button if b.label == l).click())
+        for period in ("1M", "1Y"):
+            self.step(at, "analysis", f"period {period}",
+                      lambda at, p=period: at.radio[0].set_value(p))
+        self.step(at, "analysis", "mc sims", lambda at: at.select_slider[0].set_value(50000))
+        self.step(at, "analysis", "mc conf", lambda at: at.slider[0].set_value(0.99))
+
+        at = self.step(self.open(OPTIMIZE), "optimize", "open")
+        self.step(at, "optimize", "optimize_btn", lambda at: at.button(key="optimize_btn").click())
+        self.wait_job(at, "optimize_job")
+
+    def wait_job(self, at, session_key: str):
+        """Ждём фоновую задачу (фрагмент прогресса AppTest сам не перезапускает)."""
+        from jobs import JOBS
+
+        try:
+            job_id = at.session_state[session_key]
+        except KeyError:
+            job_id = None
+        deadline = time.monotonic() + self.timeout
+        while job_id and time.monotonic() < deadline:
+            job = JOBS.get(job_id)
+            if job is None or job.finished:
+                break
+            time.sleep(0.1)
+        self.step(at, "optimize", "result")
+
+
+def run_level(api_url: str, n_users: int, timeout: float) -> dict:
+    users = []
+    for i in range(n_users):
+        username = f"load{i}"
+        users.append(User(login(api_url, username, "load"), username, timeout))
+
+    sampler = RssSampler()
+    sampler.start()
+    rss_start = rss_mb()
+    started   = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_users) as pool:
+        for future in [pool.submit(user.scenario) for user in users]:
+            future.result()
+    wall = time.perf_counter() - started
+    sampler.stop()
+
+    latencies = sorted(t for user in users for _, _, t in user.latencies)
+    errors    = [e for user in users for e in user.errors]
+    return {
+        "users":     n_users,
+        "reruns":    len(latencies),
+        "wall":      wall,
+        "rps":       len(latencies) / wall if wall else 0.0,
+        "p50":       statistics.median(latencies) if latencies else 0.0,
+        "p95":       latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        "max":       latencies[-1] if latencies else 0.0,
+        "errors":    errors,
+        "rss_start": rss_start,
+        "rss_peak":  sampler.peak,
+        "rss_end":   rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users',   default="1,5,10",
+                        help="уровни нагрузки через запятую")
+    parser.add_argument('--api-url', help="готовый бэкенд; без него — заглушка в этом процессе")
+    parser.add_argument('--latency', type=float, default=0.05, help="задержка заглушки, с")
+    parser.add_argument('--jitter',  type=float, default=0.02)
+    parser.add_argument('--assets',  type=int,   default=20)
+    parser.add_argument('--timeout', type=float, default=120, help="на один перезапуск, с")
+    args = parser.parse_args()
+
+    api_url = args.api_url
+    if api_url is None:
+        server = make_server(config=StubConfig(latency=args.latency, jitter=args.jitter,
+                                               assets=args.assets))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        api_url = f"http://127.0.0.1:{server.server_port}"
+    # db.get_api_url без st.secrets берёт API_URL из окружения
+    os.environ["API_URL"] = api_url
+
+    print(f"API: {api_url}")
+    print(f"{'users':>5} {'reruns':>7} {'rerun/s':>8} {'p50, s':>8} {'p95, s':>8} "
+          f"{'max, s':>8} {'errors':>7} {'RSS start/peak/end, MB':>24}")
+    for n_users in (int(n) for n in args.users.split(",")):
+        r = run_level(api_url, n_users, args.timeout)
+        print(f"{r['users']:>5} {r['reruns']:>7} {r['rps']:>8.2f} {r['p50']:>8.3f} "
+              f"{r['p95']:>8.3f} {r['max']:>8.3f} {len(r['errors']):>7} "
+              f"{r['rss_start']:>8.0f}/{r['rss_peak']:.0f}/{r['rss_end']:.0f}", flush=True)
+        for error in r["errors"][:5]:
+            print(f"      ! {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/runner.py
+"""
+Минимальный раннер бенчмарков: время и пик памяти, отчёт, сравнение с базой.
+
+Case — имя, параметры, setup(rng) → аргументы и fn(*аргументы).
+Подготовка данных в замер не входит. Время — серия вызовов, пока не
+наберётся min_time секунд (не меньше min_rounds); пик памяти — отдельный
+вызов под tracemalloc, чтобы трассировка не искажала время.
+
+Результаты сохраняются в JSON (--save) и сравниваются с прошлым прогоном
+(--compare): медиана хуже базы больше чем в threshold раз — регрессия.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+
+class Case(NamedTuple):
+    name:   str
+    params: dict
+    setup:  Callable     # setup(rng) → tuple аргументов для fn
+    fn:     Callable
+    heavy:  bool = False # пропускается в --quick
+
+    @property
+    def id(self) -> str:
+        args = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{args}]" if args else self.name
+
+
+def time_case(fn, args: tuple, min_time: float = 0.5, min_rounds: int = 3,
+              max_rounds: int = 1000) -> list:
+    """Время отдельных вызовов, секунды."""
+    fn(*args)   # прогрев: импорты, кэши plotly/pandas
+    times   = []
+    started = time.perf_counter()
+    gc_was  = gc.isenabled()
+    gc.disable()
+    try:
+        while len(times) < max_rounds and (
+            len(times) < min_rounds or time.perf_counter() - started < min_time
+        ):
+            start = time.perf_counter()
+            fn(*args)
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_was:
+            gc.enable()
+    return times
+
+
+def peak_memory(fn, args: tuple) -> int:
+    """Пик выделенной за вызов памяти, байты."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(case: Case, seed: int = 42, min_time: float = 0.5) -> dict:
+    args  = case.setup(np.random.default_rng(seed))
+    times = time_case(case.fn, args, min_time)
+    return {
+        "id":        case.id,
+        "rounds":    len(times),
+        "min":       min(times),
+        "median":    statistics.median(times),
+        "mean":      statistics.fmean(times),
+        "stdev":     statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_mb":   peak_memory(case.fn, args) / 1e6,
+    }
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1e3:10.2f}"
+
+
+def print_report(results: list, baseline: dict = None, threshold: float = 1.2) -> list:
+    """Таблица результатов; возвращает id регрессий относительно baseline."""
+    regressions = []
+    width = max([len(r["id"]) for r in results] + [4])
+    print(f"{'case':<{width}} {'median, ms':>10} {'min, ms':>10} {'stdev':>10} "
+          f"{'rounds':>7} {'peak, MB':>9}  vs base")
+    for r in results:
+        line = (f"{r['id']:<{width}} {_ms(r['median'])} {_ms(r['min'])} {_ms(r['stdev'])} "
+                f"{r['rounds']:>7} {r['peak_mb']:>9.2f}")
+        base = (baseline or {}).get(r["id"])
+        if base:
+            ratio = r["median"] / base["median"]
+            mark  = " ← регрессия" if ratio > threshold else ""
+            line += f"  ×{ratio:.2f}{mark}"
+            if ratio > threshold:
+                regressions.append(r["id"])
+        print(line, flush=True)
+    return regressions
+
+
+def save(path: str, results: list):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "machine": platform.node(),
+            "python":  platform.python_version(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": {r["id"]: r for r in results},
+        }, f, ensure_ascii=False, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
@@ -0,0 +1,106 @@
+# benchmarks/snapshot_render.py
+"""
+Подготовка данных страницы «Основная информация»: цепочка загрузчиков
+против снимка дашборда (core/snapshot.py).
+
+  загрузчики, холодно — core.loaders + прогноз + melt + portfolio_today
+                        (промах кэша без сетевой части);
+  загрузчики, тепло   — from_arrow каждой записи кэша + portfolio_today;
+  снимок, холодно     — открыть каталог снимка и прочитать через memory map;
+  снимок, тепло       — чтение из уже открытого снимка.
+
+Сеть не участвует: ответы API — из benchmarks/generators.py. Построение
+графиков одинаково в обоих вариантах и не меряется.
+
+Запуск из корня проекта:
+    python -m benchmarks.snapshot_render --assets 150 --years 5 --repeat 50
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.generators import FakeClient, user_responses
+from core import analytics, snapshot
+from core.cache import to_arrow, from_arrow
+
+PAGE_ITEMS = (
+    "today", "portfolio", "forecast", "coupons", "bar_money",
+    "donut_top", "donut_detail", "top_alltime", "top_daily",
+)
+
+
+def measure(fn, repeat: int) -> tuple:
+    """(медиана, мс; пик выделений за один вызов, КБ)"""
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times) * 1e3, peak / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--assets', type=int, default=100)
+    parser.add_argument('--years',  type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--seed',   type=int, default=42)
+    args = parser.parse_args()
+
+    rng    = np.random.default_rng(args.seed)
+    client = FakeClient(user_responses(args.assets, args.years, rng))
+
+    # Кэш загрузчиков в том виде, в каком его держит data/cache.py
+    data    = snapshot.build(client)
+    entries = {
+        "portfolio_metrics": to_arrow((data["portfolio"], data["forecast"])),
+        **{name: to_arrow(data[name]) for name in PAGE_ITEMS
+           if name not in ("today", "portfolio", "forecast")},
+    }
+
+    def loaders_cold():
+        built = snapshot.build(client)
+        return {name: built[name] for name in PAGE_ITEMS}
+
+    def loaders_warm():
+        page = {name: from_arrow(value) for name, value in entries.items()}
+        page["today"] = analytics.portfolio_today(page["portfolio_metrics"][0])
+        return page
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        snapshot.write(directory, 1, "v1", data)
+        write_ms = (time.perf_counter() - start) * 1e3
+        opened = snapshot.open_snapshot(directory, 1, "v1")
+        opened.read(PAGE_ITEMS)
+
+        def snapshot_cold():
+            return snapshot.open_snapshot(directory, 1, "v1").read(PAGE_ITEMS)
+
+        def snapshot_warm():
+            return opened.read(PAGE_ITEMS)
+
+        print(f"── {args.assets} бумаг, {args.years} лет истории ──")
+        print(f"  запись снимка: {write_ms:8.2f} мс")
+        for label, fn in (
+            ("загрузчики, холодно", loaders_cold),
+            ("загрузчики, тепло",   loaders_warm),
+            ("снимок, холодно",     snapshot_cold),
+            ("снимок, тепло",       snapshot_warm),
+        ):
+            ms, kb = measure(fn, args.repeat)
+            print(f"  {label:<20} {ms:8.2f} мс, пик {kb:9.1f} КБ")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,511 @@
+# benchmarks/stub_backend.py
+"""
+Локальная заглушка API — все эндпоинты, которые вызывают db.py и
+core/loaders.py, на синтетических данных (benchmarks/generators.py).
+
+    POST /api/login, /api/register        → токен stub-<user_id> на любой пароль
+    GET  /api/portfolio/*, /api/assets/*  → {"data": [...]} пользователя
+    GET  /api/market/tickers, candles/{figi}, candles_close/{figi}
+         (candles — часовые до текущего часа; ?start=&end= — окно [start, end))
+    GET  /api/optimization/portfolio_summary, correlation
+    POST /api/optimization/efficient_frontier, optimize, backtest
+    GET  /api/data_version                → {"version": "..."}
+    POST /api/data_version/bump           → новая версия (имитация отработавшего DAG)
+    GET  /_stub/stats                     → число запросов по эндпоинтам
+
+Каждый ответ несёт заголовок X-Data-Version. Данные детерминированы:
+seed + user_id (или FIGI) → одни и те же фреймы; после bump — новые.
+
+Ответы сжимаются кодеком из Accept-Encoding (zstd / br / gzip — что
+установлено, --no-compress — без сжатия), кадры по заголовку
+X-Frame-Format: columnar отдаются в колоночном формате (core/columnar.py,
+--no-columnar — как бэкенд, который его не знает).
+
+Нагрузка настраивается: задержка и разброс, отдельная задержка по
+префиксу (--slow /api/optimization/=2), размер данных (--assets,
+--years, --bars), ошибки с вероятностью (--error-rate, --error-status),
+обрывы соединения (--drop-rate) и полоса на соединение (--bandwidth, Мбит/с).
+
+    python -m benchmarks.stub_backend --port 8000 --latency 0.05 --jitter 0.02
+    API_URL=http://localhost:8000 streamlit run app.py
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import generators as gen
+from constants import DATA_VERSION_ENDPOINT, DATA_VERSION_HEADER, FRAME_FORMAT_HEADER
+from core import columnar, kernels, transport
+from core.candles import backend_now
+from core.loaders import TICKER_MAP
+
+# Меньше этого тела не сжимаются: выигрыша нет, а время тратится
+COMPRESS_MIN = 1024
+# Порциями такого размера тело пишется при ограниченной полосе
+_WRITE_CHUNK = 16 * 1024
+
+
+class StubConfig:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, slow: dict = None,
+                 assets: int = 20, years: int = 3, bars: int = 20_000,
+                 error_rate: float = 0.0, error_status: int = 500,
+                 error_prefix: str = "/api/", drop_rate: float = 0.0, seed: int = 42,
+                 encodings: list = None, columnar: bool = True, bandwidth: float = 0.0):
+        self.latency      = latency
+        self.jitter       = jitter
+        self.slow         = slow or {}      # префикс пути → доп. задержка, с
+        self.assets       = assets
+        self.years        = years
+        self.bars         = bars
+        self.error_rate   = error_rate
+        self.error_status = error_status
+        self.error_prefix = error_prefix
+        self.drop_rate    = drop_rate
+        self.seed         = seed
+        # Кодеки в порядке предпочтения сервера; [] — не сжимать
+        self.encodings    = ["zstd", "br", "gzip"] if encodings is None else encodings
+        self.columnar     = columnar
+        self.bandwidth    = bandwidth       # Мбит/с на соединение, 0 — без ограничения
+
+
+class StubState:
+    def __init__(self, config: StubConfig = None):
+        self.config  = config or StubConfig()
+        self._lock   = threading.Lock()
+        self.version = 1
+        self.users   = {}       # username → user_id
+        self.hits    = {}       # "METHOD путь-без-параметра" → число запросов
+        self._bodies = {}       # (версия, user_id или "shared", путь) → bytes
+
+    def bump(self) -> int:
+        with self._lock:
+            self.version += 1
+            self._bodies.clear()
+            return self.version
+
+    def user_id(self, username: str) -> int:
+        with self._lock:
+            return self.users.setdefault(username, len(self.users) + 1)
+
+    def count(self, label: str):
+        with self._lock:
+            self.hits[label] = self.hits.get(label, 0) + 1
+
+    def rng(self, *key) -> np.random.Generator:
+        """Генератор, зависящий от seed, версии данных и ключа (пользователь, FIGI)."""
+        digest = zlib.crc32(repr((self.config.seed, self.version, key)).encode())
+        return np.random.default_rng(digest)
+
+    def cached_body(self, key, build) -> bytes:
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            body = build()
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+
+# ───────────── Данные ─────────────
+
+def _records(df: pd.DataFrame) -> dict:
+    """DataFrame → {"data": [...]}, как отдаёт FastAPI (даты — ISO)."""
+    return {"data": json.loads(df.to_json(orient="records", date_format="iso"))}
+
+
+def _frame(df: pd.DataFrame, as_columns: bool) -> dict:
+    return columnar.encode(df) if as_columns else _records(df)
+
+
+def _encode(payload) -> bytes | None:
+    return None if payload is None else json.dumps(payload).encode()
+
+
+def _tickers(config: StubConfig) -> list:
+    """Известные FIGI + синтетические бумаги до config.assets."""
+    figis = list(TICKER_MAP)
+    return figis + [f"T{i:04d}" for i in range(max(config.assets - len(figis), 0))]
+
+
+def _positions(state: StubState, user_id: int) -> list:
+    rng       = state.rng("positions", user_id)
+    tickers   = [TICKER_MAP.get(f, f) for f in _tickers(state.config)]
+    positions = gen.holdings(len(tickers), rng)["positions"]
+    total     = sum(p["value"] for p in positions)
+    for p, ticker in zip(positions, tickers):
+        p["ticker"] = ticker
+        p["weight"] = p["value"] / total
+    return positions
+
+
+def user_response(state: StubState, user_id: int, path: str,
+                  as_columns: bool = False) -> dict | None:
+    config    = state.config
+    responses = gen.user_responses(config.assets, config.years, state.rng("user", user_id))
+    df        = responses.get(path)
+    return None if df is None else _frame(df, as_columns)
+
+
+def _weights(positions: list, rng) -> list:
+    weights = rng.dirichlet(np.ones(len(positions)))
+    return [
+        {"ticker": p["ticker"], "name": p["name"], "weight": float(w)}
+        for p, w in zip(positions, weights)
+    ]
+
+
+def _point(positions: list, rng) -> dict:
+    return {
+        "expected_return": float(rng.uniform(0.05, 0.3)),
+        "volatility":      float(rng.uniform(0.1, 0.4)),
+        "sharpe":          float(rng.uniform(0, 2)),
+        "weights_detail":  _weights(positions, rng),
+    }
+
+
+def optimization_response(state: StubState, user_id: int, path: str, params: dict) -> dict | None:
+    positions = _positions(state, user_id)
+    rng       = state.rng(path, user_id, json.dumps(params, sort_keys=True, default=str))
+    name      = path.rsplit("/", 1)[-1]
+
+    if name == "portfolio_summary":
+        by_type = {}
+        for p in positions:
+            by_type[p["instrument_type"]] = by_type.get(p["instrument_type"], 0) + p["value"]
+        return {
+            "total_value": sum(p["value"] for p in positions),
+            "n_assets":    len(positions),
+            "by_type":     by_type,
+            "positions":   positions,
+        }
+    if name == "correlation":
+        returns = rng.normal(0, 0.02, (int(params.get("lookback_days", 365)), len(positions)))
+        return {
+            "tickers": [p["ticker"] for p in positions],
+            "matrix":  np.corrcoef(returns, rowvar=False).round(4).tolist(),
+        }
+    if name == "efficient_frontier":
+        response = gen.frontier_response(len(positions), int(params.get("n_points", 40)),
+                                         int(params.get("n_random", 2000)), rng)
+        for key in ("max_sharpe", "min_variance", "current"):
+            response[key]["weights_detail"] = _weights(positions, rng)
+        return response
+    if name == "optimize":
+        optimal, current = _point(positions, rng), _point(positions, rng)
+        total = sum(p["value"] for p in positions)
+        rebalancing = []
+        for cur, opt in zip(current["weights_detail"], optimal["weights_detail"]):
+            delta = opt["weight"] - cur["weight"]
+            rebalancing.append({
+                "action":         "HOLD" if abs(delta) < 0.01 else ("BUY" if delta > 0 else "SELL"),
+                "ticker":         cur["ticker"],
+                "name":           cur["name"],
+                "current_weight": cur["weight"],
+                "target_weight":  opt["weight"],
+                "delta":          delta,
+                "amount_rub":     delta * total,
+            })
+        return {
+            "optimal":     optimal,
+            "current":     current,
+            "improvement": {
+                "return_delta":     optimal["expected_return"] - current["expected_return"],
+                "volatility_delta": optimal["volatility"] - current["volatility"],
+                "sharpe_delta":     optimal["sharpe"] - current["sharpe"],
+            },
+            "rebalancing": rebalancing,
+        }
+    if name == "backtest":
+        years    = max(int(params.get("lookback_days", 365 * state.config.years)) // 365, 1)
+        response = gen.backtest_response(years, rng, tickers=[p["ticker"] for p in positions],
+                                         rebalance_every=int(params.get("rebalance_every", 21)))
+        curves   = pd.DataFrame(response["equity_curve"])
+        response["metrics"] = {
+            key: {
+                "total_return": float(curves[key].iloc[-1] - 1),
+                "cagr":         float(curves[key].iloc[-1] ** (1 / years) - 1),
+                "volatility":   float(curves[key].pct_change().std() * np.sqrt(252)),
+                "sharpe":       float(rng.uniform(0, 2)),
+                "max_drawdown": float(kernels.drawdown(curves[key].to_numpy())[0].min() / 100),
+            }
+            for key in ("optimal", "current", "imoex")
+        }
+        return response
+    return None
+
+
+def market_response(state: StubState, path: str, as_columns: bool = False) -> dict | None:
+    config = state.config
+    if path == "/api/market/tickers":
+        # Только бумаги из TICKER_MAP: страница ищет FIGI по тикеру в TICKER_MAP_REVERSE
+        return _frame(pd.DataFrame({"figi": list(TICKER_MAP)}), as_columns)
+    if path.startswith("/api/market/candles_close/"):
+        figi = path.rsplit("/", 1)[-1]
+        return _frame(gen.daily_closes(365 * config.years, state.rng("close", figi)), as_columns)
+    return None
+
+
+def candles_frame(state: StubState, path: str) -> pd.DataFrame:
+    """Часовые свечи бумаги, последняя — текущий час (окна считаются от «сейчас»)."""
+    figi = path.rsplit("/", 1)[-1]
+    df   = gen.candles(state.config.bars, state.rng("candles", figi), freq='1h',
+                       end=backend_now().floor('h'))
+    # Цены кратны шагу цены 0.01, как на бирже
+    prices     = ['open', 'high', 'low', 'close']
+    df[prices] = df[prices].round(2)
+    return df
+
+
+def candles_window(df: pd.DataFrame, params: dict, as_columns: bool = False) -> dict:
+    """Параметры start / end (ISO) — окно [start, end), как у бэкенда."""
+    mask = pd.Series(True, index=df.index)
+    if "start" in params:
+        mask &= df['time'] >= pd.Timestamp(params["start"])
+    if "end" in params:
+        mask &= df['time'] < pd.Timestamp(params["end"])
+    return _frame(df[mask], as_columns)
+
+
+# ───────────── HTTP ─────────────
+
+def hit_label(method: str, path: str) -> str:
+    """Ключ счётчика /_stub/stats: свечи всех FIGI — под одним путём."""
+    if path.startswith("/api/market/candles"):
+        path = path.rsplit("/", 1)[0] + "/"
+    return f"{method} {path}"
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _encoding(self, size: int) -> str:
+            if size < COMPRESS_MIN:
+                return transport.IDENTITY
+            return transport.negotiate(self.headers.get("Accept-Encoding"),
+                                       state.config.encodings)
+
+        def _as_columns(self) -> bool:
+            return state.config.columnar and self.headers.get(FRAME_FORMAT_HEADER) == "columnar"
+
+        def _write(self, body: bytes):
+            rate = state.config.bandwidth * 1e6 / 8     # байт/с
+            if not rate:
+                self.wfile.write(body)
+                return
+            start = time.perf_counter()
+            for offset in range(0, len(body), _WRITE_CHUNK):
+                chunk = body[offset:offset + _WRITE_CHUNK]
+                self.wfile.write(chunk)
+                ahead = (offset + len(chunk)) / rate - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+        def _send(self, status: int, payload=None, body: bytes = None, key=None,
+                  as_columns: bool = False):
+            """key — тело из кэша: сжатое тоже кэшируется, по ключу и кодеку."""
+            body     = body if body is not None else json.dumps(payload).encode()
+            encoding = self._encoding(len(body))
+            if encoding != transport.IDENTITY:
+                raw  = body
+                body = (state.cached_body(key + (encoding,),
+                                          lambda: transport.compress(raw, encoding))
+                        if key is not None else transport.compress(raw, encoding))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if encoding != transport.IDENTITY:
+                self.send_header("Content-Encoding", encoding)
+            if as_columns:
+                self.send_header(FRAME_FORMAT_HEADER, "columnar")
+            self.send_header(DATA_VERSION_HEADER, str(state.version))
+            self.end_headers()
+            self._write(body)
+
+        def _user(self) -> int | None:
+            auth = self.headers.get("Authorization", "")
+            if auth.startswith("Bearer stub-"):
+                try:
+                    return int(auth.removeprefix("Bearer stub-"))
+                except ValueError:
+                    return None
+            return None
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _delay_and_faults(self, path: str) -> bool:
+            """Задержка и сбои. False — ответ не отправлять (обрыв или ошибка)."""
+            config = state.config
+            delay  = config.latency + random.uniform(-config.jitter, config.jitter)
+            delay += max((sec for prefix, sec in config.slow.items() if path.startswith(prefix)),
+                         default=0.0)
+            if delay > 0:
+                time.sleep(delay)
+            if not path.startswith(config.error_prefix):
+                return True
+            if random.random() < config.drop_rate:
+                self.close_connection = True
+                try:
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                return False
+            if random.random() < config.error_rate:
+                self._send(config.error_status, {"detail": "injected error"})
+                return False
+            return True
+
+        def _handle(self, method: str):
+            url    = urlsplit(self.path)
+            path   = url.path.rstrip("/") or "/"
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            body   = self._body() if method == "POST" else {}
+            state.count(hit_label(method, path))
+
+            if path == "/_stub/stats":
+                return self._send(200, {"version": state.version, "hits": state.hits})
+            if not self._delay_and_faults(path):
+                return
+            if path == "/":
+                return self._send(200, {"status": "ok"})
+            if path == DATA_VERSION_ENDPOINT and method == "GET":
+                return self._send(200, {"version": str(state.version)})
+            if path == f"{DATA_VERSION_ENDPOINT}/bump" and method == "POST":
+                return self._send(200, {"version": str(state.bump())})
+            if path in ("/api/login", "/api/register") and method == "POST":
+                username = body.get("username") or "demo"
+                user_id  = state.user_id(username)
+                return self._send(200, {"access_token": f"stub-{user_id}",
+                                        "user_id": user_id, "username": username})
+
+            user_id = self._user()
+            if user_id is None:
+                return self._send(401, {"detail": "Not authenticated"})
+
+            if path.startswith("/api/optimization/"):
+                payload = optimization_response(state, user_id, path, {**params, **body})
+                if payload is None:
+                    return self._send(404, {"detail": "Not Found"})
+                return self._send(200, payload)
+
+            # Кадры кэшируются в закодированном (и сжатом) виде: генерация
+            # не входит в замеры
+            as_columns = self._as_columns()
+            key        = None
+            if path.startswith("/api/market/candles/"):
+                df = state.cached_body((state.version, "frame", path),
+                                       lambda: candles_frame(state, path))
+                if "start" in params or "end" in params:
+                    data = _encode(candles_window(df, params, as_columns))
+                else:
+                    key  = (state.version, "shared", path, as_columns)
+                    data = state.cached_body(key, lambda: _encode(_frame(df, as_columns)))
+            elif path.startswith("/api/market/"):
+                key  = (state.version, "shared", path, as_columns)
+                data = state.cached_body(
+                    key, lambda: _encode(market_response(state, path, as_columns)))
+            elif path.startswith(("/api/portfolio/", "/api/assets/")) and method == "GET":
+                key  = (state.version, user_id, path, as_columns)
+                data = state.cached_body(
+                    key, lambda: _encode(user_response(state, user_id, path, as_columns)))
+            else:
+                data = None
+            if data is not None:
+                return self._send(200, body=data, key=key, as_columns=as_columns)
+            self._send(404, {"detail": "Not Found"})
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, state: StubState = None,
+                config: StubConfig = None):
+    """Сервер-заглушка; port=0 — свободный порт (см. server.server_port)."""
+    state  = state or StubState(config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def _slow_arg(value: str) -> tuple:
+    prefix, _, seconds = value.partition("=")
+    return prefix, float(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host',         default="127.0.0.1")
+    parser.add_argument('--port',         type=int,   default=8000)
+    parser.add_argument('--bump-every',   type=float, default=0,
+                        help="менять версию данных каждые N секунд (0 — вручную)")
+    parser.add_argument('--latency',      type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument('--jitter',       type=float, default=0.0, help="± к задержке, с")
+    parser.add_argument('--slow',         type=_slow_arg, action='append', default=[],
+                        metavar="PREFIX=SEC", help="доп. задержка для путей с префиксом")
+    parser.add_argument('--assets',       type=int,   default=20,     help="бумаг в портфеле")
+    parser.add_argument('--years',        type=int,   default=3,      help="лет истории")
+    parser.add_argument('--bars',         type=int,   default=20_000, help="часовых свечей на бумагу")
+    parser.add_argument('--error-rate',   type=float, default=0.0)
+    parser.add_argument('--error-status', type=int,   default=500)
+    parser.add_argument('--error-prefix', default="/api/",
+                        help="ошибки и обрывы — только для путей с этим префиксом")
+    parser.add_argument('--drop-rate',    type=float, default=0.0, help="доля оборванных соединений")
+    parser.add_argument('--bandwidth',    type=float, default=0.0,
+                        help="полоса на соединение, Мбит/с (0 — без ограничения)")
+    parser.add_argument('--no-compress',  action='store_true', help="не сжимать ответы")
+    parser.add_argument('--no-columnar',  action='store_true', help="без колоночного формата")
+    parser.add_argument('--seed',         type=int,   default=42)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency      = args.latency,
+        jitter       = args.jitter,
+        slow         = dict(args.slow),
+        assets       = args.assets,
+        years        = args.years,
+        bars         = args.bars,
+        error_rate   = args.error_rate,
+        error_status = args.error_status,
+        error_prefix = args.error_prefix,
+        drop_rate    = args.drop_rate,
+        seed         = args.seed,
+        encodings    = [] if args.no_compress else None,
+        columnar     = not args.no_columnar,
+        bandwidth    = args.bandwidth,
+    )
+    server = make_server(args.host, args.port, config=config)
+
+    if args.bump_every:
+        def bumper():
+            while True:
+                time.sleep(args.bump_every)
+                server.state.bump()
+        threading.Thread(target=bumper, daemon=True).start()
+
+    print(f"Заглушка API: http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
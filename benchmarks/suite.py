@@ -0,0 +1,221 @@
+# benchmarks/suite.py
+"""
+Бенчмарки построителей графиков, загрузчиков и расчётов на синтетических
+данных (benchmarks/generators.py) разного масштаба. Ядра core/kernels.py
+меряются на обоих путях: path=numpy и path=numba (если Numba установлена).
+
+Запуск из корня проекта:
+    python -m benchmarks.suite                     # всё
+    python -m benchmarks.suite --quick -k candle   # без тяжёлых, фильтр по имени
+    python -m benchmarks.suite --save base.json
+    python -m benchmarks.suite --compare base.json --threshold 1.2
+
+С --compare код выхода 1, если есть регрессии.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks import generators as gen
+from benchmarks.runner import Case, run_case, print_report, save, load
+from components.charts import (
+    build_portfolio_chart, build_candle_chart, build_monte_carlo,
+    build_monthly_heatmap, build_payment_calendar, build_donut,
+    build_frontier_chart, build_backtest_charts,
+)
+from core import analytics, kernels, loaders, snapshot
+from core.candles import CandleStore, backend_now
+
+FIGI = "BBG004730N88"
+
+
+def _portfolio(years):
+    def setup(rng):
+        client = gen.FakeClient({"/api/portfolio/metrics": gen.portfolio_history(years, rng)})
+        return loaders.portfolio_metrics(client)
+    return setup
+
+
+def _candles(n_bars, period):
+    def setup(rng):
+        client = gen.FakeClient({"/api/market/candles/": gen.candles(n_bars, rng)})
+        return client, FIGI, period
+    return setup
+
+
+def _candle_chart(n_bars, period):
+    def setup(rng):
+        client = gen.FakeClient({"/api/market/candles/": gen.candles(n_bars, rng)})
+        df_full, df_display = loaders.candles(client, FIGI, period)
+        return df_full, df_display, "SBER", period
+    return setup
+
+
+def _candles_now(n_bars):
+    """Часовые свечи до текущего часа — окна считаются от «сейчас»."""
+    def setup(rng):
+        df = gen.candles(n_bars, rng, freq='1h', end=backend_now().floor('h'))
+        return gen.FakeClient({"/api/market/candles/": df}), FIGI
+    return setup
+
+
+def _chart_data(period, windowed):
+    """Свечи + индикаторы, как для графика; windowed — через пустое CandleStore."""
+    def fn(client, figi):
+        store = CandleStore() if windowed else None
+        df_full, _ = loaders.candles(client, figi, period, store=store)
+        return analytics.compute_indicators(df_full, period)
+    return fn
+
+
+# Оба пути core.kernels; Numba — если установлена
+KERNEL_PATHS = ["numpy"] + (["numba"] if kernels.numba is not None else [])
+
+
+def _on_path(fn, path):
+    """fn с USE_NUMBA, выставленным на время вызова (первый вызов раннера — компиляция)."""
+    def run(*args):
+        saved, kernels.USE_NUMBA = kernels.USE_NUMBA, path == "numba"
+        try:
+            return fn(*args)
+        finally:
+            kernels.USE_NUMBA = saved
+    return run
+
+
+def _closes(n_bars, *extra):
+    def setup(rng):
+        return (gen.candles(n_bars, rng)['close'].to_numpy(), *extra)
+    return setup
+
+
+def _returns(n_days, n_assets):
+    def setup(rng):
+        weights = rng.dirichlet(np.ones(n_assets), n_days // 21 + 1)
+        return rng.normal(0.0004, 0.015, (n_days, n_assets)), weights, 21
+    return setup
+
+
+def _donut(n):
+    def setup(rng):
+        df = gen.holdings(n, rng)["/api/assets/donut_detail"]
+        return df, 'name', 'amount', ['#CED4DA'] * n, 'итого'
+    return setup
+
+
+def cases() -> list:
+    result = []
+
+    for years in (1, 5, 20):
+        result += [
+            Case("build_portfolio_chart", {"years": years}, _portfolio(years),
+                 build_portfolio_chart),
+            Case("loaders.portfolio_metrics", {"years": years},
+                 lambda rng, y=years: (gen.FakeClient(
+                     {"/api/portfolio/metrics": gen.portfolio_history(y, rng)}),),
+                 loaders.portfolio_metrics),
+            Case("build_monthly_heatmap", {"years": years},
+                 lambda rng, y=years: (gen.monthly_returns(y, rng),), build_monthly_heatmap),
+            Case("build_backtest_charts", {"years": years},
+                 lambda rng, y=years: (gen.backtest_response(y, rng)["equity_curve"],),
+                 build_backtest_charts),
+        ]
+
+    for n_bars in (1_000, 100_000, 1_000_000, 5_000_000):
+        heavy = n_bars > 100_000
+        for period in ('1M', '1Y'):
+            result.append(Case("loaders.candles", {"bars": n_bars, "period": period},
+                               _candles(n_bars, period), loaders.candles, heavy))
+        if n_bars <= 1_000_000:
+            result += [
+                Case("compute_indicators", {"bars": n_bars},
+                     lambda rng, n=n_bars: (gen.candles(n, rng), '1D'),
+                     analytics.compute_indicators, heavy),
+                Case("build_candle_chart", {"bars": n_bars, "period": "ALL"},
+                     _candle_chart(n_bars, 'ALL'), build_candle_chart, heavy),
+            ]
+
+    for n_bars in (20_000, 100_000):
+        for period in ('1D', '1W', '1M'):
+            for windowed in (False, True):
+                result.append(Case(
+                    "candles+indicators",
+                    {"bars": n_bars, "period": period,
+                     "window": "warmup" if windowed else "full"},
+                    _candles_now(n_bars), _chart_data(period, windowed),
+                ))
+
+    for path in KERNEL_PATHS:
+        for n_bars in (10_000, 1_000_000):
+            heavy  = n_bars > 100_000
+            params = {"bars": n_bars, "path": path}
+            result += [
+                Case("kernels.ema", params, _closes(n_bars, 100),
+                     _on_path(kernels.ema, path), heavy),
+                Case("kernels.rolling_mean_std", params, _closes(n_bars, 20),
+                     _on_path(kernels.rolling_mean_std, path), heavy),
+                Case("kernels.drawdown", params, _closes(n_bars),
+                     _on_path(kernels.drawdown, path), heavy),
+                Case("compute_indicators", params,
+                     lambda rng, n=n_bars: (gen.candles(n, rng), '1D'),
+                     _on_path(analytics.compute_indicators, path), heavy),
+            ]
+        for n_assets in (10, 100):
+            result.append(Case("kernels.rebalance",
+                               {"days": 252 * 20, "assets": n_assets, "path": path},
+                               _returns(252 * 20, n_assets), _on_path(kernels.rebalance, path)))
+
+    for n_sim in (1_000, 10_000, 100_000):
+        result.append(Case("build_monte_carlo", {"days": 1000, "sims": n_sim},
+                           lambda rng, n=n_sim: (gen.daily_closes(1000, rng), "SBER", n),
+                           build_monte_carlo))
+
+    for n in (1_000, 10_000):
+        result.append(Case("build_payment_calendar", {"coupons": n},
+                           lambda rng, n=n: (gen.coupons(n, rng),), build_payment_calendar))
+
+    for n in (10, 100, 1_000):
+        result += [
+            Case("build_donut", {"holdings": n}, _donut(n), build_donut),
+            Case("snapshot.build", {"holdings": n, "years": 5},
+                 lambda rng, n=n: (gen.FakeClient(gen.user_responses(n, 5, rng)),),
+                 snapshot.build),
+        ]
+
+    for n_assets, n_random in ((10, 2_000), (100, 5_000)):
+        result.append(Case("build_frontier_chart", {"assets": n_assets, "random": n_random},
+                           lambda rng, a=n_assets, r=n_random: (gen.frontier_response(a, 40, r, rng),),
+                           build_frontier_chart))
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-k', dest='pattern', default='', help="подстрока в id кейса")
+    parser.add_argument('--quick',     action='store_true', help="без тяжёлых кейсов")
+    parser.add_argument('--min-time',  type=float, default=0.5)
+    parser.add_argument('--seed',      type=int,   default=42)
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    selected = [
+        case for case in cases()
+        if args.pattern in case.id and not (args.quick and case.heavy)
+    ]
+    results = []
+    for case in selected:
+        print(f"… {case.id}", file=sys.stderr, flush=True)
+        results.append(run_case(case, args.seed, args.min_time))
+
+    baseline    = load(args.compare) if args.compare else None
+    regressions = print_report(results, baseline, args.threshold)
+    if args.save:
+        save(args.save, results)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# benchmarks/transport.py
+"""
+Передача ответов API при ограниченной полосе: без сжатия, gzip / br /
+zstd и колоночный формат кадров (core/transport.py, core/columnar.py).
+
+Заглушка бэкенда поднимается в этом процессе и отдаёт тела со скоростью
+--bandwidth Мбит/с на соединение (домашний сервер за Tailscale Funnel —
+единицы-десятки Мбит/с на отдачу). Для каждого ответа и способа:
+  wire, KB — байт по сети за запрос;
+  time, s  — медиана полного вызова ApiClient: запрос, скачивание,
+             разжатие и декодирование.
+Кодеки, которые не установлены (zstandard, brotli), пропускаются.
+
+    python -m benchmarks.transport
+    python -m benchmarks.transport --bandwidth 2,10 --rounds 1 --bars 50000
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import circuit
+import telemetry
+from benchmarks.stub_backend import StubConfig, make_server
+from core import client as client_module
+from core import transport
+from core.client import ApiClient, login
+
+FIGI = "BBG004730N88"
+
+# (название, кодеки клиента, колоночный формат)
+MODES = [
+    ("identity",      [],       False),
+    ("gzip",          ["gzip"], False),
+    ("br",            ["br"],   False),
+    ("zstd",          ["zstd"], False),
+    ("gzip+columnar", ["gzip"], True),
+    ("zstd+columnar", ["zstd"], True),
+]
+
+
+def requests_for(years: int) -> list:
+    return [
+        ("candles",  lambda c: c.get_frame(f"/api/market/candles/{FIGI}")),
+        ("backtest", lambda c: c.post_json("/api/optimization/backtest",
+                                           {"lookback_days": 365 * years})),
+        ("frontier", lambda c: c.post_json("/api/optimization/efficient_frontier",
+                                           {"n_points": 40, "n_random": 5000})),
+    ]
+
+
+def _use(encodings: list, columnar: bool):
+    transport.API_ENCODINGS    = encodings
+    client_module.API_COLUMNAR = columnar
+
+
+def measure(client: ApiClient, call, rounds: int) -> dict:
+    telemetry.REGISTRY.reset()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call(client)
+        times.append(time.perf_counter() - start)
+    wire = sum(row['value'] for row in telemetry.REGISTRY.counters("api_bytes_total")
+               if row['stage'] == "wire")
+    return {"time": statistics.median(times), "wire": wire / rounds}
+
+
+def run(client: ApiClient, server, bandwidths: list, years: int, rounds: int):
+    installed = set(transport.installed())
+    modes     = [m for m in MODES if set(m[1]) <= installed]
+    skipped   = [m[0] for m in MODES if m not in modes]
+    if skipped:
+        print(f"не установлены кодеки для: {', '.join(skipped)}")
+
+    for bandwidth in bandwidths:
+        server.state.config.bandwidth = bandwidth
+        print(f"\n{bandwidth:g} Мбит/с")
+        print(f"  {'response':<10} {'mode':<15} {'wire, KB':>10} {'time, s':>9}")
+        for name, call in requests_for(years):
+            base = None
+            for label, encodings, columnar in modes:
+                _use(encodings, columnar)
+                r    = measure(client, call, rounds)
+                base = base or r
+                print(f"  {name:<10} {label:<15} {r['wire'] / 1024:10.1f} {r['time']:9.2f}"
+                      f"  ×{base['time'] / r['time']:.1f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bandwidth', default="5,20,100", help="Мбит/с через запятую")
+    parser.add_argument('--bars',      type=int, default=20_000, help="часовых свечей")
+    parser.add_argument('--years',     type=int, default=10,     help="лет бэктеста")
+    parser.add_argument('--rounds',    type=int, default=3)
+    args = parser.parse_args()
+
+    server = make_server(config=StubConfig(bars=args.bars, years=args.years))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    client   = ApiClient(base_url, login(base_url, "bench", "bench"), timeout=600)
+    # Медленный ответ на узкой полосе — это и есть замер, а не сбой бэкенда
+    circuit.CIRCUIT_SLOW_CALL = float('inf')
+
+    defaults = list(transport.API_ENCODINGS), client_module.API_COLUMNAR
+    try:
+        run(client, server, [float(b) for b in args.bandwidth.split(",")], args.years, args.rounds)
+    finally:
+        _use(*defaults)
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
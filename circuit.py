@@ -0,0 +1,112 @@
+# circuit.py
+"""
+Предохранитель (circuit breaker) для запросов к бэкенду.
+
+Домашний сервер за Tailscale Funnel бывает медленным или недоступным.
+Без предохранителя каждый запрос честно ждёт свой таймаут, и страница
+с десятком загрузчиков висит минутами. Здесь по группе эндпоинтов
+считаются подряд идущие сбои (ошибка соединения, 5xx или слишком
+медленный ответ — кроме вызовов, которым явно дан таймаут длиннее
+обычного: оптимизация штатно считается десятки секунд):
+
+  closed    — запросы идут как обычно;
+  open      — после CIRCUIT_FAILURES сбоев подряд запросы сразу
+              отклоняются (CircuitOpen), без ожидания таймаута;
+  half_open — через CIRCUIT_COOLDOWN секунд фоновый поток проверяет
+              бэкенд; ответил — закрываемся, нет — снова open.
+"""
+import threading
+import time
+
+import telemetry
+from constants import CIRCUIT_FAILURES, CIRCUIT_COOLDOWN, CIRCUIT_SLOW_CALL
+
+CLOSED    = "closed"
+OPEN      = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Бэкенд недоступен — запрос отклонён без обращения к сети."""
+
+
+class CircuitBreaker:
+    def __init__(self, group: str, probe):
+        """probe() → True, если бэкенд отвечает. Вызывается в фоне."""
+        self.group     = group
+        self.probe     = probe
+        self.state     = CLOSED
+        self.failures  = 0
+        self.opened_at = None
+        self._lock     = threading.Lock()
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            telemetry.inc("circuit_transitions_total", group=self.group, to=state)
+        self.state = state
+
+    def allow(self) -> bool:
+        """Можно ли сейчас идти в сеть. В open запускает фоновую проверку."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= CIRCUIT_COOLDOWN:
+                self._set_state(HALF_OPEN)
+                threading.Thread(target=self._probe, daemon=True,
+                                 name=f"circuit-probe {self.group}").start()
+        telemetry.inc("circuit_rejected_total", group=self.group)
+        return False
+
+    def _probe(self):
+        try:
+            alive = self.probe()
+        except Exception:
+            alive = False
+        with self._lock:
+            if alive:
+                self.failures = 0
+                self._set_state(CLOSED)
+            else:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def record(self, ok: bool, elapsed: float, check_slow: bool = True):
+        """
+        Итог запроса: ok=False — ошибка соединения / 5xx.
+        check_slow=False — вызов с заведомо долгим таймаутом (оптимизация):
+        его длительность сбоем не считается.
+        """
+        if ok and check_slow and elapsed > CIRCUIT_SLOW_CALL:
+            ok = False
+        with self._lock:
+            if ok:
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= CIRCUIT_FAILURES:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+
+def endpoint_group(endpoint: str) -> str:
+    """'/api/market/candles/XXX' → '/api/market'"""
+    return "/".join(endpoint.split("/")[:3])
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(endpoint: str, probe) -> CircuitBreaker:
+    group = endpoint_group(endpoint)
+    with _breakers_lock:
+        breaker = _breakers.get(group)
+        if breaker is None:
+            breaker = _breakers[group] = CircuitBreaker(group, probe)
+        return breaker
+
+
+def states() -> dict:
+    """{группа: состояние} — для страницы мониторинга."""
+    with _breakers_lock:
+        return {group: b.state for group, b in _breakers.items()}
@@ -4,10 +4,82 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-from constants import COLORS_TOP, COLORS_DETAIL
-from data.portfolio import load_portfolio_metrics
-import streamlit as st
+from constants import COLORS_TOP, COLORS_DETAIL, FIGURE_OPTIMIZE, WEBGL_THRESHOLD
+from profiling import traced
 
+
+# ───────────── Оптимизация фигур ─────────────
+
+_ARRAY_PROPS = ('x', 'y', 'open', 'high', 'low', 'close', 'customdata')
+_KEEP_HIDDEN = ('type', 'name', 'visible', 'legendgroup', 'showlegend')
+
+
+def _typed(value):
+    """
+    Числовой массив → непрерывный ndarray: plotly ≥ 6 отправляет его
+    в браузер двоичным буфером (base64), а не JSON-списком чисел.
+    Даты и строки не трогаем.
+    """
+    if value is None or isinstance(value, (str, dict, tuple)):
+        return value
+    arr = np.asarray(value)
+    if arr.dtype.kind == 'f':
+        return np.ascontiguousarray(arr)
+    if arr.dtype.kind in 'iu':
+        # int64 в типизированный массив браузера не влезает
+        if arr.size and np.abs(arr).max() < 2 ** 31:
+            return np.ascontiguousarray(arr, dtype=np.int32)
+        return arr.astype(np.float64)
+    return value
+
+
+def _points(spec: dict) -> int:
+    for name in ('x', 'y'):
+        value = spec.get(name)
+        if value is not None and not isinstance(value, str):
+            return len(value)
+    return 0
+
+
+def optimize_figure(fig: go.Figure, webgl_threshold: int = WEBGL_THRESHOLD) -> go.Figure:
+    """
+    Последний шаг построителей с большими рядами:
+      — если в каком-то Scatter больше webgl_threshold точек, все Scatter
+        фигуры становятся Scattergl (заливка tonexty работает только между
+        трассами одного типа, поэтому переводим все сразу);
+      — числовые массивы — типизированные (см. _typed);
+      — у скрытых трасс (visible=False) данных нет вовсе, у трасс без
+        подсказки (hoverinfo='skip') — customdata и hovertemplate.
+    FIGURE_OPTIMIZE=0 — вернуть фигуру как есть (для сравнения).
+    """
+    if not FIGURE_OPTIMIZE:
+        return fig
+
+    specs = [trace.to_plotly_json() for trace in fig.data]
+    webgl = any(
+        spec['type'] == 'scatter' and _points(spec) > webgl_threshold for spec in specs
+    )
+    data = []
+    for spec in specs:
+        if spec.get('visible') is False:
+            data.append({k: spec[k] for k in _KEEP_HIDDEN if k in spec})
+            continue
+        for name in _ARRAY_PROPS:
+            if name in spec:
+                spec[name] = _typed(spec[name])
+        marker = spec.get('marker')
+        if marker and 'color' in marker:
+            marker['color'] = _typed(marker['color'])
+        if spec.get('hoverinfo') == 'skip':
+            spec.pop('customdata', None)
+            spec.pop('hovertemplate', None)
+        if webgl and spec['type'] == 'scatter':
+            spec['type'] = 'scattergl'
+        data.append(spec)
+    # skip_invalid — у Scattergl нет части свойств Scatter (line.shape='spline', cliponaxis)
+    return go.Figure(data=data, layout=fig.layout, skip_invalid=True)
+
+@traced("chart")
 def build_donut(df, label_col, value_col, colors, center_text):
     """Универсальный бублик — принимает DataFrame и возвращает Figure"""
     fig = go.Figure(go.Pie(
@@ -54,7 +126,8 @@ def build_donut(df, label_col, value_col, colors, center_text):
     )
     return fig
 
-def build_portfolio_chart(df, all_dates, forecast):
+@traced("chart")
+def build_portfolio_chart(df, forecast=None):
     """
     Улучшенный график динамики стоимости портфеля и вложенных средств.
 
@@ -63,6 +136,9 @@ def build_portfolio_chart(df, all_dates, forecast):
     - total_amount      — стоимость портфеля
     - expected_yield    — прибыль / убыток
     - fact_amount       — вложенные средства
+
+    forecast — core.forecast.Forecast из load_portfolio_metrics()
+    (массивы dates / values / lower / upper длиной история + прогноз).
     """
 
     import numpy as np
@@ -83,11 +159,7 @@ def build_portfolio_chart(df, all_dates, forecast):
     # ─────────────────────────────────────────────
     # Подготовка данных
     # ─────────────────────────────────────────────
-    plot_df["date"] = pd.to_datetime(plot_df["date"])
-    plot_df["total_amount"] = pd.to_numeric(plot_df["total_amount"], errors="coerce")
-    plot_df["expected_yield"] = pd.to_numeric(plot_df["expected_yield"], errors="coerce")
-    plot_df["fact_amount"] = pd.to_numeric(plot_df["fact_amount"], errors="coerce")
-
+    # Типы колонок уже приведены в db.api_get (core/schema.py)
     plot_df = plot_df.sort_values("date").dropna(
         subset=["date", "total_amount", "expected_yield", "fact_amount"]
     )
@@ -149,19 +221,18 @@ def build_portfolio_chart(df, all_dates, forecast):
     # Расчёт комфортного диапазона Y
     # Чтобы график не начинался от нуля
     # ─────────────────────────────────────────────
-    y_values = list(plot_df["total_amount"]) + list(plot_df["fact_amount"])
+    y_arrays = [
+        plot_df["total_amount"].to_numpy(dtype=float),
+        plot_df["fact_amount"].to_numpy(dtype=float),
+    ]
 
     if forecast is not None:
-        try:
-            forecast_values_for_range = np.asarray(forecast, dtype=float)
-            y_values += list(forecast_values_for_range)
-        except Exception:
-            pass
+        y_arrays += [forecast.values, forecast.lower, forecast.upper]
 
-    y_values = [value for value in y_values if not pd.isna(value)]
+    y_values = np.concatenate(y_arrays)
 
-    y_min = min(y_values)
-    y_max = max(y_values)
+    y_min = np.nanmin(y_values)
+    y_max = np.nanmax(y_values)
 
     y_padding = max((y_max - y_min) * 0.18, y_max * 0.025)
 
@@ -226,15 +297,10 @@ def build_portfolio_chart(df, all_dates, forecast):
     # ─────────────────────────────────────────────
     # Тренд и прогноз
     # ─────────────────────────────────────────────
-    if forecast is not None and all_dates is not None:
+    if forecast is not None:
         try:
-            forecast_values = np.asarray(forecast, dtype=float)
-            forecast_dates = pd.to_datetime(all_dates)
-
-            min_len = min(len(forecast_values), len(forecast_dates))
-
-            forecast_values = forecast_values[:min_len]
-            forecast_dates = forecast_dates[:min_len]
+            forecast_dates = forecast.dates
+            forecast_values = forecast.values
 
             history_len = len(plot_df)
 
@@ -244,8 +310,8 @@ def build_portfolio_chart(df, all_dates, forecast):
 
             # Будущая часть прогноза.
             # Берём с последней исторической точки, чтобы линия прогноза начиналась плавно.
-            future_dates = forecast_dates[history_len - 1:min_len]
-            future_values = forecast_values[history_len - 1:min_len]
+            future_dates = forecast_dates[history_len - 1:]
+            future_values = forecast_values[history_len - 1:]
 
             if len(trend_dates) > 0:
                 fig.add_trace(
@@ -269,6 +335,23 @@ def build_portfolio_chart(df, all_dates, forecast):
                 )
 
             if len(future_dates) > 1:
+                # Доверительный интервал прогноза
+                fig.add_trace(
+                    go.Scatter(
+                        x=np.concatenate([future_dates, future_dates[::-1]]),
+                        y=np.concatenate([
+                            forecast.upper[history_len - 1:],
+                            forecast.lower[history_len - 1:][::-1],
+                        ]),
+                        name="Интервал прогноза",
+                        fill="toself",
+                        fillcolor="rgba(249, 115, 22, 0.12)",
+                        line=dict(color="rgba(249, 115, 22, 0)"),
+                        hoverinfo="skip",
+                        showlegend=False,
+                    )
+                )
+
                 fig.add_trace(
                     go.Scatter(
                         x=future_dates,
@@ -448,8 +531,9 @@ def build_portfolio_chart(df, all_dates, forecast):
         ),
     )
 
-    return fig
+    return optimize_figure(fig)
 
+@traced("chart")
 def build_bar_assets(df: pd.DataFrame):
     """
     Горизонтальный бар — распределение вложений по активам
@@ -479,6 +563,7 @@ def build_bar_assets(df: pd.DataFrame):
 
     return fig
 
+@traced("chart")
 def build_market_comparison(df):
     """
     График сравнения портфеля и рынка
@@ -489,10 +574,6 @@ def build_market_comparison(df):
     """
     df = df.copy()
 
-    df["dt"] = pd.to_datetime(df["dt"], errors="coerce")
-    df["Мой портфель"] = pd.to_numeric(df["Мой портфель"], errors="coerce")
-    df["Рынок"] = pd.to_numeric(df["Рынок"], errors="coerce")
-
     df = df.dropna(subset=["dt", "Мой портфель", "Рынок"]).sort_values("dt")
 
     if df.empty:
@@ -653,12 +734,12 @@ def build_market_comparison(df):
         )
     )
 
-    return fig
+    return optimize_figure(fig)
 
 
+@traced("chart")
 def build_monthly_heatmap(df):
     df = df.copy()
-    df['monthly_return'] = pd.to_numeric(df['monthly_return'], errors='coerce')
     df['year'] = df['year'].astype(str)   # ← ключевой фикс — год как строка!
 
     month_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
@@ -740,66 +821,47 @@ def build_monthly_heatmap(df):
     )
 
     return fig
-import ta
-import numpy as np
-
-# Настройки EMA под период
-EMA_SETTINGS = {
-    '1D' : (20, 100),
-    '1W' : (20, 50),
-    '1M' : (10, 30),
-    '6M' : (20, 60),
-    '1Y' : (10, 30),
-    'ALL': (10, 30),
-}
+from core.analytics import compute_indicators, monte_carlo, drawdown
 
+@traced("chart")
 def build_candle_chart(df_full: pd.DataFrame,
                        df_display: pd.DataFrame,
                        ticker_name: str,
-                       period: str = '1D') -> go.Figure:
-
-    df = df_full.copy()
-
-    ema_fast, ema_slow = EMA_SETTINGS.get(period, (20, 100))
+                       period: str = '1D',
+                       indicators: pd.DataFrame = None) -> go.Figure:
+    """indicators — готовый load_indicators(figi, period); иначе считаем здесь"""
 
     # ── Индикаторы на ПОЛНЫХ данных ──────────────────────────
-    df['EMA_fast'] = ta.trend.ema_indicator(df['close'], window=ema_fast)
-    df['EMA_slow'] = ta.trend.ema_indicator(df['close'], window=ema_slow)
-
-    bb = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-    df['BB_High'] = bb.bollinger_hband()
-    df['BB_Low']  = bb.bollinger_lband()
-    df['BB_Mid']  = bb.bollinger_mavg()
+    if indicators is None:
+        indicators = compute_indicators(df_full, period)
+    df = df_full.join(indicators)
 
     # ── Обрезаем до нужного периода ──────────────────────────
     df = df[df.index.isin(df_display.index)]
 
     fig = go.Figure()
 
-    # Bollinger заливка
+    # Bollinger: верхняя линия, нижняя с заливкой до верхней, средняя —
+    # три трассы вместо пяти (каждая несёт свою копию дат)
     fig.add_trace(go.Scatter(
-        x=df.index, y=df['BB_High'],
-        line=dict(color='rgba(173,216,230,0)'),
-        showlegend=False, hoverinfo='skip', name='BB High',
+        x=df.index, y=df['BB_High'], mode='lines', name='BB Upper',
+        legendgroup='bb', showlegend=False,
+        line=dict(color='#ADD8E6', width=1, dash='dot'),
+        hovertemplate='BB Upper: %{y:.2f}<extra></extra>',
     ))
     fig.add_trace(go.Scatter(
-        x=df.index, y=df['BB_Low'],
+        x=df.index, y=df['BB_Low'], mode='lines', name='Bollinger Bands',
+        legendgroup='bb',
         fill='tonexty', fillcolor='rgba(173,216,230,0.2)',
-        line=dict(color='rgba(173,216,230,0)'),
-        showlegend=True, name='Bollinger Bands', hoverinfo='skip',
+        line=dict(color='#ADD8E6', width=1, dash='dot'),
+        hovertemplate='BB Lower: %{y:.2f}<extra></extra>',
+    ))
+    fig.add_trace(go.Scatter(
+        x=df.index, y=df['BB_Mid'], mode='lines', name='BB Mid',
+        legendgroup='bb', showlegend=False,
+        line=dict(color='#ADD8E6', width=1, dash='dash'),
+        hovertemplate='BB Mid: %{y:.2f}<extra></extra>',
     ))
-
-    # Bollinger линии
-    for col, label, dash in [
-        ('BB_High', 'BB Upper', 'dot'),
-        ('BB_Mid',  'BB Mid',   'dash'),
-        ('BB_Low',  'BB Lower', 'dot'),
-    ]:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[col], mode='lines', name=label,
-            line=dict(color='#ADD8E6', width=1, dash=dash),
-            hovertemplate=f'{label}: %{{y:.2f}}<extra></extra>',
-        ))
 
     # Свечи
     fig.add_trace(go.Candlestick(
@@ -841,32 +903,18 @@ def build_candle_chart(df_full: pd.DataFrame,
         xaxis=dict(showgrid=False, showline=True, linecolor='#CED4DA'),
     )
 
-    return fig
-
+    return optimize_figure(fig)
 
-from data.assets import load_candles_for_mc
 
-def build_monte_carlo(figi: str,          # ← принимаем figi
+@traced("chart")
+def build_monte_carlo(df: pd.DataFrame,   # дневные close — load_candles_for_mc(figi)
                       ticker_name: str,
                       num_simulations: int = 1000,
                       confidence_level: float = 0.95) -> tuple:
 
-    # Всегда грузим дневные — независимо от периода графика
-    df = load_candles_for_mc(figi)
-    df['close'] = pd.to_numeric(df['close'], errors='coerce').astype(float)
-
-    returns    = np.log(df['close'] / df['close'].shift(1)).dropna()
-    mu         = returns.mean()
-    sigma      = returns.std()
-    last_price = df['close'].iloc[-1]
-
-    np.random.seed(42)
-    sim_returns = np.random.normal(mu, sigma, num_simulations)
-    sim_prices  = last_price * np.exp(sim_returns)
-    pl          = sim_prices - last_price
-
-    threshold = np.percentile(pl, (1 - confidence_level) * 100)
-    var_value = -threshold
+    pl, threshold, var_value, last_price = monte_carlo(
+        df['close'], num_simulations, confidence_level,
+    )
 
     # ── График ────────────────────────────────────────────────
     fig = go.Figure()
@@ -931,6 +979,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 
+@traced("chart")
 def build_payment_calendar(df: pd.DataFrame):
     if df is None or df.empty:
         return None
@@ -952,7 +1001,7 @@ def build_payment_calendar(df: pd.DataFrame):
 
     # ИЗМЕНЕНО: Добавили exact_date в группировку. 
     # Теперь если в одном месяце выплаты в разные дни, график их "запомнит"
-    df_grouped = df.groupby(['year_month', 'month_name', 'exact_date', 'name'])['amount'].sum().reset_index()
+    df_grouped = df.groupby(['year_month', 'month_name', 'exact_date', 'name'], observed=True)['amount'].sum().reset_index()
     df_grouped = df_grouped.sort_values(['year_month', 'exact_date'])
 
     # Считаем итоги по месяцам
@@ -1022,3 +1071,145 @@ def build_payment_calendar(df: pd.DataFrame):
     )
 
     return fig
+
+
+# ───────────── Оптимизация портфеля ─────────────
+
+@traced("chart")
+def build_frontier_chart(data: dict) -> go.Figure:
+    """Эффективная граница из ответа /api/optimization/efficient_frontier"""
+    fig = go.Figure()
+
+    if data.get("random_portfolios"):
+        rp = pd.DataFrame(data["random_portfolios"])
+        fig.add_trace(go.Scatter(
+            x=rp["volatility"] * 100,
+            y=rp["return"] * 100,
+            mode="markers",
+            marker=dict(
+                size=4,
+                color=rp["sharpe"],
+                colorscale="Viridis",
+                opacity=0.5,
+                colorbar=dict(title="Sharpe", x=1.15),
+                showscale=True,
+            ),
+            name="Случайные портфели",
+            hovertemplate="σ: %{x:.2f}%<br>μ: %{y:.2f}%<extra></extra>",
+        ))
+
+    if data.get("frontier"):
+        fr = pd.DataFrame(data["frontier"])
+        fig.add_trace(go.Scatter(
+            x=fr["volatility"] * 100,
+            y=fr["return"] * 100,
+            mode="lines+markers",
+            line=dict(color="#FF4B4B", width=3),
+            marker=dict(size=6, color="#FF4B4B"),
+            name="Эффективная граница",
+            customdata=fr["sharpe"],
+            hovertemplate="σ: %{x:.2f}%<br>μ: %{y:.2f}%<br>Sharpe: %{customdata:.2f}<extra></extra>",
+        ))
+
+    def _add_point(portfolio, name, color, symbol):
+        if not portfolio or "expected_return" not in portfolio:
+            return
+        fig.add_trace(go.Scatter(
+            x=[portfolio["volatility"] * 100],
+            y=[portfolio["expected_return"] * 100],
+            mode="markers",
+            marker=dict(size=22, color=color, symbol=symbol,
+                        line=dict(color="white", width=2)),
+            name=name,
+            hovertemplate=f"<b>{name}</b><br>σ: %{{x:.2f}}%<br>μ: %{{y:.2f}}%<br>"
+                          f"Sharpe: {portfolio.get('sharpe', 0):.2f}<extra></extra>",
+        ))
+
+    _add_point(data.get("max_sharpe"), "⭐ Max Sharpe", "#FFD700", "star")
+    _add_point(data.get("min_variance"), "🛡️ Min Variance", "#00CED1", "diamond")
+    _add_point(data.get("current"), "📍 Ваш портфель", "#FF69B4", "circle")
+
+    fig.update_layout(
+        xaxis_title="Риск (волатильность), % годовых",
+        yaxis_title="Ожидаемая доходность, % годовых",
+        height=600,
+        hovermode="closest",
+        template="plotly_white",
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01,
+                    bgcolor="rgba(255,255,255,0.8)"),
+    )
+
+    return optimize_figure(fig)
+
+
+@traced("chart")
+def build_backtest_charts(equity_curve: list) -> tuple:
+    """
+    Кривая капитала и просадки из ответа /api/optimization/backtest.
+    Возвращает (fig_eq, fig_dd).
+    """
+    eq_df = pd.DataFrame(equity_curve)
+    eq_df["date"] = pd.to_datetime(eq_df["date"])
+
+    fig_eq = go.Figure()
+    fig_eq.add_trace(go.Scatter(
+        x=eq_df["date"], y=eq_df["optimal"],
+        mode="lines", name="⭐ Оптимальная стратегия",
+        line=dict(color="#FF4B4B", width=2.5),
+        hovertemplate="%{x|%Y-%m-%d}<br>Капитал: %{y:.3f}<extra></extra>",
+    ))
+    fig_eq.add_trace(go.Scatter(
+        x=eq_df["date"], y=eq_df["current"],
+        mode="lines", name="📍 Ваш портфель (buy & hold)",
+        line=dict(color="#888", width=2, dash="dash"),
+        hovertemplate="%{x|%Y-%m-%d}<br>Капитал: %{y:.3f}<extra></extra>",
+    ))
+    if "imoex" in eq_df.columns and eq_df["imoex"].notna().any():
+        fig_eq.add_trace(go.Scatter(
+            x=eq_df["date"], y=eq_df["imoex"],
+            mode="lines", name="📈 IMOEX",
+            line=dict(color="#00AA44", width=2, dash="dot"),
+            hovertemplate="%{x|%Y-%m-%d}<br>IMOEX: %{y:.3f}<extra></extra>",
+        ))
+
+    fig_eq.update_layout(
+        title="Рост капитала (начальный = 1.0)",
+        xaxis_title="Дата",
+        yaxis_title="Капитал",
+        height=500,
+        hovermode="x unified",
+        template="plotly_white",
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01,
+                    bgcolor="rgba(255,255,255,0.8)"),
+    )
+
+    fig_dd = go.Figure()
+    fig_dd.add_trace(go.Scatter(
+        x=eq_df["date"],
+        y=drawdown(eq_df["optimal"]),
+        mode="lines", name="⭐ Оптимальная",
+        line=dict(color="#FF4B4B", width=1.5),
+        fill="tozeroy", fillcolor="rgba(255,75,75,0.15)",
+    ))
+    fig_dd.add_trace(go.Scatter(
+        x=eq_df["date"],
+        y=drawdown(eq_df["current"]),
+        mode="lines", name="📍 Ваш портфель",
+        line=dict(color="#888", width=1.5, dash="dash"),
+    ))
+    if "imoex" in eq_df.columns and eq_df["imoex"].notna().any():
+        fig_dd.add_trace(go.Scatter(
+            x=eq_df["date"],
+            y=drawdown(eq_df["imoex"]),
+            mode="lines", name="📈 IMOEX",
+            line=dict(color="#00AA44", width=1.5, dash="dot"),
+        ))
+    fig_dd.update_layout(
+        xaxis_title="Дата",
+        yaxis_title="Просадка, %",
+        height=350,
+        hovermode="x unified",
+        template="plotly_white",
+    )
+
+    return optimize_figure(fig_eq), optimize_figure(fig_dd)
@@ -0,0 +1,94 @@
+import streamlit as st
+
+from db import current_credentials, use_credentials, session_client
+from core.version import current_data_version
+from jobs import JOBS, DONE, FAILED, CANCELLED
+from result_cache import RESULT_CACHE, result_key as _result_key
+
+
+def result_key(endpoint: str, payload: dict, holdings: str) -> tuple:
+    """Ключ результата для текущей версии данных (см. result_cache.result_key)."""
+    return _result_key(endpoint, payload, holdings, current_data_version(session_client()))
+
+
+def submit_job(session_key: str, key: tuple, fn):
+    """
+    Запускает fn(job) в фоне от имени текущей сессии.
+    В st.session_state[session_key] остаётся только id задачи.
+    """
+    credentials = current_credentials()
+
+    def run(job):
+        with use_credentials(credentials):
+            return fn(job)
+
+    kind = key[2].rsplit("/", 1)[-1]
+    st.session_state[session_key] = JOBS.submit(kind, run, key)
+
+
+@st.fragment(run_every=1)
+def _progress(job_id: str, label: str):
+    job = JOBS.get(job_id)
+    if job is None or job.finished:
+        # Перерисовываем всю страницу — уже с результатом
+        st.rerun()
+
+    col_bar, col_cancel = st.columns([4, 1])
+    with col_bar:
+        if job.total:
+            st.progress(job.done / job.total,
+                        text=f"⏳ {label}: {job.done} из {job.total} · {job.elapsed:.0f} с")
+        else:
+            waiting = "в очереди" if job.started_at is None else f"{job.elapsed:.0f} с"
+            st.info(f"⏳ {label}… {waiting}")
+    if col_cancel.button("✖️ Отменить", key=f"cancel_{job_id}", use_container_width=True):
+        JOBS.cancel(job_id)
+        st.rerun()
+
+
+def job_result(session_key: str, label: str, key: tuple = None, refresh=None):
+    """
+    Результат для текущих параметров (key), если он уже посчитан (устаревший —
+    тоже, а refresh(job) пересчитывает его в фоне, см. result_cache), иначе —
+    состояние последней задачи из st.session_state[session_key], если она
+    запущена для тех же параметров (иначе None — страница предложит пересчёт):
+    идёт — прогресс с кнопкой отмены (обновляется раз в секунду), None;
+    готова — результат; ошибка или отмена — сообщение, None.
+    """
+    if key is not None:
+        cached = RESULT_CACHE.get(key)
+        if cached is not None:
+            if refresh is not None and RESULT_CACHE.stale(key):
+                job = JOBS.get(st.session_state.get(session_key))
+                if job is None or job.key != key:
+                    submit_job(session_key, key, refresh)
+            return cached
+
+    job_id = st.session_state.get(session_key)
+    if job_id is None:
+        return None
+
+    job = JOBS.get(job_id)
+    if job is None:
+        # Вытеснена из истории задач — нужно запустить заново
+        st.session_state.pop(session_key, None)
+        return None
+    if key is not None and job.key != key:
+        # Задача для прежних параметров — её результат к текущим не относится
+        return None
+
+    if job.status == DONE:
+        result = JOBS.result(job)
+        if result is None:
+            # Хранилище результатов его вытеснило — нужно запустить заново
+            st.session_state.pop(session_key, None)
+        return result
+    if job.status == FAILED:
+        st.error(f"❌ {label}: {job.error}")
+        return None
+    if job.status == CANCELLED:
+        st.info(f"✖️ {label}: отменено")
+        return None
+
+    _progress(job_id, label)
+    return None
@@ -1,55 +1,68 @@
 
+import html
 import streamlit as st
 import pandas as pd
-from constants import MEDALS
+from constants import MEDALS, TOP_N
 
 
-def render_top(df: pd.DataFrame, diff_col: str):
+def _top_rows_html(rows: pd.DataFrame, diff_col: str, color: str, bg: str) -> str:
+    """Собирает весь список топа в один HTML-блок"""
+    names  = rows['name'].astype(str).map(html.escape).tolist()
+    values = rows[diff_col].tolist()
+
+    parts = []
+    for i, (name, value) in enumerate(zip(names, values), start=1):
+        medal = MEDALS.get(i, f"{i}.")
+        sign  = "+" if value >= 0 else ""
+        parts.append(
+            f'<div style="'
+            f'display:flex;'
+            f'justify-content:space-between;'
+            f'padding:4px 8px;'
+            f'border-radius:6px;'
+            f'margin-bottom:4px;'
+            f'background:{bg}'
+            f'">'
+            f'<span>{medal} {name}</span>'
+            f'<span style="color:{color}">'
+            f'<b>{sign}{value:.2f}%</b>'
+            f'</span>'
+            f'</div>'
+        )
+    return "".join(parts)
+
+
+def render_top(df: pd.DataFrame, diff_col: str, top_n: int = TOP_N):
     """
-    Топ 5 лучших и худших активов
+    Топ N лучших и худших активов
     df       — из load_top_alltime() или load_top_daily()
     diff_col — 'end_yield_pct' или 'diff_pct'
+    top_n    — сколько активов показывать в каждом списке
+
+    Каждый список уходит в браузер одним st.markdown, а не строкой на актив.
     """
     if df is None or not isinstance(df, pd.DataFrame) or df.empty:
         st.warning("⚠️ Нет данных")
         return
 
-    best  = df[df['rank_best']  <= 5].sort_values(diff_col, ascending=False)
-    worst = df[df['rank_worst'] <= 5].sort_values(diff_col, ascending=True)
-
-    def render_rows(rows, color):
-        for i, (_, row) in enumerate(rows.iterrows(), start=1):
-            medal = MEDALS.get(i, f"{i}.")
-            sign  = "+" if row[diff_col] >= 0 else ""
-            bg    = (
-                "rgba(45,198,83,0.07)"
-                if color == "#2DC653"
-                else "rgba(230,57,70,0.07)"
-            )
-            st.markdown(
-                f'<div style="'
-                f'display:flex;'
-                f'justify-content:space-between;'
-                f'padding:4px 8px;'
-                f'border-radius:6px;'
-                f'margin-bottom:4px;'
-                f'background:{bg}'
-                f'">'
-                f'<span>{medal} {row["name"]}</span>'
-                f'<span style="color:{color}">'
-                f'<b>{sign}{row[diff_col]:.2f}%</b>'
-                f'</span>'
-                f'</div>',
-                unsafe_allow_html=True
-            )
+    # nlargest/nsmallest — частичная сортировка, без пересортировки всего df
+    rows   = df.dropna(subset=[diff_col])
+    best   = rows.nlargest(top_n, diff_col)
+    worst  = rows.nsmallest(top_n, diff_col)
 
     st.markdown("🟢 **Лучшие**")
-    render_rows(best,  color="#2DC653")
+    st.markdown(
+        _top_rows_html(best, diff_col, color="#2DC653", bg="rgba(45,198,83,0.07)"),
+        unsafe_allow_html=True,
+    )
 
     st.markdown("---")
 
     st.markdown("🔴 **Худшие**")
-    render_rows(worst, color="#E63946")
+    st.markdown(
+        _top_rows_html(worst, diff_col, color="#E63946", bg="rgba(230,57,70,0.07)"),
+        unsafe_allow_html=True,
+    )
 
 
 def render_coupon_metrics(coupon: float, suma: float, invested_today: float):
@@ -1,6 +1,7 @@
 import streamlit as st
 from pathlib import Path
 from auth import logout_button
+from components.session_memory import track_session
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +48,9 @@ def hide_streamlit_default_navigation():
 
 def render_sidebar():
     hide_streamlit_default_navigation()
+    # Баннер «сервер недоступен» показывается заново на каждом прогоне (см. db.py)
+    st.session_state.pop("degraded_as_of", None)
+    track_session()
 
     main_page = "app.py"
     info_page = find_page_by_part("Основная информация")
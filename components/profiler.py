@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+
+import streamlit as st
+
+import profiling
+from auth import is_admin
+from constants import PROFILE_PAGES
+
+
+def profiling_enabled() -> bool:
+    """PROFILE_PAGES=1 — профилируем всех; иначе администратор включает ?profile=1."""
+    if PROFILE_PAGES:
+        return True
+    return st.query_params.get("profile") == "1" and is_admin()
+
+
+@contextmanager
+def page_run(page: str, span):
+    """
+    Тело страницы: with page_run("…", page_span): require_auth(); ...
+
+    Профиль прогона (если включён) и span времени отрисовки закрываются
+    и тогда, когда прогон прерван st.stop / st.rerun или ошибкой, —
+    такой профиль помечается неполным.
+    """
+    profile  = profiling.begin(page) if profiling_enabled() else None
+    complete = False
+    try:
+        yield profile
+        complete = True
+    finally:
+        profiling.end(profile, complete)
+        span.finish()
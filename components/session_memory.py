@@ -0,0 +1,22 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import memory
+from constants import MEMORY_TRACE
+
+
+def track_session():
+    """Размеры ключей st.session_state этой сессии — для страницы мониторинга."""
+    if MEMORY_TRACE:
+        memory.start_tracing()
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    sizes = {}
+    for key in list(st.session_state.keys()):
+        try:
+            sizes[str(key)] = memory.deep_size(st.session_state[key])
+        except KeyError:
+            continue
+    memory.record_session(ctx.session_id, st.session_state.get("username"), sizes)
@@ -1,3 +1,5 @@
+import os
+
 
 TYPE_MAP = {
     'share':    'Акции',
@@ -19,7 +21,158 @@ COLORS_DETAIL = {
 
 
 MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+TOP_N  = 5
 
 USD_RATE     = 90
 AIM          = 300000
 FORECAST_DAYS = 7
+# 'linear' — МНК по всей истории (или по окну FORECAST_WINDOW дней), 'holt' — сглаживание Холта
+FORECAST_METHOD     = 'linear'
+FORECAST_WINDOW     = None
+FORECAST_CONFIDENCE = 0.95
+
+# Кэш загрузчиков (data/cache.py): после CACHE_SOFT_TTL значение отдаётся
+# сразу и обновляется в фоне, после CACHE_HARD_TTL — загружается заново
+CACHE_SOFT_TTL        = 3600
+CACHE_HARD_TTL        = 24 * 3600
+CACHE_REFRESH_WORKERS = 4
+# Каталог для кэша загрузчиков на диске (core.cache.DiskBackend); None — в памяти
+LOADER_CACHE_DIR      = os.getenv("LOADER_CACHE_DIR")
+
+# Версия данных на бэкенде (core/version.py): кэш живёт до её смены
+DATA_VERSION_ENDPOINT = "/api/data_version"
+DATA_VERSION_HEADER   = "X-Data-Version"
+DATA_VERSION_POLL     = 60
+
+# Предохранитель запросов к бэкенду (circuit.py): после CIRCUIT_FAILURES
+# сбоев подряд группа эндпоинтов отключается на CIRCUIT_COOLDOWN секунд.
+# Ответ дольше CIRCUIT_SLOW_CALL секунд тоже считается сбоем.
+CIRCUIT_FAILURES  = 3
+CIRCUIT_COOLDOWN  = 30
+CIRCUIT_SLOW_CALL = 10
+CONNECT_TIMEOUT   = 5
+
+# Декодирование ответов API (core/decode.py): orjson, если установлен;
+# {"data": [...]} от DECODE_STREAM_MIN байт — потоково (ijson) сразу в колонки,
+# по DECODE_CHUNK строк за раз
+DECODE_STREAM_MIN = 8 * 1024 * 1024
+DECODE_CHUNK      = 65536
+
+# Сжатие ответов API (core/transport.py): кодеки в порядке предпочтения —
+# в Accept-Encoding попадают только те, что установлены (gzip есть всегда)
+API_ENCODINGS = [e.strip() for e in os.getenv("API_ENCODINGS", "zstd,br,gzip").split(",") if e.strip()]
+# Колоночный формат кадров (core/columnar.py): клиент просит заголовком,
+# бэкенд, который его не знает, отвечает обычным {"data": [...]}
+FRAME_FORMAT_HEADER = "X-Frame-Format"
+API_COLUMNAR        = os.getenv("API_COLUMNAR", "1") == "1"
+
+# Последние удачные ответы API (core/last_good.py) — на случай недоступности бэкенда;
+# LAST_GOOD_PENDING — сколько ключей может ждать записи на диск (сверх — не пишем)
+LAST_GOOD_DIR = os.getenv(
+    "LAST_GOOD_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "last_good"),
+)
+LAST_GOOD_PENDING = 32
+
+# Снимки дашборда (core/snapshot.py): каталог и сколько снимков держать открытыми
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "snapshots"),
+)
+SNAPSHOT_OPEN = 64
+
+# Фоновые задачи оптимизации (jobs.py)
+JOB_WORKERS = 2
+JOB_HISTORY = 50
+
+# Кэш результатов оптимизации (result_cache.py); RESULT_CACHE_DIR — копия на диске.
+# Без версии данных результат живёт по срокам, как кэш загрузчиков: после
+# RESULT_SOFT_TTL отдаётся и пересчитывается в фоне, после RESULT_HARD_TTL — выбрасывается
+RESULT_CACHE_SIZE      = 256
+RESULT_SOFT_TTL        = CACHE_SOFT_TTL
+RESULT_HARD_TTL        = CACHE_HARD_TTL
+RESULT_CACHE_DIR       = os.getenv("RESULT_CACHE_DIR")
+RESULT_CACHE_DISK_SIZE = 5000
+
+# Технический анализ: периоды графика и настройки индикаторов
+PERIODS = ['1D', '1W', '1M', '6M', '1Y', 'ALL']
+EMA_SETTINGS = {
+    '1D' : (20, 100),
+    '1W' : (20, 50),
+    '1M' : (10, 30),
+    '6M' : (20, 60),
+    '1Y' : (10, 30),
+    'ALL': (10, 30),
+}
+BOLLINGER_WINDOW = 20
+BOLLINGER_DEV    = 2
+# Вычислительные ядра (core/kernels.py): Numba, если установлена; KERNELS_NUMBA=0 —
+# всегда NumPy
+KERNELS_NUMBA    = os.getenv("KERNELS_NUMBA", "1") == "1"
+
+# Свечи окнами (core/candles.py): для периодов короче ALL запрашиваем только
+# [начало показа − разогрев, сейчас]. Разогрев — CANDLE_WARMUP_FACTOR самых
+# длинных окон индикаторов (EMA с adjust=False за 3 окна забывает начало
+# до ~0.25%); CANDLE_GAP_FACTOR — запас календарного времени на ночи и
+# выходные. CANDLE_INTERVAL — шаг сырых свечей API, CANDLE_STORE_SIZE —
+# сколько бумаг держать в локальном хранилище свечей. Время свечей и
+# параметры start / end бэкенд отдаёт и читает без пояса, в API_TIMEZONE —
+# «сейчас» для окна берём в нём же
+CANDLE_WARMUP_FACTOR = 3
+CANDLE_GAP_FACTOR    = 3
+CANDLE_INTERVAL      = '1h'
+CANDLE_STORE_SIZE    = 64
+API_TIMEZONE         = os.getenv("API_TIMEZONE", "Europe/Moscow")
+
+# Предзагрузка соседних тикеров и периодов (data/prefetch.py):
+# не больше PREFETCH_BUDGET задач на сессию за PREFETCH_BUDGET_WINDOW секунд
+PREFETCH_WORKERS       = 2
+PREFETCH_BUDGET        = 12
+PREFETCH_BUDGET_WINDOW = 60
+
+# Параметры страницы оптимизации по умолчанию — с ними же precompute.py
+# заранее считает границу и корреляции
+OPT_LOOKBACK_DAYS = 365
+OPT_RF_RATE       = 0.16
+OPT_MIN_WEIGHT    = 0.0
+OPT_MAX_WEIGHT    = 0.40
+FRONTIER_POINTS   = 40
+FRONTIER_RANDOM   = 2000
+
+# Профилирование прогонов страниц (profiling.py): PROFILE_PAGES=1 — для всех,
+# иначе администратор включает его параметром ?profile=1. Храним PROFILE_HISTORY
+# последних профилей на страницу; PROFILE_BACKEND — pyinstrument или cprofile
+PROFILE_PAGES    = os.getenv("PROFILE_PAGES") == "1"
+PROFILE_BACKEND  = os.getenv("PROFILE_BACKEND", "pyinstrument")
+PROFILE_HISTORY  = 20
+PROFILE_INTERVAL = 0.001
+PROFILE_TOP      = 40
+
+# Учёт памяти (memory.py): бюджеты в байтах по пространствам имён.
+# results — кэш результатов оптимизации: сверх бюджета записи уходят на диск
+# (gzip в MEMORY_SPILL_DIR) и читаются обратно при обращении; loaders — кэш
+# загрузчиков в памяти: сверх бюджета выбрасываются самые старые записи;
+# session — сессия пользователя: превышение только показывается на мониторинге.
+# MEMORY_TRACE=1 — раз в MEMORY_TRACE_INTERVAL секунд снимок tracemalloc
+MB = 1024 * 1024
+MEMORY_BUDGETS = {
+    "results": int(os.getenv("MEMORY_RESULTS_MB", "256")) * MB,
+    "loaders": int(os.getenv("MEMORY_LOADERS_MB", "512")) * MB,
+    "session": int(os.getenv("MEMORY_SESSION_MB", "16")) * MB,
+}
+MEMORY_SPILL_DIR       = os.getenv(
+    "MEMORY_SPILL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "spill"),
+)
+MEMORY_SPILL_FILES     = 2000
+MEMORY_SESSION_TTL     = 3600
+MEMORY_TRACE           = os.getenv("MEMORY_TRACE") == "1"
+MEMORY_TRACE_INTERVAL  = 60
+MEMORY_TRACE_FRAMES    = 10
+MEMORY_TRACE_TOP       = 20
+MEMORY_TRACE_HISTORY   = 60
+
+# Оптимизация фигур Plotly (components/charts.py → optimize_figure): больше
+# WEBGL_THRESHOLD точек в линии/облаке — все Scatter фигуры рисуются WebGL
+FIGURE_OPTIMIZE = os.getenv("FIGURE_OPTIMIZE", "1") == "1"
+WEBGL_THRESHOLD = 1000
@@ -0,0 +1,8 @@
+"""
+Загрузка, подготовка данных и расчёты без Streamlit.
+
+Модули core не импортируют streamlit и не читают st.session_state:
+учётные данные передаются явно (client.Credentials), ошибки — исключениями.
+Их можно вызывать из пула процессов, пакетных задач и бенчмарков;
+страницы ходят в них через тонкие обёртки data/* и db.py.
+"""
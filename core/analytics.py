@@ -0,0 +1,104 @@
+# core/analytics.py
+"""
+Расчёты поверх загруженных данных — без Streamlit и без сети:
+карточки «сегодня», технические индикаторы, Монте-Карло VaR, просадка.
+Циклы по времени — в core.kernels (Numba, если установлена).
+"""
+import numpy as np
+import pandas as pd
+
+from constants import EMA_SETTINGS, BOLLINGER_WINDOW, BOLLINGER_DEV
+from core import kernels
+
+
+def portfolio_today(df: pd.DataFrame) -> dict:
+    """Метрики за сегодня/вчера из portfolio_metrics() для карточек"""
+    today     = df.iloc[-1]
+    yesterday = df.iloc[-2]
+
+    value_today       = today['total_amount']
+    invested_today    = today['fact_amount']
+    proffit           = today['expected_yield']
+    diff_total_amount = today['total_amount'] - yesterday['total_amount']
+    return_today      = (value_today / invested_today - 1) * 100
+    return_yesterday  = (
+        yesterday['total_amount'] / yesterday['fact_amount'] - 1
+    ) * 100
+    delta_return      = return_today - return_yesterday
+
+    return {
+        'value_today':       value_today,
+        'invested_today':    invested_today,
+        'proffit':           proffit,
+        'return_today':      return_today,
+        'delta_return':      delta_return,
+        'diff_total_amount': diff_total_amount,
+    }
+
+
+def compute_indicators(df_full: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    EMA и полосы Боллинджера по полной истории (индекс — как у df_full).
+    Те же формулы, что в ta (ewm adjust=False, std ddof=0), через core.kernels.
+    """
+    close = df_full['close'].to_numpy(dtype=np.float64)
+    ema_fast, ema_slow = EMA_SETTINGS.get(period, (20, 100))
+
+    mid, std = kernels.rolling_mean_std(close, BOLLINGER_WINDOW)
+    return pd.DataFrame({
+        'EMA_fast': kernels.ema(close, ema_fast),
+        'EMA_slow': kernels.ema(close, ema_slow),
+        'BB_High':  mid + BOLLINGER_DEV * std,
+        'BB_Low':   mid - BOLLINGER_DEV * std,
+        'BB_Mid':   mid,
+    }, index=df_full.index)
+
+
+def monte_carlo(close: pd.Series, num_simulations: int = 1000,
+                confidence_level: float = 0.95, seed: int = 42) -> tuple:
+    """
+    Однодневный P&L по логнормальной модели на дневных close.
+    Возвращает (pl, threshold, var_value, last_price).
+    Генератор свой на каждый вызов (не глобальный np.random.seed):
+    одновременные сессии не мешают друг другу, результат воспроизводим.
+    """
+    returns    = np.log(close / close.shift(1)).dropna()
+    mu         = returns.mean()
+    sigma      = returns.std()
+    last_price = close.iloc[-1]
+
+    rng         = np.random.default_rng(seed)
+    sim_returns = rng.normal(mu, sigma, num_simulations)
+    sim_prices  = last_price * np.exp(sim_returns)
+    pl          = sim_prices - last_price
+
+    threshold = np.percentile(pl, (1 - confidence_level) * 100)
+    var_value = -threshold
+    return pl, threshold, var_value, last_price
+
+
+def drawdown(series: pd.Series) -> pd.Series:
+    """Просадка от исторического максимума, %"""
+    dd, _ = kernels.drawdown(series.to_numpy(dtype=np.float64))
+    return pd.Series(dd, index=series.index, name=series.name)
+
+
+def drawdown_stats(series: pd.Series) -> dict:
+    """
+    Худшая просадка: глубина (%), пик, дно и восстановление (метки индекса;
+    None — не восстановилась), плюс самый долгий период ниже максимума в барах.
+    """
+    dd, duration = kernels.drawdown(series.to_numpy(dtype=np.float64))
+    if np.isnan(dd).all():
+        return {'max_drawdown': np.nan, 'peak': None, 'trough': None,
+                'recovery': None, 'longest': 0}
+    trough    = int(np.nanargmin(dd))
+    peak      = trough - int(duration[trough])
+    recovered = np.flatnonzero(duration[trough:] == 0)
+    return {
+        'max_drawdown': float(dd[trough]),
+        'peak':         series.index[peak],
+        'trough':       series.index[trough],
+        'recovery':     series.index[trough + recovered[0]] if len(recovered) else None,
+        'longest':      int(duration.max()),
+    }
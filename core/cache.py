@@ -0,0 +1,241 @@
+# core/cache.py
+"""
+Хранилища для кэша загрузчиков — без Streamlit.
+
+Значения хранятся в «Arrow-виде» (to_arrow): DataFrame-ы — как
+pa.Table (категориальные колонки из core.schema — словарём, прочие
+строки — как есть, чтобы dtype у страниц не менялся), ndarray — read-only. Наружу
+они отдаются через from_arrow без копирования числовых колонок.
+
+Бэкенды взаимозаменяемы (get / set / delete / clear / purge_expired):
+  MemoryBackend — словарь в процессе (по умолчанию);
+  DiskBackend   — файл на ключ в каталоге, переживает перезапуск и
+                  виден другим процессам (пакетный пересчёт, пул процессов).
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import memory
+import telemetry
+
+
+class _FrameBox:
+    """Фрейм, который не удалось перевести в Arrow — отдаём копию."""
+    __slots__ = ('df',)
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+
+def _frame_to_table(df: pd.DataFrame):
+    # category → dictionary и обратно Arrow делает сам; обычные строковые
+    # колонки не кодируем: to_pandas вернул бы их Categorical, с другим
+    # порядком сортировки и предупреждениями groupby
+    try:
+        return pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return _FrameBox(df)
+
+
+def to_arrow(value):
+    """
+    Готовит результат загрузчика к хранению в кэше:
+    DataFrame → pa.Table, ndarray → read-only, контейнеры — рекурсивно.
+    """
+    if isinstance(value, pd.DataFrame):
+        return _frame_to_table(value)
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return value
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return type(value)(*(to_arrow(v) for v in value))
+    if isinstance(value, (tuple, list)):
+        return type(value)(to_arrow(v) for v in value)
+    if isinstance(value, dict):
+        return {k: to_arrow(v) for k, v in value.items()}
+    return value
+
+
+def from_arrow(value):
+    """Обратное преобразование: pa.Table → DataFrame без копии числовых колонок."""
+    if isinstance(value, pa.Table):
+        return value.to_pandas(split_blocks=True)
+    if isinstance(value, _FrameBox):
+        return value.df.copy()
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return type(value)(*(from_arrow(v) for v in value))
+    if isinstance(value, (tuple, list)):
+        return type(value)(from_arrow(v) for v in value)
+    if isinstance(value, dict):
+        return {k: from_arrow(v) for k, v in value.items()}
+    return value
+
+
+def cache_key(name: str, data_version: str | None, args: tuple = (), kwargs: dict = None) -> tuple:
+    """Ключ записи загрузчика: имя, версия данных, аргументы."""
+    return name, data_version, args, tuple(sorted((kwargs or {}).items()))
+
+
+class Entry:
+    """Значение в Arrow-виде + время загрузки (time.time) и срок жизни."""
+    __slots__ = ('value', 'fetched_at', 'hard_ttl')
+
+    def __init__(self, value, hard_ttl: int | None, fetched_at: float = None):
+        self.value      = value
+        self.hard_ttl   = hard_ttl
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def expired(self, now: float) -> bool:
+        return self.hard_ttl is not None and now - self.fetched_at >= self.hard_ttl
+
+
+class MemoryBackend:
+    """
+    Словарь в процессе. max_bytes — бюджет памяти: сверх него выбрасываются
+    записи с самой давней загрузкой (их загрузят заново при обращении).
+    """
+    persistent = False
+
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        self._entries  = {}
+        self._sizes    = {}
+        self._bytes    = 0
+
+    def _drop(self, key):
+        """Под self._lock."""
+        del self._entries[key]
+        self._bytes -= self._sizes.pop(key)
+
+    def get(self, key) -> Entry | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, entry: Entry):
+        size    = memory.deep_size(entry.value)
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._sizes[key]   = size
+            self._bytes       += size
+            while self.max_bytes is not None and self._bytes > self.max_bytes \
+                    and len(self._entries) > 1:
+                oldest = min((k for k in self._entries if k != key),
+                             key=lambda k: self._entries[k].fetched_at)
+                self._drop(oldest)
+                evicted += 1
+        if evicted:
+            telemetry.inc("memory_evict_total", evicted, namespace="loaders")
+
+    def delete(self, predicate):
+        """Удаляет записи, для ключей которых predicate(key) истинно."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._drop(key)
+
+    def purge_expired(self, now: float):
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.expired(now)]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def sizes(self) -> dict:
+        """Байты по загрузчикам (первый элемент ключа) — для memory.usage()."""
+        with self._lock:
+            result = {}
+            for key, size in self._sizes.items():
+                result[key[0]] = result.get(key[0], 0) + size
+            return result
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class DiskBackend:
+    """
+    Файл на ключ в directory: сначала pickle ключа, затем pickle Entry
+    (pa.Table внутри сериализуется в Arrow IPC, так что чтение быстрое).
+    Ключи должны иметь стабильный repr (строки, числа, кортежи, None).
+    Файлы старше max_age секунд удаляются при purge_expired.
+    """
+    persistent = True
+
+    def __init__(self, directory: str, max_age: int = 7 * 24 * 3600):
+        self.directory = directory
+        self.max_age   = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pkl")
+
+    def _files(self):
+        return [e for e in os.scandir(self.directory) if e.name.endswith(".pkl")]
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key) -> Entry | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                if pickle.load(f) != key:
+                    return None
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def set(self, key, entry: Entry):
+        path = self._path(key)
+        tmp  = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(key,   f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def delete(self, predicate):
+        """Удаляет записи, для ключей которых predicate(key) истинно (читает только ключи)."""
+        for file in self._files():
+            try:
+                with open(file.path, "rb") as f:
+                    key = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                continue
+            if predicate(key):
+                self._remove(file.path)
+
+    def purge_expired(self, now: float):
+        """Без чтения файлов: просроченные записи перезапишутся при загрузке."""
+        for file in self._files():
+            if now - file.stat().st_mtime >= self.max_age:
+                self._remove(file.path)
+
+    def clear(self):
+        for file in self._files():
+            self._remove(file.path)
+
+    def sizes(self) -> dict:
+        """Записи на диске памяти процесса не занимают."""
+        return {}
+
+    def __len__(self) -> int:
+        return len(self._files())
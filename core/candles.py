@@ -0,0 +1,133 @@
+# core/candles.py
+"""
+Локальное хранилище сырых свечей — без Streamlit.
+
+Для коротких периодов графику нужна не вся история, а окно показа плюс
+разогрев индикаторов (warmup_bars): EMA и полосам Боллинджера нужно
+несколько своих окон истории до первой показанной свечи. CandleStore
+держит по каждой бумаге один фрейм сырых свечей и догружает из API
+только недостающее:
+  хвост  — от последней известной свечи (она могла быть неполной);
+  голову — от нужного начала до начала известного.
+Окна сливаются (одинаковое время — берём свежий ответ), так что
+переход 1D → 1W → 1M докачивает только разницу.
+
+fetch(start, end) — запрос свечей [start, end); None — без границы.
+Время — наивное, в поясе бэкенда (API_TIMEZONE), как в ответах API.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from constants import (
+    EMA_SETTINGS, BOLLINGER_WINDOW, CANDLE_WARMUP_FACTOR, CANDLE_GAP_FACTOR,
+    CANDLE_STORE_SIZE, API_TIMEZONE,
+)
+
+
+def warmup_bars(period: str) -> int:
+    """Сколько свечей периода нужно до начала показа, чтобы индикаторы разогрелись."""
+    longest = max(*EMA_SETTINGS.get(period, (20, 100)), BOLLINGER_WINDOW)
+    return CANDLE_WARMUP_FACTOR * longest
+
+
+def window_span(period_delta: pd.Timedelta, bar: pd.Timedelta, period: str) -> pd.Timedelta:
+    """
+    Календарная длина окна: показ + разогрев с запасом на пропуски —
+    внутри дня это ночи и выходные (CANDLE_GAP_FACTOR), у дневных свечей —
+    только выходные и праздники, у недельных пропусков нет.
+    """
+    if bar < pd.Timedelta(days=1):
+        gaps = CANDLE_GAP_FACTOR
+    elif bar < pd.Timedelta(weeks=1):
+        gaps = 1.5
+    else:
+        gaps = 1.0
+    return period_delta + bar * warmup_bars(period) * gaps
+
+
+def backend_now() -> pd.Timestamp:
+    """Текущее время в поясе бэкенда, без пояса — как время свечей."""
+    return pd.Timestamp.now(tz=API_TIMEZONE).tz_localize(None)
+
+
+def _merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    if old is None or old.empty:
+        return new.sort_index()
+    if new.empty:
+        return old
+    df = pd.concat([old, new])
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+class _Series:
+    """Свечи одной бумаги: фрейм и начало, с которого история уже запрошена."""
+    __slots__ = ('df', 'covered', 'lock')
+
+    def __init__(self):
+        self.df      = None
+        self.covered = None     # None — ещё ничего; pd.NaT — вся история
+        self.lock    = threading.Lock()
+
+
+class CandleStore:
+    def __init__(self, max_series: int = CANDLE_STORE_SIZE):
+        self.max_series = max_series
+        self._lock      = threading.Lock()
+        self._series    = OrderedDict()
+
+    def _get(self, figi: str) -> _Series:
+        with self._lock:
+            series = self._series.get(figi)
+            if series is None:
+                series = self._series[figi] = _Series()
+            self._series.move_to_end(figi)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+            return series
+
+    def window(self, fetch, figi: str, span: pd.Timedelta) -> pd.DataFrame:
+        """
+        Сырые свечи за span до последней свечи (или вся история, если она короче).
+        Одновременные запросы одной бумаги ждут друг друга, разных — нет.
+        """
+        series = self._get(figi)
+        with series.lock:
+            if series.df is None:
+                start = backend_now().floor('min') - span
+                df    = fetch(start, None)
+                if df.empty:
+                    # Торгов в окне не было (бумага не торгуется, данные отстают) —
+                    # берём всё, что есть
+                    df, series.covered = fetch(None, None), pd.NaT
+                else:
+                    # Запрошено с start: пропуск торгов в начале окна
+                    # повторно не докачиваем
+                    series.covered = start
+                series.df = df.sort_index()
+            else:
+                series.df = _merge(series.df, fetch(series.df.index.max(), None))
+
+            if series.df.empty:
+                return series.df
+
+            need = series.df.index.max() - span
+            if series.covered is not pd.NaT and need < series.covered:
+                head = fetch(need, series.covered)
+                series.df      = _merge(series.df, head)
+                series.covered = need
+            return series.df[series.df.index >= need]
+
+    def sizes(self) -> dict:
+        """Байты по бумагам — для memory.usage()."""
+        with self._lock:
+            items = list(self._series.items())
+        return {
+            figi: int(series.df.memory_usage(deep=True).sum())
+            for figi, series in items if series.df is not None
+        }
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
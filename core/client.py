@@ -0,0 +1,180 @@
+# core/client.py
+"""
+HTTP-клиент бэкенда без Streamlit.
+
+Учётные данные передаются явно (Credentials), ошибки — исключениями:
+Unauthorized на 401, requests.HTTPError на прочие ошибки ответа,
+requests.ConnectionError / Timeout, circuit.CircuitOpen, если группа
+эндпоинтов отключена предохранителем. Что показать пользователю,
+решает вызывающий код (для страниц — db.py).
+
+Ответы запрашиваются сжатыми (core.transport: zstd / br / gzip) и, для
+кадров, в колоночном формате (core.columnar); бэкенд, который этого не
+умеет, отвечает как раньше. Тело разбирает core.decode.
+"""
+import time
+from typing import NamedTuple
+
+import pandas as pd
+import requests
+import urllib3
+
+import profiling
+import telemetry
+from circuit import CircuitOpen, breaker_for
+from constants import CONNECT_TIMEOUT, API_COLUMNAR, FRAME_FORMAT_HEADER
+from core import decode, transport
+from core.schema import get_schema
+from core.version import version_from_headers
+
+
+class Credentials(NamedTuple):
+    token:   str | None
+    user_id: int | None
+
+
+class Unauthorized(Exception):
+    """API ответил 401 — токен истёк или недействителен."""
+
+
+def login(base_url: str, username: str, password: str, timeout: int = 30) -> Credentials:
+    """POST /api/login → Credentials. Неверный логин/пароль — Unauthorized."""
+    response = requests.post(
+        f"{base_url.rstrip('/')}/api/login",
+        json={"username": username, "password": password},
+        timeout=(CONNECT_TIMEOUT, timeout),
+    )
+    if response.status_code != 200:
+        raise Unauthorized(username)
+    data = response.json()
+    return Credentials(data["access_token"], data["user_id"])
+
+
+def _read_body(response: requests.Response) -> bytes:
+    """
+    Тело как пришло по сети. Ошибки urllib3 при чтении (обрыв, таймаут
+    посреди тела) — в исключения requests, как у ошибок до заголовков.
+    """
+    try:
+        return response.raw.read(decode_content=False)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e, response=response) from e
+    except (urllib3.exceptions.HTTPError, OSError) as e:
+        raise requests.exceptions.ConnectionError(e, response=response) from e
+
+
+class ApiClient:
+    def __init__(self, base_url: str, credentials: Credentials, timeout: int = 30):
+        self.base_url    = base_url.rstrip("/")
+        self.credentials = credentials
+        self.timeout     = timeout
+
+    def probe(self) -> bool:
+        """Проверка предохранителя: бэкенд отвечает хоть чем-то, кроме 5xx."""
+        response = requests.get(f"{self.base_url}/", timeout=CONNECT_TIMEOUT)
+        return response.status_code < 500
+
+    def _headers(self, frame: bool) -> dict:
+        headers = {
+            "Authorization":   f"Bearer {self.credentials.token}",
+            "Accept-Encoding": transport.accept_encoding(),
+        }
+        # Колоночный формат — только для кадров {"data": [...]} (get_frame)
+        if frame and API_COLUMNAR:
+            headers[FRAME_FORMAT_HEADER] = "columnar"
+        return headers
+
+    # ────────────────────────────────────────────────────────
+    # HTTP-запрос с замерами: время до заголовков, скачивание тела,
+    # разжатие, байты по сети и после разжатия, статус. Декодирование меряет вызывающий код.
+    # Через предохранитель: если группа эндпоинтов отключена — CircuitOpen
+    # сразу, без ожидания таймаута.
+    # ────────────────────────────────────────────────────────
+    def request(self, method: str, endpoint: str, timeout: int = None,
+                frame: bool = False, **kwargs) -> requests.Response:
+        label   = telemetry.endpoint_label(endpoint)
+        breaker = breaker_for(endpoint, self.probe)
+        if not breaker.allow():
+            telemetry.inc("api_requests_total", endpoint=label, status="circuit_open")
+            raise CircuitOpen(breaker.group)
+
+        read_timeout = timeout or self.timeout
+        # Явный таймаут длиннее обычного — долгий по природе вызов
+        # (оптимизация, бэктест): медленный ответ для него не сбой
+        check_slow   = read_timeout <= self.timeout
+        status = "error"
+        ok     = False
+        start  = time.perf_counter()
+        try:
+            response = requests.request(
+                method,
+                f"{self.base_url}{endpoint}",
+                headers=self._headers(frame),
+                timeout=(CONNECT_TIMEOUT, read_timeout),
+                stream=True,
+                **kwargs,
+            )
+            status = str(response.status_code)
+            version_from_headers(response.headers)
+
+            # elapsed — от отправки до разбора заголовков (DNS + connect + TTFB)
+            telemetry.observe("api_request_seconds", response.elapsed.total_seconds(),
+                              endpoint=label, phase="ttfb")
+            download = time.perf_counter()
+            wire     = _read_body(response)
+            telemetry.observe("api_request_seconds", time.perf_counter() - download,
+                              endpoint=label, phase="download")
+            encoding = response.headers.get("Content-Encoding") or transport.IDENTITY
+            with telemetry.span("api_request_seconds", endpoint=label, phase="decompress"):
+                try:
+                    body = transport.decompress(wire, encoding)
+                except Exception as e:
+                    # Обрезанное или испорченное тело — сбой передачи
+                    raise requests.exceptions.ConnectionError(e, response=response) from e
+            # Успех для предохранителя — только когда тело получено целиком
+            ok = response.status_code < 500
+            # Тело уже прочитано из сокета — отдаём его через response.content
+            response._content = body
+            telemetry.observe("api_response_bytes", len(body),
+                              buckets=telemetry.SIZE_BUCKETS, endpoint=label)
+            telemetry.inc("api_bytes_total", len(wire),
+                          endpoint=label, encoding=encoding, stage="wire")
+            telemetry.inc("api_bytes_total", len(body),
+                          endpoint=label, encoding=encoding, stage="decoded")
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            breaker.record(ok, elapsed, check_slow)
+            telemetry.observe("api_request_seconds", elapsed,
+                              endpoint=label, phase="total")
+            telemetry.inc("api_requests_total", endpoint=label, status=status)
+
+    def _json(self, method: str, endpoint: str, timeout: int = None, **kwargs):
+        label = telemetry.endpoint_label(endpoint)
+        with profiling.tag("api", label):
+            response = self.request(method, endpoint, timeout, **kwargs)
+        if response.status_code == 401:
+            raise Unauthorized(endpoint)
+        response.raise_for_status()
+        with telemetry.span("api_request_seconds", endpoint=label, phase="decode"), \
+             profiling.tag("decode", label):
+            return decode.loads(response.content)
+
+    def get_json(self, endpoint: str, params: dict = None, timeout: int = None) -> dict:
+        return self._json("GET", endpoint, timeout, params=params or {})
+
+    def post_json(self, endpoint: str, payload: dict = None, timeout: int = 120) -> dict:
+        return self._json("POST", endpoint, timeout, json=payload or {})
+
+    def get_frame(self, endpoint: str, params: dict = None) -> pd.DataFrame:
+        """GET + декодирование {"data": [...]} в DataFrame с типами из core.schema."""
+        label = telemetry.endpoint_label(endpoint)
+        with profiling.tag("api", label):
+            response = self.request("GET", endpoint, params=params or {}, frame=True)
+        if response.status_code == 401:
+            raise Unauthorized(endpoint)
+        response.raise_for_status()
+        with telemetry.span("api_request_seconds", endpoint=label, phase="decode"), \
+             profiling.tag("decode", label):
+            columnar = response.headers.get(FRAME_FORMAT_HEADER) == "columnar"
+            return decode.decode_frame(response.content, get_schema(endpoint), columnar)
@@ -0,0 +1,103 @@
+# core/columnar.py
+"""
+Колоночный формат кадров — без Streamlit.
+
+{"data": [{...}, ...]} повторяет имена колонок в каждой строке, а время
+и цены свечей — длинные числа, которые от строки к строке почти не
+меняются. Колоночный ответ (заголовок X-Frame-Format: columnar):
+
+    {"length": 3, "columns": {
+        "time":   {"delta": [1735603200000, 3600000, 3600000], "unit": "ms"},
+        "close":  {"delta": [25031, -12, 7], "scale": 100},
+        "volume": {"delta": [120, 5, -30]},
+        "name":   {"values": ["a", "b", null]}
+    }}
+
+delta — первое значение и разности соседних; колонка восстанавливается
+накопленной суммой. Время — целые от эпохи UTC в единицах unit (ms или
+ns), дробные числа — целые в единицах 1/scale (наименьшая степень
+десяти до 10**MAX_DECIMALS, при которой значения восстанавливаются
+без потерь), целые — как есть. Колонки с пропусками и все прочие —
+values, как в обычном JSON.
+
+Шаг часовых свечей превращается в повтор одного числа, цены — в
+короткие целые: тело короче само по себе и в разы лучше сжимается.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+MAX_DECIMALS = 6
+
+# Целые до 2**53 float64 хранит точно
+_EXACT = 2 ** 53
+_NS_PER_MS = 1_000_000
+
+
+def _delta(ints: np.ndarray) -> list:
+    return np.diff(ints, prepend=0).tolist()
+
+
+def _scale(values: np.ndarray) -> int | None:
+    """Наименьшее 10**k, при котором values * 10**k — целые без потерь."""
+    for decimals in range(MAX_DECIMALS + 1):
+        scale  = 10 ** decimals
+        scaled = np.round(values * scale)
+        if np.abs(scaled).max() >= _EXACT:
+            return None
+        if np.array_equal(scaled / scale, values):
+            return scale
+    return None
+
+
+def _values(series: pd.Series) -> list:
+    # NaN → null, даты → ISO, как в обычном ответе
+    return json.loads(series.to_json(orient="values", date_format="iso"))
+
+
+def encode_column(series: pd.Series) -> dict:
+    if series.empty or series.isna().any():
+        return {"values": _values(series)}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        ints = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        if (ints % _NS_PER_MS == 0).all():
+            return {"delta": _delta(ints // _NS_PER_MS), "unit": "ms"}
+        return {"delta": _delta(ints), "unit": "ns"}
+    if pd.api.types.is_bool_dtype(series):
+        return {"values": _values(series)}
+    if pd.api.types.is_integer_dtype(series):
+        return {"delta": _delta(series.to_numpy(np.int64))}
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(np.float64)
+        scale  = _scale(values)
+        if scale is not None:
+            return {"delta": _delta(np.round(values * scale).astype(np.int64)), "scale": scale}
+    return {"values": _values(series)}
+
+
+def decode_column(spec: dict):
+    if "values" in spec:
+        return spec["values"]
+    ints = np.cumsum(np.asarray(spec["delta"], dtype=np.int64))
+    if "unit" in spec:
+        return pd.to_datetime(ints, unit=spec["unit"])
+    if "scale" in spec:
+        return ints / spec["scale"]
+    return ints
+
+
+def encode(df: pd.DataFrame) -> dict:
+    """DataFrame → колоночный ответ (для бэкенда и заглушки)."""
+    return {
+        "length":  len(df),
+        "columns": {str(name): encode_column(df[name]) for name in df.columns},
+    }
+
+
+def decode(payload: dict) -> pd.DataFrame:
+    """Колоночный ответ → DataFrame; типы по схеме — в core.schema."""
+    return pd.DataFrame(
+        {name: decode_column(spec) for name, spec in payload.get("columns", {}).items()},
+        index=pd.RangeIndex(payload.get("length", 0)),
+    )
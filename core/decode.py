@@ -0,0 +1,135 @@
+# core/decode.py
+"""
+Декодирование ответов API — без Streamlit.
+
+Бэкенд сериализует Decimal как число, date / datetime — как ISO-строку
+(так же, как CustomEncoder в db.py). Здесь это обратный путь: числа —
+float, даты остаются строками до core.schema, где колонки DATETIME
+разбираются одним вызовом pd.to_datetime.
+
+loads — JSON целиком: orjson, если установлен (в разы быстрее и без
+промежуточной str), иначе стандартный json.
+
+decode_frame — ответ {"data": [{...}, ...]} в DataFrame. Обычный путь —
+loads и DataFrame из списка словарей: на пике в памяти тело ответа, все
+строки словарями Python и сам фрейм. Для тел от DECODE_STREAM_MIN байт
+при установленном ijson массив data разбирается потоково: строки по
+одной раскладываются по колонкам, и каждые DECODE_CHUNK строк колонки
+схемы сворачиваются в массивы NumPy нужного типа. Словарей всех строк
+разом в памяти не бывает.
+
+Колоночный ответ (core.columnar, заголовок X-Frame-Format: columnar)
+потоково не разбирается: он и так в разы меньше и сразу по колонкам.
+"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from constants import DECODE_STREAM_MIN, DECODE_CHUNK
+from core.columnar import decode as decode_columnar
+from core.schema import DATETIME, CATEGORY, apply_schema
+
+try:
+    import orjson
+except ImportError:     # необязательная зависимость
+    orjson = None
+
+try:
+    import ijson
+except ImportError:     # необязательная зависимость
+    ijson = None
+
+
+def loads(body: bytes):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _numeric(values: list, dtype) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        # null или строка среди чисел → NaN, как pd.to_numeric(errors='coerce')
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype)
+
+
+class _Columns:
+    """Колонки, набираемые по строкам; колонки схемы сворачиваются кусками."""
+
+    def __init__(self, schema: dict | None):
+        self.schema  = schema or {}
+        self.buffer  = {}       # колонка → list значений текущего куска
+        self.chunks  = {}       # колонка → свёрнутые куски
+        self.rows    = 0        # всего строк
+        self.pending = 0        # строк в текущем куске
+        self._keys   = None
+
+    def _new_column(self, name: str):
+        """Колонка появилась не с первой строки — раньше в ней пропуски."""
+        self.buffer[name] = [None] * self.pending
+        folded = self.rows - self.pending
+        if folded:
+            self.chunks[name] = [self._fold(name, [None] * folded)]
+
+    def add(self, row: dict):
+        keys = row.keys()
+        if keys != self._keys:
+            for name in keys:
+                if name not in self.buffer:
+                    self._new_column(name)
+            self._keys = keys
+        for name, column in self.buffer.items():
+            column.append(row.get(name))
+        self.rows    += 1
+        self.pending += 1
+        if self.pending == DECODE_CHUNK:
+            self.flush()
+
+    def _fold(self, name: str, values: list):
+        dtype = self.schema.get(name)
+        if dtype is None or dtype == CATEGORY:
+            return values
+        if dtype == DATETIME:
+            return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce').to_numpy()
+        if dtype in ('float64', 'float32'):
+            return _numeric(values, dtype)
+        return values
+
+    def flush(self):
+        for name, values in self.buffer.items():
+            if values:
+                self.chunks.setdefault(name, []).append(self._fold(name, values))
+        self.buffer  = {name: [] for name in self.buffer}
+        self.pending = 0
+
+    def frame(self) -> pd.DataFrame:
+        self.flush()
+        columns = {}
+        for name, parts in self.chunks.items():
+            if all(isinstance(part, np.ndarray) for part in parts):
+                columns[name] = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            else:
+                columns[name] = [v for part in parts for v in part]
+        return pd.DataFrame(columns)
+
+
+def _stream_frame(body: bytes, schema: dict | None) -> pd.DataFrame:
+    columns = _Columns(schema)
+    for row in ijson.items(io.BytesIO(body), "data.item", use_float=True):
+        columns.add(row)
+    return columns.frame()
+
+
+def decode_frame(body: bytes, schema: dict | None = None,
+                 columnar: bool = False) -> pd.DataFrame:
+    """{"data": [...]} → DataFrame с типами из schema (core.schema.get_schema)."""
+    if columnar:
+        df = decode_columnar(loads(body))
+    elif ijson is not None and len(body) >= DECODE_STREAM_MIN:
+        df = _stream_frame(body, schema)
+    else:
+        df = pd.DataFrame(loads(body).get("data", []))
+    return apply_schema(df, schema)
@@ -0,0 +1,224 @@
+# core/forecast.py
+"""
+Прогноз динамики портфеля без Streamlit и без пересчёта всей истории.
+
+TrendForecaster     — линейный МНК на накопленных суммах (append за O(1)),
+                      опционально по скользящему окну.
+ExponentialSmoother — сглаживание Холта (уровень + тренд), тоже O(1) на точку.
+build_forecast      — собирает историю + прогноз в массивы NumPy.
+"""
+from collections import deque
+from statistics import NormalDist
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Forecast(NamedTuple):
+    """Тренд по истории + прогноз. Все массивы одной длины: n + horizon."""
+    dates:  np.ndarray   # datetime64[ns]
+    values: np.ndarray   # линия тренда / прогноза
+    lower:  np.ndarray   # нижняя граница доверительного интервала
+    upper:  np.ndarray   # верхняя граница доверительного интервала
+
+
+class TrendForecaster:
+    """
+    Линейный тренд y = a + b·x по достаточным статистикам
+    (n, Σx, Σy, Σx², Σxy, Σy²). x — порядковый номер точки.
+
+    window — если задан, тренд строится только по последним window точкам:
+    старая точка вычитается из сумм при добавлении новой.
+    """
+
+    def __init__(self, window: int | None = None):
+        self.window  = window
+        self._points = deque()
+        self._next_x = 0
+        self.n   = 0
+        self.sx  = 0.0
+        self.sy  = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        self.syy = 0.0
+
+    def _add(self, x: float, y: float, sign: int):
+        self.n   += sign
+        self.sx  += sign * x
+        self.sy  += sign * y
+        self.sxx += sign * x * x
+        self.sxy += sign * x * y
+        self.syy += sign * y * y
+
+    def append(self, y: float):
+        """Добавляет следующую точку ряда. Пропуски (NaN) двигают x, но не суммы."""
+        x = float(self._next_x)
+        self._next_x += 1
+        if not np.isfinite(y):
+            return
+
+        self._add(x, float(y), +1)
+        if self.window:
+            self._points.append((x, float(y)))
+            if len(self._points) > self.window:
+                self._add(*self._points.popleft(), -1)
+
+    def extend(self, values):
+        """Добавляет ряд целиком. Без окна суммы считаются векторно."""
+        values = np.asarray(values, dtype=float)
+        if self.window:
+            # В окно всё равно попадут только последние window точек
+            skip = max(len(values) - self.window, 0)
+            self._next_x += skip
+            for y in values[skip:]:
+                self.append(y)
+            return
+
+        x    = self._next_x + np.arange(len(values), dtype=float)
+        mask = np.isfinite(values)
+        x, y = x[mask], values[mask]
+
+        self._next_x += len(values)
+        self.n   += int(mask.sum())
+        self.sx  += x.sum()
+        self.sy  += y.sum()
+        self.sxx += (x * x).sum()
+        self.sxy += (x * y).sum()
+        self.syy += (y * y).sum()
+
+    def _centered(self):
+        sxx_c = self.sxx - self.sx * self.sx / self.n
+        sxy_c = self.sxy - self.sx * self.sy / self.n
+        syy_c = self.syy - self.sy * self.sy / self.n
+        return sxx_c, sxy_c, syy_c
+
+    def coefficients(self) -> tuple[float, float]:
+        """(slope, intercept). Для одной точки — горизонтальная линия."""
+        if self.n == 0:
+            return 0.0, float('nan')
+        sxx_c, sxy_c, _ = self._centered()
+        slope = sxy_c / sxx_c if self.n > 1 and sxx_c > 0 else 0.0
+        return slope, (self.sy - slope * self.sx) / self.n
+
+    def residual_std(self) -> float:
+        if self.n < 3:
+            return 0.0
+        sxx_c, sxy_c, syy_c = self._centered()
+        sse = syy_c - (sxy_c * sxy_c / sxx_c if sxx_c > 0 else 0.0)
+        return float(np.sqrt(max(sse, 0.0) / (self.n - 2)))
+
+    def predict(self, x) -> np.ndarray:
+        slope, intercept = self.coefficients()
+        return intercept + slope * np.asarray(x, dtype=float)
+
+    def interval(self, x, z: float) -> np.ndarray:
+        """Полуширина интервала прогноза для новой точки в x."""
+        x     = np.asarray(x, dtype=float)
+        sigma = self.residual_std()
+        if self.n < 3:
+            return np.zeros_like(x)
+        sxx_c, _, _ = self._centered()
+        x_mean = self.sx / self.n
+        lever  = (x - x_mean) ** 2 / sxx_c if sxx_c > 0 else 0.0
+        return z * sigma * np.sqrt(1 + 1 / self.n + lever)
+
+
+class ExponentialSmoother:
+    """
+    Линейное сглаживание Холта: уровень + тренд.
+    alpha — вес новой точки в уровне, beta — вес изменения уровня в тренде.
+    Дисперсия ошибок одношагового прогноза сглаживается с тем же alpha.
+    """
+
+    def __init__(self, alpha: float = 0.3, beta: float = 0.1):
+        self.alpha = alpha
+        self.beta  = beta
+        self.level = None
+        self.trend = 0.0
+        self.var   = 0.0
+        self.n     = 0
+
+    def one_step(self) -> float:
+        if self.level is None:
+            return float('nan')
+        return self.level + self.trend
+
+    def append(self, y: float):
+        if not np.isfinite(y):
+            # Пропуск — просто сдвигаем уровень по тренду
+            if self.level is not None:
+                self.level += self.trend
+            return
+
+        y = float(y)
+        self.n += 1
+        if self.level is None:
+            self.level = y
+            return
+
+        error      = y - self.one_step()
+        prev_level = self.level
+        self.level = self.alpha * y + (1 - self.alpha) * self.one_step()
+        self.trend = self.beta * (self.level - prev_level) + (1 - self.beta) * self.trend
+        self.var   = self.alpha * error * error + (1 - self.alpha) * self.var
+
+    def extend(self, values):
+        for y in np.asarray(values, dtype=float):
+            self.append(y)
+
+    def forecast(self, horizon: int) -> np.ndarray:
+        h = np.arange(1, horizon + 1, dtype=float)
+        return self.level + h * self.trend
+
+    def interval(self, horizon: int, z: float) -> np.ndarray:
+        """Полуширина интервала для h = 1..horizon (формула для метода Холта)."""
+        h     = np.arange(horizon, dtype=float)
+        steps = self.alpha ** 2 * (1 + h * self.beta) ** 2
+        steps[0] = 0.0
+        return z * np.sqrt(self.var) * np.sqrt(1 + np.cumsum(steps))
+
+
+def build_forecast(dates, values, horizon: int,
+                   method: str = 'linear',
+                   window: int | None = None,
+                   confidence: float = 0.95,
+                   alpha: float = 0.3,
+                   beta: float = 0.1) -> Forecast:
+    """
+    Тренд по истории + прогноз на horizon дней вперёд.
+
+    method — 'linear' (МНК, при window — по скользящему окну) или 'holt'.
+    Даты прогноза идут подряд по дням от последней даты истории.
+    """
+    dates  = np.asarray(dates, dtype='datetime64[ns]')
+    values = np.asarray(values, dtype=float)
+    n      = len(values)
+    z      = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    future_dates = dates[-1] + np.arange(1, horizon + 1) * np.timedelta64(1, 'D')
+    all_dates    = np.concatenate([dates, future_dates])
+
+    if method == 'holt':
+        model  = ExponentialSmoother(alpha=alpha, beta=beta)
+        fitted = np.empty(n)
+        for i, y in enumerate(values):
+            fitted[i] = model.one_step() if i else y
+            model.append(y)
+        future = model.forecast(horizon)
+        half   = np.concatenate([np.zeros(n), model.interval(horizon, z)])
+        line   = np.concatenate([fitted, future])
+    elif method == 'linear':
+        model = TrendForecaster(window=window)
+        model.extend(values)
+        x    = np.arange(n + horizon)
+        line = model.predict(x)
+        half = np.concatenate([np.zeros(n), model.interval(x[n:], z)])
+    else:
+        raise ValueError(f"Неизвестный метод прогноза: {method}")
+
+    return Forecast(
+        dates  = all_dates,
+        values = line,
+        lower  = line - half,
+        upper  = line + half,
+    )
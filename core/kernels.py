@@ -0,0 +1,203 @@
+# core/kernels.py
+"""
+Вычислительные ядра для индикаторов, просадок и бэктеста — без Streamlit.
+
+Рекурсии по времени (EMA, пик для просадки, дрейф весов между
+ребалансировками) не векторизуются, поэтому у каждого ядра две
+реализации с одинаковым результатом:
+  Numba — тот же цикл на Python, скомпилированный njit(cache=True):
+          компиляция один раз, дальше машинный код из __pycache__;
+          скользящее окно считается параллельно (prange);
+  NumPy — без Numba (или с KERNELS_NUMBA=0): EMA через ewm pandas,
+          окна через sliding_window_view, остальное — накопительными
+          функциями NumPy.
+USE_NUMBA выбирает реализацию; бенчмарки переключают его, чтобы
+сравнить оба пути.
+
+Все ядра принимают и возвращают массивы float64; NaN обрабатываются
+как в pandas (ewm(adjust=False), rolling(window).mean / std(ddof=0),
+cummax).
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from constants import KERNELS_NUMBA
+
+try:
+    import numba
+    from numba import prange
+except ImportError:     # необязательная зависимость
+    numba = None
+    prange = range
+
+USE_NUMBA = numba is not None and KERNELS_NUMBA
+
+
+def _jit(**options):
+    """njit с кэшем компиляции; без Numba — функция как есть."""
+    def wrap(fn):
+        if numba is None:
+            return fn
+        # error_model='numpy': деление на ноль — inf / NaN, как в NumPy
+        return numba.njit(cache=True, error_model='numpy', **options)(fn)
+    return wrap
+
+
+# ───────────── EMA ─────────────
+
+@_jit()
+def _ema_loop(values, alpha, min_periods, out):
+    # Алгоритм pandas ewm(adjust=False, ignore_na=False): пропуски не
+    # сбрасывают среднее, но старый вес за них затухает
+    n = values.shape[0]
+    if n == 0:
+        return
+    weighted = values[0]
+    nobs     = 1 if weighted == weighted else 0
+    out[0]   = weighted if nobs >= min_periods else np.nan
+    old_wt   = 1.0
+    for i in range(1, n):
+        cur    = values[i]
+        is_obs = cur == cur
+        if is_obs:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= 1.0 - alpha
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    """EMA со span=window, adjust=False, первые window-1 значений — NaN (как ta)."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    alpha  = 2.0 / (window + 1)
+    if USE_NUMBA:
+        out = np.empty_like(values)
+        _ema_loop(values, alpha, window, out)
+        return out
+    return (pd.Series(values).ewm(alpha=alpha, min_periods=window, adjust=False)
+            .mean().to_numpy())
+
+
+# ───────────── Скользящее окно ─────────────
+
+@_jit(parallel=True)
+def _rolling_loop(values, window, mean, std):
+    # Каждое окно — заново, двумя проходами: без накопленной ошибки
+    # скользящих сумм, а окна независимы и считаются параллельно
+    for i in prange(window - 1, values.shape[0]):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += values[j]
+        m  = total / window
+        ss = 0.0
+        for j in range(i - window + 1, i + 1):
+            d   = values[j] - m
+            ss += d * d
+        mean[i] = m
+        std[i]  = np.sqrt(ss / window)
+
+
+def rolling_mean_std(values: np.ndarray, window: int) -> tuple:
+    """(среднее, std с ddof=0) по окну window; до полного окна и с NaN в окне — NaN."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    mean   = np.full_like(values, np.nan)
+    std    = np.full_like(values, np.nan)
+    if values.shape[0] < window:
+        return mean, std
+    if USE_NUMBA:
+        _rolling_loop(values, window, mean, std)
+    else:
+        windows = sliding_window_view(values, window)
+        mean[window - 1:] = windows.mean(axis=1)
+        std[window - 1:]  = windows.std(axis=1)
+    return mean, std
+
+
+# ───────────── Просадка ─────────────
+
+@_jit()
+def _drawdown_loop(values, dd, duration):
+    peak   = np.nan
+    peak_i = 0
+    for i in range(values.shape[0]):
+        v = values[i]
+        if v == v and (peak != peak or v >= peak):
+            peak   = v
+            peak_i = i
+        dd[i]       = (v - peak) / peak * 100.0
+        duration[i] = i - peak_i
+
+
+def drawdown(values: np.ndarray) -> tuple:
+    """
+    (просадка от максимума, %; число баров от последнего максимума).
+    duration == 0 — значение на максимуме (просадка восстановлена).
+    """
+    values   = np.ascontiguousarray(values, dtype=np.float64)
+    dd       = np.empty_like(values)
+    duration = np.empty(values.shape[0], dtype=np.int64)
+    if USE_NUMBA:
+        _drawdown_loop(values, dd, duration)
+        return dd, duration
+    # fmax пропускает NaN, как cummax
+    peaks       = np.fmax.accumulate(values)
+    index       = np.arange(values.shape[0])
+    dd[:]       = (values - peaks) / peaks * 100.0
+    duration[:] = index - np.maximum.accumulate(np.where(values >= peaks, index, 0))
+    return dd, duration
+
+
+# ───────────── Ребалансировка ─────────────
+
+@_jit()
+def _rebalance_loop(returns, weights, every, equity):
+    n_assets = returns.shape[1]
+    value    = weights[0].copy()
+    k        = 0
+    for t in range(returns.shape[0]):
+        if every > 0 and t > 0 and t % every == 0:
+            k     = min(k + 1, weights.shape[0] - 1)
+            total = value.sum()
+            for j in range(n_assets):
+                value[j] = total * weights[k, j]
+        total = 0.0
+        for j in range(n_assets):
+            value[j] *= 1.0 + returns[t, j]
+            total    += value[j]
+        equity[t] = total
+
+
+def rebalance(returns: np.ndarray, weights: np.ndarray, every: int) -> np.ndarray:
+    """
+    Капитал (начальный 1.0) портфеля с ребалансировкой каждые every баров.
+
+    returns — доходности бумаг (бары × бумаги); weights — целевые веса:
+    одна строка на весь период или по строке на ребалансировку
+    (walk-forward; строка k — после k-й, последняя повторяется).
+    Между ребалансировками доли дрейфуют вместе с ценами; every=0 —
+    купить и держать.
+    """
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    weights = np.atleast_2d(np.ascontiguousarray(weights, dtype=np.float64))
+    equity  = np.empty(returns.shape[0])
+    if USE_NUMBA:
+        _rebalance_loop(returns, weights, every, equity)
+        return equity
+    # Внутри периода доли растут как накопленное произведение — цикл
+    # только по ребалансировкам
+    step  = every if every > 0 else max(returns.shape[0], 1)
+    value = weights[0].copy()
+    for k, start in enumerate(range(0, returns.shape[0], step)):
+        if start > 0:
+            value = value.sum() * weights[min(k, weights.shape[0] - 1)]
+        path  = value * np.cumprod(1.0 + returns[start:start + step], axis=0)
+        equity[start:start + step] = path.sum(axis=1)
+        value = path[-1]
+    return equity
@@ -0,0 +1,92 @@
+# core/last_good.py
+"""
+Последние удачные ответы API на диске.
+
+Каждый успешный api_get сохраняется в Arrow IPC (feather) в
+LAST_GOOD_DIR, ключ — эндпоинт, параметры и пользователь. Когда бэкенд
+недоступен (предохранитель разомкнут, ошибка соединения, 5xx), db.py
+отдаёт отсюда последние известные данные с пометкой «данные на ...».
+
+Запись идёт в фоне, чтобы не задерживать ответ. На ключ ждёт записи
+только последний ответ (новый заменяет ещё не записанный), ключей в
+ожидании — не больше LAST_GOOD_PENDING: сверх этого ответ не пишется.
+Ответ той же версии данных, что уже на диске, не пишется повторно.
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import telemetry
+from constants import LAST_GOOD_DIR, LAST_GOOD_PENDING
+from core import version
+
+_writer       = ThreadPoolExecutor(max_workers=1, thread_name_prefix="last-good")
+_lock         = threading.Lock()          # файлы на диске
+_pending_lock = threading.Lock()
+_pending      = {}      # ключ → (фрейм, версия данных), ждущие записи
+_saved        = {}      # ключ → версия данных записанного файла
+
+
+def _path(key) -> str:
+    digest = hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+    return os.path.join(LAST_GOOD_DIR, f"{digest}.arrow")
+
+
+def _write(key, df: pd.DataFrame) -> bool:
+    path = _path(key)
+    tmp  = f"{path}.tmp"
+    try:
+        os.makedirs(LAST_GOOD_DIR, exist_ok=True)
+        with _lock:
+            feather.write_feather(df, tmp, compression="zstd")
+            os.replace(tmp, path)
+        telemetry.inc("last_good_writes_total", result="ok")
+        return True
+    except (OSError, pa.ArrowException, ValueError, TypeError):
+        telemetry.inc("last_good_writes_total", result="error")
+        return False
+
+
+def _flush(key):
+    with _pending_lock:
+        df, data_version = _pending.pop(key)
+    if _write(key, df):
+        with _pending_lock:
+            _saved[key] = data_version
+
+
+def save(key, df: pd.DataFrame):
+    """Запомнить удачный ответ (копия — вызывающий код может менять фрейм)."""
+    data_version = version.latest()
+    with _pending_lock:
+        if data_version is not None and _saved.get(key) == data_version:
+            telemetry.inc("last_good_writes_total", result="unchanged")
+            return
+        queued = key in _pending
+        if not queued and len(_pending) >= LAST_GOOD_PENDING:
+            telemetry.inc("last_good_writes_total", result="dropped")
+            return
+        _pending[key] = (df.copy(), data_version)
+    if not queued:
+        _writer.submit(_flush, key)
+
+
+def load(key) -> tuple[pd.DataFrame, datetime] | None:
+    """(фрейм, время сохранения) или None, если на диске ничего нет."""
+    path = _path(key)
+    try:
+        with _lock:
+            df = feather.read_feather(path)
+            as_of = datetime.fromtimestamp(os.path.getmtime(path))
+    except (OSError, pa.ArrowException):
+        telemetry.inc("last_good_reads_total", result="miss")
+        return None
+    telemetry.inc("last_good_reads_total", result="hit")
+    return df, as_of
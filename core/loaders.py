@@ -0,0 +1,185 @@
+# core/loaders.py
+"""
+Загрузка и подготовка данных с бэкенда — без Streamlit и без кэша.
+
+Каждая функция принимает client — объект с get_frame(endpoint, params)
+(core.client.ApiClient или его обёртка для страниц в db.py) — и возвращает
+DataFrame / словарь. Кэширование и показ ошибок — забота вызывающего кода:
+data/* для страниц, пакетные задачи и бенчмарки.
+"""
+import pandas as pd
+
+from constants import (
+    FORECAST_DAYS, FORECAST_METHOD, FORECAST_WINDOW, FORECAST_CONFIDENCE, CANDLE_INTERVAL,
+)
+from core.candles import warmup_bars, window_span
+from core.forecast import build_forecast
+
+TICKER_MAP = {
+    'TCS20A107662': 'HEAD',
+    'TCS03A108X38': 'X5',
+    'BBG004S68473': 'IRAO',
+    'BBG004730N88': 'SBER',
+}
+
+TICKER_MAP_REVERSE = {v: k for k, v in TICKER_MAP.items()}
+
+
+# ───────────── Портфель ─────────────
+
+def portfolio_metrics(client) -> tuple:
+    """Основные метрики портфеля + прогноз тренда → (df, Forecast)"""
+    df = client.get_frame("/api/portfolio/metrics")
+
+    df['fact_amount'] = df['total_amount'] - df['expected_yield']
+
+    # Тренд + прогноз (массивы NumPy: даты datetime64, значения, границы)
+    forecast = build_forecast(
+        df['date'].to_numpy(),
+        df['total_amount'].to_numpy(),
+        horizon    = FORECAST_DAYS,
+        method     = FORECAST_METHOD,
+        window     = FORECAST_WINDOW,
+        confidence = FORECAST_CONFIDENCE,
+    )
+
+    return df, forecast
+
+
+def bar_money(client) -> pd.DataFrame:
+    """Распределение вложений по типам активов → для bar-chart"""
+    df = client.get_frame("/api/portfolio/bar_money")
+    return df.melt(id_vars=["nm"], var_name="активы", value_name="Вложено")
+
+
+def coupon_metrics(client) -> dict:
+    """Купонная доходность и данные для календаря выплат"""
+    suma_per   = client.get_frame("/api/portfolio/coupon_suma")
+    coupon_per = client.get_frame("/api/portfolio/coupon_amount")
+    df_coupons = client.get_frame("/api/portfolio/coupon_list")
+
+    suma_val   = float(suma_per.iloc[0, 0])   if not suma_per.empty   else 0.0
+    coupon_val = float(coupon_per.iloc[0, 0]) if not coupon_per.empty else 0.0
+
+    return {
+        'suma':       suma_val,
+        'coupon':     coupon_val,
+        'df_coupons': df_coupons,
+    }
+
+
+# ───────────── Активы пользователя ─────────────
+
+def donut_top(client) -> pd.DataFrame:
+    df = client.get_frame("/api/assets/donut_top")
+    return df.melt(id_vars=["nm"], var_name="Активы", value_name="По факту")
+
+
+def donut_detail(client) -> pd.DataFrame:
+    return client.get_frame("/api/assets/donut_detail")
+
+
+def top_alltime(client) -> pd.DataFrame:
+    return client.get_frame("/api/assets/top_alltime")
+
+
+def top_daily(client) -> pd.DataFrame:
+    return client.get_frame("/api/assets/top_daily")
+
+
+def market_comparison(client) -> pd.DataFrame:
+    return client.get_frame("/api/assets/market_comparison")
+
+
+def monthly_returns(client) -> pd.DataFrame:
+    return client.get_frame("/api/assets/monthly_returns")
+
+
+# ───────────── Рыночные данные (одинаковы для всех) ─────────────
+
+def candles_for_mc(client, figi: str) -> pd.DataFrame:
+    """Дневные close для Монте-Карло."""
+    df = client.get_frame(f"/api/market/candles_close/{figi}")
+    df = df.set_index('time')
+
+    df_daily = df['close'].resample('1D').last().dropna().to_frame()
+    return df_daily
+
+
+_CANDLE_RULES = {
+    '1D':  None,
+    '1W':  '4h',
+    '1M':  '1D',
+    '6M':  '1D',
+    '1Y':  '1W',
+    'ALL': '1W',
+}
+_CANDLE_PERIODS = {
+    '1D':  pd.Timedelta(days=1),
+    '1W':  pd.Timedelta(weeks=1),
+    '1M':  pd.Timedelta(days=30),
+    '6M':  pd.Timedelta(days=180),
+    '1Y':  pd.Timedelta(days=365),
+    'ALL': None,
+}
+_WINDOW_ATTEMPTS = 3
+
+
+def _aggregate(df: pd.DataFrame, rule: str | None) -> pd.DataFrame:
+    if not rule:
+        return df
+    return df.resample(rule).agg({
+        'open':   'first',
+        'high':   'max',
+        'low':    'min',
+        'close':  'last',
+        'volume': 'sum',
+    }).dropna()
+
+
+def candles(client, figi: str, period: str = '1D', store=None) -> tuple:
+    """
+    Свечи, агрегированные под период.
+    Возвращает (df_full, df_display).
+
+    store — core.candles.CandleStore: тогда для периодов короче ALL из API
+    берётся только окно показа с разогревом индикаторов, и df_full — это
+    окно, а не вся история. Без store — вся история, как раньше.
+    """
+    rule  = _CANDLE_RULES.get(period)
+    delta = _CANDLE_PERIODS.get(period)
+    endpoint = f"/api/market/candles/{figi}"
+
+    if store is None or delta is None:
+        df = _aggregate(client.get_frame(endpoint).set_index('time'), rule)
+    else:
+        def fetch(start, end):
+            params = {}
+            if start is not None:
+                params["start"] = start.isoformat()
+            if end is not None:
+                params["end"] = end.isoformat()
+            return client.get_frame(endpoint, params).set_index('time')
+
+        bar    = pd.Timedelta(rule or CANDLE_INTERVAL)
+        span   = window_span(delta, bar, period)
+        warmup = warmup_bars(period)
+        for _ in range(_WINDOW_ATTEMPTS):
+            df = _aggregate(store.window(fetch, figi, span), rule)
+            # Длинные праздники съели разогрев — расширяем окно
+            if df.empty or (df.index < df.index.max() - delta).sum() >= warmup:
+                break
+            span *= 2
+
+    df_full = df.copy()
+
+    # Обрезка по периоду
+    now = df.index.max()
+    df_display = df if delta is None else df[df.index >= now - delta]
+
+    return df_full, df_display
+
+
+def available_tickers(client) -> list:
+    df = client.get_frame("/api/market/tickers")
+    return sorted([TICKER_MAP.get(f, f) for f in df['figi']])
@@ -0,0 +1,97 @@
+# core/schema.py
+"""
+Типы колонок для ответов API — применяются один раз при декодировании
+в ApiClient.get_frame, чтобы загрузчики, графики и страницы не гоняли
+pd.to_numeric / pd.to_datetime по одним и тем же колонкам.
+
+float32 — только для процентов и долей (хватает 7 значащих цифр),
+деньги и цены остаются float64. Повторяющиеся строки — category.
+"""
+import pandas as pd
+
+DATETIME = 'datetime64[ns]'
+MONEY    = 'float64'
+PERCENT  = 'float32'
+RANK     = 'Int16'
+CATEGORY = 'category'
+
+# Ключ — путь эндпоинта. Ключ со слешем на конце — префикс
+# (для эндпоинтов с параметром в пути, например /candles/{figi}).
+SCHEMAS = {
+    "/api/portfolio/metrics": {
+        'date':           DATETIME,
+        'total_amount':   MONEY,
+        'expected_yield': MONEY,
+    },
+    "/api/portfolio/coupon_list": {
+        'payment_date': DATETIME,
+        'amount':       MONEY,
+        'name':         CATEGORY,
+    },
+    "/api/assets/donut_detail": {
+        'instrument_type': CATEGORY,
+        'amount':          MONEY,
+    },
+    "/api/assets/top_alltime": {
+        'end_yield_pct': PERCENT,
+        'rank_best':     RANK,
+        'rank_worst':    RANK,
+    },
+    "/api/assets/top_daily": {
+        'diff_pct':   PERCENT,
+        'rank_best':  RANK,
+        'rank_worst': RANK,
+    },
+    "/api/assets/market_comparison": {
+        'dt':           DATETIME,
+        'Мой портфель': PERCENT,
+        'Рынок':        PERCENT,
+    },
+    "/api/assets/monthly_returns": {
+        'monthly_return': PERCENT,
+        'month_name':     CATEGORY,
+        'year':           RANK,
+    },
+    "/api/market/candles/": {
+        'time':   DATETIME,
+        'open':   MONEY,
+        'high':   MONEY,
+        'low':    MONEY,
+        'close':  MONEY,
+        'volume': MONEY,
+    },
+    "/api/market/candles_close/": {
+        'time':  DATETIME,
+        'close': MONEY,
+    },
+}
+
+
+def get_schema(endpoint: str) -> dict | None:
+    """Схема для эндпоинта: точное совпадение или самый длинный префикс."""
+    schema = SCHEMAS.get(endpoint)
+    if schema is not None:
+        return schema
+
+    prefixes = [
+        key for key in SCHEMAS
+        if key.endswith('/') and endpoint.startswith(key)
+    ]
+    return SCHEMAS[max(prefixes, key=len)] if prefixes else None
+
+
+def apply_schema(df: pd.DataFrame, schema: dict | None) -> pd.DataFrame:
+    """Приводит колонки к типам схемы. Отсутствующие колонки пропускаются."""
+    if not schema or df.empty:
+        return df
+
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype == DATETIME:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        elif dtype == CATEGORY:
+            df[col] = df[col].astype(CATEGORY)
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return df
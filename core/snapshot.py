@@ -0,0 +1,218 @@
+# core/snapshot.py
+"""
+Снимки дашборда: всё, что нужно страницам пользователя, в готовом виде.
+
+Страницы каждый раз пересобирают одно и то же из ответов загрузчиков:
+fact_amount, melt для donut_top и bar_money, дельты «сегодня/вчера».
+Снимок делает это один раз на (пользователь, версия данных) и кладёт
+на диск каталогом:
+
+    SNAPSHOT_DIR/<user_id>/<хеш версии>/
+        manifest.json      — версия, время сборки, состав и скаляры
+        <имя>.arrow        — каждый фрейм в Arrow IPC без сжатия
+
+Фреймы читаются через memory map: числовые колонки не копируются в
+память процесса, а страницы ОС общие для всех процессов приложения.
+Снимок пишется во временный каталог и переименовывается целиком —
+читатель видит либо готовый снимок, либо никакого.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+import telemetry
+from core import analytics, loaders
+from core.cache import to_arrow
+from core.forecast import Forecast
+
+SNAPSHOT_FORMAT = 1
+MANIFEST        = "manifest.json"
+
+# Состав снимка — ключи dashboard()
+ITEMS = (
+    "portfolio", "forecast", "today", "coupons", "bar_money",
+    "donut_top", "donut_detail", "top_alltime", "top_daily",
+    "market_comparison", "monthly_returns",
+)
+
+
+def dashboard(portfolio_metrics: tuple, coupon_metrics: dict, bar_money: pd.DataFrame,
+              donut_top: pd.DataFrame, donut_detail: pd.DataFrame,
+              top_alltime: pd.DataFrame, top_daily: pd.DataFrame,
+              market_comparison: pd.DataFrame, monthly_returns: pd.DataFrame) -> dict:
+    """Готовые данные страниц из результатов загрузчиков (ключи — ITEMS)."""
+    df, forecast = portfolio_metrics
+    return {
+        "portfolio":         df,
+        "forecast":          forecast,
+        "today":             {k: float(v) for k, v in analytics.portfolio_today(df).items()},
+        "coupons":           coupon_metrics,
+        "bar_money":         bar_money,
+        "donut_top":         donut_top,
+        "donut_detail":      donut_detail,
+        "top_alltime":       top_alltime,
+        "top_daily":         top_daily,
+        "market_comparison": market_comparison,
+        "monthly_returns":   monthly_returns,
+    }
+
+
+def build(client) -> dict:
+    """Собрать данные снимка через client (core.client.ApiClient или обёртку)."""
+    return dashboard(
+        portfolio_metrics = loaders.portfolio_metrics(client),
+        coupon_metrics    = loaders.coupon_metrics(client),
+        bar_money         = loaders.bar_money(client),
+        donut_top         = loaders.donut_top(client),
+        donut_detail      = loaders.donut_detail(client),
+        top_alltime       = loaders.top_alltime(client),
+        top_daily         = loaders.top_daily(client),
+        market_comparison = loaders.market_comparison(client),
+        monthly_returns   = loaders.monthly_returns(client),
+    )
+
+
+# ────────────────────────────────────────────────────────
+# Запись
+# ────────────────────────────────────────────────────────
+
+def _user_dir(directory: str, user_id) -> str:
+    return os.path.join(directory, str(user_id))
+
+
+def _version_dir(directory: str, user_id, data_version: str) -> str:
+    digest = hashlib.sha1(str(data_version).encode()).hexdigest()[:16]
+    return os.path.join(_user_dir(directory, user_id), digest)
+
+
+def _write_table(path: str, table: pa.Table):
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _flatten(value, name: str, target: str, items: dict):
+    """Фреймы — в файлы, Forecast — во фрейм, остальное — скаляром в манифест."""
+    if isinstance(value, Forecast):
+        value = pd.DataFrame(value._asdict())
+        kind  = "forecast"
+    elif isinstance(value, pd.DataFrame):
+        kind = "frame"
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f"{name}.{key}", target, items)
+        return
+    else:
+        items[name] = {"kind": "value", "value": value}
+        return
+
+    table = to_arrow(value)
+    if not isinstance(table, pa.Table):
+        raise TypeError(f"{name}: фрейм не переводится в Arrow")
+    _write_table(os.path.join(target, f"{name}.arrow"), table)
+    items[name] = {"kind": kind, "file": f"{name}.arrow", "rows": table.num_rows}
+
+
+def write(directory: str, user_id, data_version: str, data: dict) -> str:
+    """Записать снимок (ключи — ITEMS) и убрать снимки прошлых версий пользователя."""
+    start    = time.perf_counter()
+    user_dir = _user_dir(directory, user_id)
+    final    = _version_dir(directory, user_id, data_version)
+    os.makedirs(user_dir, exist_ok=True)
+
+    target = tempfile.mkdtemp(dir=user_dir, prefix=".tmp-")
+    try:
+        items = {}
+        for name, value in data.items():
+            _flatten(value, name, target, items)
+        manifest = {
+            "format":       SNAPSHOT_FORMAT,
+            "user_id":      user_id,
+            "data_version": str(data_version),
+            "created_at":   time.time(),
+            "items":        items,
+        }
+        with open(os.path.join(target, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, default=str)
+        try:
+            os.rename(target, final)
+        except OSError:
+            # Такой снимок уже записал другой процесс
+            shutil.rmtree(target, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    for entry in os.scandir(user_dir):
+        if entry.is_dir() and entry.path != final and not entry.name.startswith(".tmp-"):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    telemetry.observe("snapshot_seconds", time.perf_counter() - start, phase="write")
+    return final
+
+
+# ────────────────────────────────────────────────────────
+# Чтение
+# ────────────────────────────────────────────────────────
+
+class Snapshot:
+    """Снимок на диске. Таблицы отображаются в память при первом обращении."""
+
+    def __init__(self, path: str, manifest: dict):
+        self.path         = path
+        self.manifest     = manifest
+        self.data_version = manifest["data_version"]
+        self._tables      = {}
+
+    def _table(self, name: str) -> pa.Table:
+        table = self._tables.get(name)
+        if table is None:
+            source = pa.memory_map(os.path.join(self.path, self.manifest["items"][name]["file"]))
+            table  = pa.ipc.open_file(source).read_all()
+            self._tables[name] = table
+        return table
+
+    def _item(self, name: str):
+        item = self.manifest["items"][name]
+        if item["kind"] == "value":
+            return item["value"]
+        df = self._table(name).to_pandas(split_blocks=True)
+        if item["kind"] == "forecast":
+            return Forecast(**{field: df[field].to_numpy() for field in Forecast._fields})
+        return df
+
+    def nbytes(self) -> int:
+        """Отображённые в память таблицы (страницы файла, а не куча процесса)."""
+        return sum(table.get_total_buffer_size() for table in list(self._tables.values()))
+
+    def read(self, names=ITEMS) -> dict:
+        """{имя: значение} для запрошенных имён ITEMS; словари собираются обратно."""
+        result = {}
+        for full_name in self.manifest["items"]:
+            top, _, rest = full_name.partition(".")
+            if top not in names:
+                continue
+            if rest:
+                result.setdefault(top, {})[rest] = self._item(full_name)
+            else:
+                result[top] = self._item(full_name)
+        return result
+
+
+def open_snapshot(directory: str, user_id, data_version: str) -> Snapshot | None:
+    """Снимок пользователя для версии данных или None, если его нет."""
+    path = _version_dir(directory, user_id, data_version)
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("data_version") != str(data_version):
+        return None
+    return Snapshot(path, manifest)
@@ -0,0 +1,131 @@
+# core/transport.py
+"""
+Сжатие тел ответов API — без Streamlit.
+
+Клиент объявляет в Accept-Encoding те кодеки из API_ENCODINGS, которые
+может разжать: zstd (пакет zstandard), br (brotli), gzip (всегда есть).
+Порядок в API_ENCODINGS — предпочтение клиента, передаётся q-значениями.
+ApiClient читает тело как пришло по сети, без разжатия в urllib3, —
+так видно, сколько байт реально передано, — и разжимает здесь.
+
+compress — обратная сторона, для заглушки бэкенда и бенчмарков.
+"""
+import gzip
+import zlib
+
+from constants import API_ENCODINGS
+
+try:
+    import zstandard
+except ImportError:     # необязательная зависимость
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:     # необязательная зависимость
+    brotli = None
+
+IDENTITY = "identity"
+
+# Уровни для динамических ответов: быстрые, а не максимальные
+# (brotli 11 и zstd 19 сжимают на проценты лучше, но в десятки раз дольше)
+_LEVELS = {"gzip": 6, "br": 5, "zstd": 3}
+
+
+def _inflate(body: bytes) -> bytes:
+    try:
+        return zlib.decompress(body)
+    except zlib.error:
+        # Часть серверов шлёт deflate без заголовка zlib
+        return zlib.decompress(body, -zlib.MAX_WBITS)
+
+
+def _unzstd(body: bytes) -> bytes:
+    # decompressobj — кадр потокового сжатия может не содержать размер
+    return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+
+
+_DECODERS = {
+    IDENTITY:  lambda body: body,
+    "gzip":    gzip.decompress,
+    "x-gzip":  gzip.decompress,
+    "deflate": _inflate,
+}
+if brotli is not None:
+    _DECODERS["br"] = brotli.decompress
+if zstandard is not None:
+    _DECODERS["zstd"] = _unzstd
+
+
+def installed() -> list:
+    """Кодеки, которые этот процесс умеет разжать."""
+    return [name for name in _DECODERS if name not in (IDENTITY, "x-gzip")]
+
+
+def available() -> list:
+    """Кодеки из API_ENCODINGS, которые можно разжать, — в порядке предпочтения."""
+    codecs = installed()
+    return [name for name in API_ENCODINGS if name in codecs]
+
+
+def accept_encoding() -> str:
+    """'zstd, br;q=0.9, gzip;q=0.8' — заголовок Accept-Encoding запроса."""
+    codecs = available()
+    if not codecs:
+        return IDENTITY
+    return ", ".join(
+        name if i == 0 else f"{name};q={max(1.0 - 0.1 * i, 0.1):.1f}"
+        for i, name in enumerate(codecs)
+    )
+
+
+def negotiate(header: str | None, preferred: list) -> str:
+    """
+    Выбор кодека сервером: первый из preferred, который клиент принимает
+    (q > 0). Без заголовка или без общих кодеков — identity.
+    """
+    accepted = {}
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    codecs = installed()
+    for name in preferred:
+        if name in codecs and accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return IDENTITY
+
+
+def decompress(body: bytes, content_encoding: str | None) -> bytes:
+    """
+    Тело по заголовку Content-Encoding. Несколько кодеков ('gzip, br')
+    снимаются в обратном порядке. Незнакомый или неустановленный — ValueError.
+    """
+    codings = [c.strip().lower() for c in (content_encoding or "").split(",") if c.strip()]
+    for coding in reversed(codings):
+        decoder = _DECODERS.get(coding)
+        if decoder is None:
+            raise ValueError(f"Неподдерживаемый Content-Encoding: {coding}")
+        body = decoder(body)
+    return body
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == IDENTITY:
+        return body
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=_LEVELS["gzip"])
+    if encoding == "deflate":
+        return zlib.compress(body)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=_LEVELS["br"])
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=_LEVELS["zstd"]).compress(body)
+    raise ValueError(f"Кодек недоступен: {encoding}")
@@ -0,0 +1,98 @@
+# core/version.py
+"""
+Версия данных на бэкенде.
+
+Данные меняются только когда отрабатывают DAG-и Airflow, поэтому вместо
+слепого TTL кэш загрузчиков ключуется версией данных: пока версия та же,
+значения живут без срока, а при смене версии старые записи сбрасываются.
+
+Версия берётся из дешёвого эндпоинта DATA_VERSION_ENDPOINT (опрос не чаще
+раза в DATA_VERSION_POLL секунд на процесс) и из заголовка X-Data-Version,
+если бэкенд присылает его в обычных ответах. Пока версия неизвестна
+(старый бэкенд без эндпоинта) — кэш работает по soft/hard TTL.
+"""
+import threading
+import time
+
+import requests
+
+import telemetry
+from constants import DATA_VERSION_ENDPOINT, DATA_VERSION_HEADER, DATA_VERSION_POLL
+
+_lock       = threading.Lock()
+_version    = None
+_checked_at = None      # time.monotonic() последнего опроса
+_polling    = False
+_listeners  = []
+
+
+def on_change(callback):
+    """callback(old, new) вызывается при смене версии данных."""
+    _listeners.append(callback)
+
+
+def latest() -> str | None:
+    """Последняя известная версия — без опроса бэкенда."""
+    return _version
+
+
+def note_version(version: str | None):
+    """Запоминает версию (из ответа эндпоинта или заголовка)."""
+    global _version, _checked_at
+    if not version:
+        return
+    with _lock:
+        old = _version
+        _version    = str(version)
+        _checked_at = time.monotonic()
+    if old != _version:
+        telemetry.inc("data_version_changes_total")
+        for callback in _listeners:
+            callback(old, _version)
+
+
+def _poll(api_url: str, token: str | None):
+    global _polling, _checked_at
+    try:
+        headers  = {"Authorization": f"Bearer {token}"} if token else {}
+        response = requests.get(f"{api_url}{DATA_VERSION_ENDPOINT}",
+                                headers=headers, timeout=3)
+        if response.ok:
+            note_version(response.json().get("version"))
+            telemetry.inc("data_version_polls_total", result="ok")
+        else:
+            telemetry.inc("data_version_polls_total", result=str(response.status_code))
+    except (requests.exceptions.RequestException, ValueError):
+        telemetry.inc("data_version_polls_total", result="error")
+    finally:
+        with _lock:
+            _polling    = False
+            _checked_at = time.monotonic()
+
+
+def current_data_version(client) -> str | None:
+    """
+    Последняя известная версия. Если пора перепроверить — первый раз
+    опрашиваем синхронно, дальше в фоне, отдавая известное значение.
+    client — core.client.ApiClient, от имени которого опрашивать.
+    """
+    global _polling
+
+    with _lock:
+        due = _checked_at is None or time.monotonic() - _checked_at >= DATA_VERSION_POLL
+        if not due or _polling:
+            return _version
+        _polling = True
+        first    = _checked_at is None
+
+    args = (client.base_url, client.credentials.token)
+    if first:
+        _poll(*args)
+    else:
+        threading.Thread(target=_poll, args=args, daemon=True,
+                         name="data-version-poll").start()
+    return _version
+
+
+def version_from_headers(headers) -> None:
+    note_version(headers.get(DATA_VERSION_HEADER))
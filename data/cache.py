@@ -0,0 +1,197 @@
+# data/cache.py
+"""
+Кэш для загрузчиков data/*.
+
+Хранение. st.cache_data хранит результат в pickle и на каждом попадании
+распаковывает свежую копию — для каждого пользователя и каждого rerun.
+Здесь DataFrame-ы хранятся как Arrow-таблицы (категории из core.schema —
+словарём), а наружу отдаются через to_pandas без копирования
+числовых колонок: массивы read-only, общие для всех попаданий.
+Само хранилище — бэкенд из core/cache.py: по умолчанию память процесса,
+с LOADER_CACHE_DIR — каталог на диске (set_backend подменяет его).
+
+Свежесть. Если бэкенд сообщает версию данных (core/version.py), она
+входит в ключ: значения живут без срока, пока версия не сменится, а
+при смене записи прошлых версий выбрасываются. Если версия неизвестна —
+stale-while-revalidate по двум срокам:
+  soft_ttl — после него значение ещё отдаётся сразу, но в фоне
+             запускается обновление (не больше одного на ключ);
+  hard_ttl — после него значение выбрасывается и загружается заново
+             синхронно. None — не выбрасывать никогда.
+
+Загрузчики не должны менять возвращённые фреймы на месте — только
+добавлять колонки или работать с копией.
+"""
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+import memory
+import profiling
+import telemetry
+from constants import (
+    CACHE_SOFT_TTL, CACHE_HARD_TTL, CACHE_REFRESH_WORKERS, CIRCUIT_COOLDOWN,
+    LOADER_CACHE_DIR, MEMORY_BUDGETS,
+)
+from core import version
+from core.cache import Entry, MemoryBackend, DiskBackend, cache_key, to_arrow, from_arrow
+from singleflight import SingleFlight
+
+_backend    = (DiskBackend(LOADER_CACHE_DIR) if LOADER_CACHE_DIR
+               else MemoryBackend(max_bytes=MEMORY_BUDGETS["loaders"]))
+_lock       = threading.Lock()
+_generation = 0         # растёт при clear_cache — фоновые обновления старше сброса не пишем
+_refreshing = set()     # ключи, которые сейчас обновляются в фоне
+_misses     = SingleFlight("loaders")
+_refresh_pool = ThreadPoolExecutor(
+    max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh",
+)
+
+
+def set_backend(backend):
+    """Подменить хранилище (MemoryBackend, DiskBackend или совместимое)."""
+    global _backend
+    _backend = backend
+
+
+def _store_value(key, value, hard_ttl: int | None, generation: int):
+    with _lock:
+        if generation == _generation:
+            _backend.set(key, Entry(value, hard_ttl))
+
+
+def _drop_other_versions(old: str | None, new: str):
+    """При смене версии данных записи прошлых версий больше не нужны."""
+    _backend.delete(lambda k: k[1] is not None and k[1] != new)
+
+
+version.on_change(_drop_other_versions)
+memory.register("loaders", lambda: _backend.sizes())
+
+
+def _data_version():
+    from db import session_client
+
+    return version.current_data_version(session_client())
+
+
+def _refresh(key, hard_ttl: int | None, func, args, kwargs, credentials, generation: int):
+    """Фоновое обновление устаревшего значения. При ошибке остаётся старое."""
+    from db import use_credentials
+
+    name = func.__name__
+    try:
+        with use_credentials(credentials), telemetry.span("loader_seconds", loader=name):
+            value = to_arrow(func(*args, **kwargs))
+        _store_value(key, value, hard_ttl, generation)
+        telemetry.inc("loader_refresh_total", loader=name, result="ok")
+    except Exception:
+        telemetry.inc("loader_refresh_total", loader=name, result="error")
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+
+def cached(soft_ttl: int = CACHE_SOFT_TTL, hard_ttl: int | None = CACHE_HARD_TTL,
+           versioned: bool = True):
+    """
+    Замена @st.cache_data(ttl=...) для загрузчиков data/*.
+    Ключ кэша — имя функции, версия данных и аргументы (должны быть хешируемыми).
+    versioned=False — только TTL (для данных, которые не грузят DAG-и).
+    """
+    def decorator(func):
+        name = func.__name__
+
+        def make_key(args, kwargs):
+            data_version = _data_version() if versioned else None
+            return cache_key(func.__qualname__, data_version, args, kwargs)
+
+        def load(args, kwargs, key, generation):
+            """(Arrow-значение, время данных с диска или None)."""
+            from db import fallbacks_served, last_fallback_as_of
+
+            fallbacks = fallbacks_served()
+            value = to_arrow(func(*args, **kwargs))
+            as_of = None
+            if fallbacks_served() != fallbacks:
+                # Бэкенд недоступен, это данные с диска — держим их недолго
+                ttl   = CIRCUIT_COOLDOWN
+                as_of = last_fallback_as_of()
+            else:
+                # Значение известной версии живёт до её смены
+                ttl = None if key[1] else hard_ttl
+            _store_value(key, value, ttl, generation)
+            return value, as_of
+
+        @profiling.traced("loader")
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from db import current_credentials
+
+            key   = make_key(args, kwargs)
+            now   = time.time()
+            entry = _backend.get(key)
+
+            with _lock:
+                generation = _generation
+                expired    = entry is None or entry.expired(now)
+                stale      = (not expired and key[1] is None
+                              and now - entry.fetched_at >= soft_ttl)
+                schedule   = stale and key not in _refreshing
+                if schedule:
+                    _refreshing.add(key)
+
+            if expired:
+                from db import in_background, show_degraded
+
+                _backend.purge_expired(now)
+                with telemetry.span("loader_seconds", loader=name):
+                    (value, as_of), shared = _misses.do(
+                        key, lambda: load(args, kwargs, key, generation), label=name,
+                    )
+                if shared and as_of is not None and not in_background():
+                    # Баннер показал только загрузивший — показываем и здесь
+                    show_degraded(as_of)
+                telemetry.inc("loader_cache_total", loader=name, result="miss")
+                return from_arrow(value)
+
+            if schedule:
+                _refresh_pool.submit(
+                    _refresh, key, entry.hard_ttl, func, args, kwargs,
+                    current_credentials(), generation,
+                )
+            telemetry.inc("loader_cache_total", loader=name,
+                          result="stale" if stale else "hit")
+            return from_arrow(entry.value)
+
+        def clear():
+            _backend.delete(lambda k: k[0] == func.__qualname__)
+
+        def contains(*args, **kwargs) -> bool:
+            """Есть ли свежее значение — без загрузки и без учёта в метриках."""
+            entry = _backend.get(make_key(args, kwargs))
+            return entry is not None and not entry.expired(time.time())
+
+        wrapper.clear    = clear
+        wrapper.contains = contains
+        return wrapper
+
+    return decorator
+
+
+def clear_cache():
+    """
+    Сбрасывает серверные кэши (при входе/выходе пользователя).
+    Кэш на диске не трогаем: ключи персональных загрузчиков содержат user_id.
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+        _refreshing.clear()
+    if not getattr(_backend, "persistent", False):
+        _backend.clear()
+    st.cache_data.clear()
+    st.cache_resource.clear()
@@ -1,69 +1,35 @@
 # data/market.py
-import pandas as pd
-import streamlit as st
-from db import api_get
+import memory
+from core import analytics, loaders, version
+from core.candles import CandleStore
+from db import session_client
+from data.cache import cached
 
-TICKER_MAP = {
-    'TCS20A107662': 'HEAD',
-    'TCS03A108X38': 'X5',
-    'BBG004S68473': 'IRAO',
-    'BBG004730N88': 'SBER',
-}
+# Сырые свечи по бумагам: короткие периоды догружают только недостающие окна
+_candle_store = CandleStore()
+memory.register("candles", _candle_store.sizes)
+# Новая версия данных может переписать историю — окна догружают только
+# хвост, поэтому сырые свечи прошлой версии выбрасываем целиком
+version.on_change(lambda old, new: _candle_store.clear())
 
-TICKER_MAP_REVERSE = {v: k for k, v in TICKER_MAP.items()}
 
-
-@st.cache_data(ttl=3600)
+@cached()
 def load_candles(figi: str, period: str = '1D') -> tuple:
     """
     Загружает свечи через API, агрегирует под период.
-    Возвращает (df_full, df_display).
+    Возвращает (df_full, df_display); для периодов короче ALL df_full —
+    окно показа с разогревом индикаторов, а не вся история.
     """
-    df = api_get(f"/api/market/candles/{figi}")
-
-    df['time'] = pd.to_datetime(df['time'])
-    df = df.set_index('time')
-    for col in ['open', 'high', 'low', 'close', 'volume']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    # Агрегация
-    rule = {
-        '1D':  None,
-        '1W':  '4h',
-        '1M':  '1D',
-        '6M':  '1D',
-        '1Y':  '1W',
-        'ALL': '1W',
-    }.get(period)
-
-    if rule:
-        df = df.resample(rule).agg({
-            'open':   'first',
-            'high':   'max',
-            'low':    'min',
-            'close':  'last',
-            'volume': 'sum',
-        }).dropna()
-
-    df_full = df.copy()
-
-    # Обрезка по периоду
-    now = df.index.max()
-    delta = {
-        '1D':  pd.Timedelta(days=1),
-        '1W':  pd.Timedelta(weeks=1),
-        '1M':  pd.Timedelta(days=30),
-        '6M':  pd.Timedelta(days=180),
-        '1Y':  pd.Timedelta(days=365),
-        'ALL': None,
-    }.get(period)
+    return loaders.candles(session_client(), figi, period, store=_candle_store)
 
-    df_display = df if delta is None else df[df.index >= now - delta]
 
-    return df_full, df_display
+@cached()
+def load_indicators(figi: str, period: str = '1D'):
+    """Индикаторы для графика — считаются один раз на (бумага, период, версия данных)"""
+    df_full, _ = load_candles(figi, period)
+    return analytics.compute_indicators(df_full, period)
 
 
-@st.cache_data(ttl=3600)
+@cached(hard_ttl=7 * 24 * 3600)
 def load_available_tickers() -> list:
-    df = api_get("/api/market/tickers")
-    return sorted([TICKER_MAP.get(f, f) for f in df['figi']])
+    return loaders.available_tickers(session_client())
@@ -0,0 +1,102 @@
+# data/prefetch.py
+"""
+Предзагрузка соседей в блоке технического анализа.
+
+Кнопки ◀/▶ и переключатель периода ходят по списку тикеров и периодов
+предсказуемо, поэтому после отрисовки текущей бумаги в фоне прогреваем
+кэш для следующей и предыдущей бумаги (свечи, индикаторы, дневные close
+для Монте-Карло) и для соседних периодов текущей.
+
+Пул потоков ограничен PREFETCH_WORKERS, у каждой сессии бюджет —
+PREFETCH_BUDGET задач за PREFETCH_BUDGET_WINDOW секунд. Уже лежащее
+в кэше и уже загружаемое повторно не ставится.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+import telemetry
+from constants import PERIODS, PREFETCH_WORKERS, PREFETCH_BUDGET, PREFETCH_BUDGET_WINDOW
+from core.loaders import TICKER_MAP_REVERSE
+from data.assets import load_candles_for_mc
+from data.market import load_indicators
+
+_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_pending      = set()
+_pending_lock = threading.Lock()
+
+
+def _warm(loader, args, credentials):
+    from db import use_credentials
+
+    try:
+        with use_credentials(credentials):
+            loader(*args)
+        telemetry.inc("prefetch_total", loader=loader.__name__, result="ok")
+    except Exception:
+        telemetry.inc("prefetch_total", loader=loader.__name__, result="error")
+    finally:
+        with _pending_lock:
+            _pending.discard((loader.__name__, args))
+
+
+def _take_budget() -> bool:
+    """Списать одну задачу из бюджета сессии."""
+    now    = time.monotonic()
+    budget = st.session_state.get("prefetch_budget")
+    if budget is None or now - budget[0] >= PREFETCH_BUDGET_WINDOW:
+        budget = (now, 0)
+    if budget[1] >= PREFETCH_BUDGET:
+        return False
+    st.session_state["prefetch_budget"] = (budget[0], budget[1] + 1)
+    return True
+
+
+def _targets(tickers: list, active_ticker: str, period: str) -> list:
+    """(загрузчик, аргументы) в порядке вероятности следующего шага."""
+    idx = tickers.index(active_ticker)
+    neighbours = []
+    for step in (1, -1):
+        ticker = tickers[(idx + step) % len(tickers)]
+        if ticker != active_ticker and ticker not in neighbours:
+            neighbours.append(ticker)
+
+    targets = []
+    for ticker in neighbours:
+        figi = TICKER_MAP_REVERSE.get(ticker, ticker)
+        targets += [
+            (load_indicators,     (figi, period)),   # заодно грузит свечи
+            (load_candles_for_mc, (figi,)),
+        ]
+
+    figi = TICKER_MAP_REVERSE.get(active_ticker, active_ticker)
+    p = PERIODS.index(period)
+    for adjacent in (p + 1, p - 1):
+        if 0 <= adjacent < len(PERIODS):
+            targets.append((load_indicators, (figi, PERIODS[adjacent])))
+    return targets
+
+
+def prefetch_neighbours(tickers: list, active_ticker: str, period: str):
+    """Ставит в фон прогрев соседних бумаг и периодов. Не блокирует."""
+    from db import current_credentials
+
+    if active_ticker not in tickers or period not in PERIODS:
+        return
+    credentials = current_credentials()
+
+    for loader, args in _targets(tickers, active_ticker, period):
+        task = (loader.__name__, args)
+        if loader.contains(*args):
+            continue
+        with _pending_lock:
+            if task in _pending:
+                continue
+        if not _take_budget():
+            telemetry.inc("prefetch_total", loader=loader.__name__, result="budget")
+            return
+        with _pending_lock:
+            _pending.add(task)
+        _pool.submit(_warm, loader, args, credentials)
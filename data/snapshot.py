@@ -0,0 +1,131 @@
+# data/snapshot.py
+"""
+Данные страниц пользователя из снимка (core/snapshot.py).
+
+Первое обращение к версии данных собирает снимок (или находит готовый —
+его мог записать precompute.py или другой процесс приложения), дальше
+страницы читают таблицы из memory map без загрузчиков и пересчётов.
+Открытые снимки держим в памяти процесса: последние SNAPSHOT_OPEN.
+
+Если версия данных неизвестна или бэкенд недоступен, снимок не пишется —
+данные отдают обычные загрузчики data/* (с их кэшем и запасными данными).
+"""
+import threading
+from collections import OrderedDict
+
+import memory
+import telemetry
+from profiling import traced
+from constants import SNAPSHOT_DIR, SNAPSHOT_OPEN
+from core import snapshot, version
+from core.snapshot import ITEMS
+from data.assets import (
+    load_donut_top, load_donut_detail, load_top_alltime, load_top_daily,
+    load_market_comparison, load_monthly_returns,
+)
+from data.portfolio import load_portfolio_metrics, load_portfolio_today, load_bar_money, load_coupon_metrics
+from singleflight import SingleFlight
+
+_lock     = threading.Lock()
+_open     = OrderedDict()      # (user_id, версия) → core.snapshot.Snapshot
+_builds   = SingleFlight("snapshots")
+
+# Те же данные через загрузчики — когда снимка нет
+_LOADERS = {
+    "portfolio":         lambda uid: load_portfolio_metrics(uid)[0],
+    "forecast":          lambda uid: load_portfolio_metrics(uid)[1],
+    "today":             load_portfolio_today,
+    "coupons":           load_coupon_metrics,
+    "bar_money":         load_bar_money,
+    "donut_top":         load_donut_top,
+    "donut_detail":      load_donut_detail,
+    "top_alltime":       load_top_alltime,
+    "top_daily":         load_top_daily,
+    "market_comparison": load_market_comparison,
+    "monthly_returns":   load_monthly_returns,
+}
+
+
+def _forget_other_versions(old: str | None, new: str):
+    with _lock:
+        for key in [k for k in _open if k[1] != new]:
+            del _open[key]
+
+
+def _sizes() -> dict:
+    with _lock:
+        snaps = list(_open.items())
+    return {f"user {user_id}": snap.nbytes() for (user_id, _), snap in snaps}
+
+
+version.on_change(_forget_other_versions)
+memory.register("snapshots", _sizes)
+
+
+def _remember(key, snap):
+    with _lock:
+        _open[key] = snap
+        _open.move_to_end(key)
+        while len(_open) > SNAPSHOT_OPEN:
+            _open.popitem(last=False)
+
+
+def _build(user_id, data_version: str):
+    """Собрать и записать снимок. None — бэкенд отдал запасные данные."""
+    from db import fallbacks_served, session_client
+
+    snap = snapshot.open_snapshot(SNAPSHOT_DIR, user_id, data_version)
+    if snap is not None:
+        telemetry.inc("snapshot_total", result="disk")
+        return snap
+
+    fallbacks = fallbacks_served()
+    with telemetry.span("snapshot_seconds", phase="build"):
+        data = snapshot.build(session_client())
+    if fallbacks_served() != fallbacks:
+        telemetry.inc("snapshot_total", result="degraded")
+        return None
+    snapshot.write(SNAPSHOT_DIR, user_id, data_version, data)
+    telemetry.inc("snapshot_total", result="build")
+    return snapshot.open_snapshot(SNAPSHOT_DIR, user_id, data_version)
+
+
+def _snapshot(user_id):
+    from db import session_client
+
+    data_version = version.current_data_version(session_client())
+    if data_version is None or user_id is None:
+        return None
+
+    key = (user_id, data_version)
+    with _lock:
+        snap = _open.get(key)
+        if snap is not None:
+            _open.move_to_end(key)
+    if snap is not None:
+        telemetry.inc("snapshot_total", result="hit")
+        return snap
+
+    try:
+        snap, _ = _builds.do(key, lambda: _build(user_id, data_version), label="dashboard")
+    except (OSError, TypeError, ValueError):
+        telemetry.inc("snapshot_total", result="error")
+        return None
+    if snap is not None:
+        _remember(key, snap)
+    return snap
+
+
+@traced("loader")
+def load_dashboard(user_id: int, names=ITEMS) -> dict:
+    """
+    {имя: значение} для страниц — ключи core.snapshot.ITEMS:
+    portfolio, forecast, today, coupons, bar_money, donut_top, ...
+    Фреймы только для чтения — менять копию.
+    """
+    snap = _snapshot(user_id)
+    if snap is not None:
+        with telemetry.span("snapshot_seconds", phase="read"):
+            return snap.read(names)
+    telemetry.inc("snapshot_total", result="loaders")
+    return {name: _LOADERS[name](user_id) for name in names}
@@ -1,13 +1,25 @@
 # db.py
+# Streamlit-обёртка над core.client: учётные данные из st.session_state,
+# ошибки — через st.error / st.stop, склейка запросов, данные с диска
 import streamlit as st
 import pandas as pd
 import requests
 import os
+import threading
+import contextvars
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from decimal import Decimal
 from datetime import date, datetime
 import json
 
+import telemetry
+from circuit import CircuitOpen
+from singleflight import SingleFlight
+from core import last_good
+from core.client import ApiClient, Credentials, Unauthorized
+from data.cache import clear_cache
+
 
 class CustomEncoder(json.JSONEncoder):
     """Для сериализации Decimal, date, datetime из API"""
@@ -27,10 +39,42 @@ def get_api_url() -> str:
         return os.getenv("API_URL", "http://localhost:8000")
 
 
+# Учётные данные (token, user_id) для фоновых потоков, где нет st.session_state:
+# обновление кэша в фоне выполняется от имени сессии, которая его запустила
+_background_credentials = contextvars.ContextVar("background_credentials", default=None)
+
+
+def in_background() -> bool:
+    return _background_credentials.get() is not None
+
+
+def current_credentials() -> Credentials:
+    """(token, user_id) текущей сессии — чтобы передать их в фоновый поток."""
+    return Credentials(get_token(), current_user_scope())
+
+
+@contextmanager
+def use_credentials(credentials: Credentials):
+    """Выполнять запросы от имени переданной сессии (в фоновом потоке)."""
+    reset = _background_credentials.set(credentials)
+    try:
+        yield
+    finally:
+        _background_credentials.reset(reset)
+
+
 def get_token() -> str | None:
+    if in_background():
+        return _background_credentials.get()[0]
     return st.session_state.get("jwt_token")
 
 
+def current_user_scope() -> int | None:
+    if in_background():
+        return _background_credentials.get()[1]
+    return st.session_state.get("user_id")
+
+
 # ────────────────────────────────────────────────────────────
 # Единая обработка 401 — чистим всё (state + кэш) и останавливаем
 # ────────────────────────────────────────────────────────────
@@ -38,38 +82,141 @@ def _handle_unauthorized():
     st.error("🔒 Сессия истекла — войдите заново")
     for key in ["jwt_token", "authenticated", "username", "user_id"]:
         st.session_state.pop(key, None)
-    st.cache_data.clear()
+    clear_cache()
     st.stop()
 
 
+class SessionClient(ApiClient):
+    """
+    Клиент для загрузчиков data/*: get_frame идёт через api_get —
+    со склейкой запросов, данными с диска и показом ошибок на странице.
+    """
+    def get_frame(self, endpoint: str, params: dict = None) -> pd.DataFrame:
+        return api_get(endpoint, params)
+
+
+def session_client() -> SessionClient:
+    """Клиент от имени текущей сессии (или фонового потока с use_credentials)."""
+    return SessionClient(get_api_url(), current_credentials())
+
+
+# Общие для всех пользователей данные — склеиваем запросы разных сессий
+SHARED_PREFIXES = ("/api/market/",)
+
+_inflight = SingleFlight("api_get")
+
+# Ошибки, при которых вместо остановки страницы отдаём последние удачные данные
+_UNAVAILABLE = (
+    CircuitOpen,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+# Сколько раз в этом потоке отдали данные с диска — кэш загрузчиков
+# не держит такие значения долго (см. data/cache.py)
+_fallbacks = threading.local()
+
+
+def fallbacks_served() -> int:
+    return getattr(_fallbacks, "count", 0)
+
+
+def last_fallback_as_of():
+    """На какое время были последние отданные в этом потоке данные с диска."""
+    return getattr(_fallbacks, "as_of", None)
+
+
+def show_degraded(as_of):
+    """Один баннер на прогон страницы (флаг сбрасывает render_sidebar)."""
+    if "degraded_as_of" not in st.session_state:
+        st.session_state["degraded_as_of"] = as_of
+        st.warning(f"📴 Сервер недоступен — показаны данные на {as_of:%d.%m.%Y %H:%M}")
+
+
+def _backend_unavailable(e: Exception) -> bool:
+    if isinstance(e, _UNAVAILABLE):
+        return True
+    return (isinstance(e, requests.exceptions.HTTPError)
+            and e.response is not None and e.response.status_code >= 500)
+
+
+def _serve_last_good(key, endpoint: str) -> pd.DataFrame | None:
+    saved = last_good.load(key)
+    if saved is None:
+        return None
+    df, as_of = saved
+    _fallbacks.count = fallbacks_served() + 1
+    _fallbacks.as_of = as_of
+    telemetry.inc("api_fallback_total", endpoint=telemetry.endpoint_label(endpoint))
+    show_degraded(as_of)
+    return df
+
+
+_WINDOW_PARAMS = {"start", "end"}
+
+
+def _fetch_frame(client: ApiClient, endpoint: str, params: dict, key) -> pd.DataFrame:
+    """Запрос + декодирование в DataFrame. Без обращений к st.*"""
+    df = client.get_frame(endpoint, params)
+    # Окна по времени (свечи с start/end) не сохраняем: у каждого окна свой
+    # ключ, и файлы копились бы на каждую новую свечу
+    if not _WINDOW_PARAMS.intersection(params):
+        last_good.save(key, df)
+    return df
+
+
 def api_get(endpoint: str, params: dict = None) -> pd.DataFrame:
     token = get_token()
     if not token:
+        if in_background():
+            raise Unauthorized(endpoint)
         st.error("🔒 Требуется авторизация")
         st.stop()
 
-    api_url = get_api_url()
+    params = params or {}
+    client = ApiClient(get_api_url(), current_credentials())
+    scope  = (
+        "shared" if endpoint.startswith(SHARED_PREFIXES)
+        else client.credentials.user_id
+    )
+    key = (endpoint, tuple(sorted(params.items())), scope)
+    own = False     # запрос ушёл с токеном этой сессии
+
+    def fetch():
+        nonlocal own
+        own = True
+        return _fetch_frame(client, endpoint, params, key)
+
     try:
-        response = requests.get(
-            f"{api_url}{endpoint}",
-            params=params or {},
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=30,
-        )
-        if response.status_code == 401:
-            _handle_unauthorized()
-        response.raise_for_status()
-        data = response.json().get("data", [])
-        return pd.DataFrame(data)
+        try:
+            df, shared = _inflight.do(key, fetch, label=telemetry.endpoint_label(endpoint))
+        except Unauthorized:
+            if not own:
+                # Общий запрос ушёл с чужим токеном, и тот истёк — это не наш
+                # 401: повторяем от своего имени
+                return _fetch_frame(client, endpoint, params, key)
+            raise
+        # Ожидавшим отдаём копию — загрузчики дописывают колонки в свой фрейм
+        return df.copy() if shared else df
 
-    except requests.exceptions.ConnectionError:
-        st.error("❌ Не удалось подключиться к API. Запущен ли FastAPI?")
-        st.stop()
-    except requests.exceptions.HTTPError as e:
-        st.error(f"❌ API ошибка: {e}")
-        st.stop()
     except Exception as e:
-        st.error(f"❌ Ошибка: {e}")
+        # В фоне некому показать ошибку — пусть решает вызывающий код
+        if in_background():
+            raise
+        if _backend_unavailable(e):
+            df = _serve_last_good(key, endpoint)
+            if df is not None:
+                return df
+        if isinstance(e, Unauthorized):
+            _handle_unauthorized()
+        elif isinstance(e, CircuitOpen):
+            st.error("📴 Сервер недоступен, сохранённых данных нет — попробуйте позже")
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            st.error("❌ Не удалось подключиться к API. Запущен ли FastAPI?")
+        elif isinstance(e, requests.exceptions.HTTPError):
+            st.error(f"❌ API ошибка: {e}")
+        else:
+            st.error(f"❌ Ошибка: {e}")
         st.stop()
 
 
@@ -84,7 +231,7 @@ def login(username: str, password: str) -> bool:
         if response.status_code == 200:
             data = response.json()
             # Чистим возможные «остатки» от предыдущей сессии в этом процессе
-            st.cache_data.clear()
+            clear_cache()
 
             st.session_state["jwt_token"]     = data["access_token"]
             st.session_state["authenticated"] = True
@@ -117,7 +264,7 @@ def register(username: str, email: str, password: str,
         )
         if response.status_code == 200:
             data = response.json()
-            st.cache_data.clear()
+            clear_cache()
 
             st.session_state["jwt_token"]     = data["access_token"]
             st.session_state["authenticated"] = True
@@ -140,69 +287,50 @@ def register(username: str, email: str, password: str,
 #   Хелперы для Markowitz-страницы (возвращают сырой JSON/dict)
 # ============================================================
 
-def api_get_json(endpoint: str, params: dict = None, timeout: int = 30) -> dict:
-    token = get_token()
-    if not token:
-        st.error("🔒 Требуется авторизация")
+def _json_error(e: Exception) -> dict:
+    """Показ ошибки api_get_json / api_post_json в сессии; в фоне — исключение."""
+    if in_background():
+        raise e
+    if isinstance(e, Unauthorized):
+        _handle_unauthorized()
+    if isinstance(e, CircuitOpen):
+        st.error("📴 Сервер недоступен — попробуйте позже")
         st.stop()
-
-    api_url = get_api_url()
-    try:
-        response = requests.get(
-            f"{api_url}{endpoint}",
-            params=params or {},
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=timeout,
-        )
-        if response.status_code == 401:
-            _handle_unauthorized()
-        response.raise_for_status()
-        return response.json()
-
-    except requests.exceptions.ConnectionError:
+    if isinstance(e, requests.exceptions.ConnectionError):
         st.error("❌ Не удалось подключиться к API. Запущен ли FastAPI?")
         st.stop()
-    except requests.exceptions.HTTPError:
+    if isinstance(e, requests.exceptions.HTTPError):
+        response = e.response
         try:
             detail = response.json()
         except Exception:
             detail = response.text
         st.error(f"❌ API ошибка ({response.status_code}): {detail}")
         return {}
-    except Exception as e:
-        st.error(f"❌ Ошибка: {e}")
-        return {}
+    st.error(f"❌ Ошибка: {e}")
+    return {}
 
 
-def api_post_json(endpoint: str, payload: dict = None, timeout: int = 120) -> dict:
+def _json_request(method: str, endpoint: str, timeout: int, **kwargs) -> dict:
     token = get_token()
     if not token:
+        if in_background():
+            raise Unauthorized(endpoint)
         st.error("🔒 Требуется авторизация")
         st.stop()
 
-    api_url = get_api_url()
+    client = ApiClient(get_api_url(), current_credentials())
     try:
-        response = requests.post(
-            f"{api_url}{endpoint}",
-            json=payload or {},
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=timeout,
-        )
-        if response.status_code == 401:
-            _handle_unauthorized()
-        response.raise_for_status()
-        return response.json()
-
-    except requests.exceptions.ConnectionError:
-        st.error("❌ Не удалось подключиться к API. Запущен ли FastAPI?")
-        st.stop()
-    except requests.exceptions.HTTPError:
-        try:
-            detail = response.json()
-        except Exception:
-            detail = response.text
-        st.error(f"❌ API ошибка ({response.status_code}): {detail}")
-        return {}
+        if method == "POST":
+            return client.post_json(endpoint, kwargs.get("json"), timeout=timeout)
+        return client.get_json(endpoint, kwargs.get("params"), timeout=timeout)
     except Exception as e:
-        st.error(f"❌ Ошибка: {e}")
-        return {}
+        return _json_error(e)
+
+
+def api_get_json(endpoint: str, params: dict = None, timeout: int = 30) -> dict:
+    return _json_request("GET", endpoint, timeout, params=params or {})
+
+
+def api_post_json(endpoint: str, payload: dict = None, timeout: int = 120) -> dict:
+    return _json_request("POST", endpoint, timeout, json=payload or {})
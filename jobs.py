@@ -0,0 +1,177 @@
+# jobs.py
+"""
+Фоновые задачи для долгих расчётов (бэктест, граница, оптимизация).
+
+Кнопка больше не держит поток скрипта Streamlit на время запроса:
+submit() ставит задачу в пул и сразу возвращает её id, страница опрашивает
+состояние и показывает прогресс, пользователь может отменить задачу.
+
+Задачи дедуплицируются по ключу параметров: пока задача с тем же ключом
+в очереди или выполняется — возвращается её id. Успешный результат
+кладётся в хранилище результатов (result_cache.py) и берётся оттуда же
+(JobManager.result) — сама задача его не держит, чтобы хранилище могло
+выгрузить его из памяти. Повторный запуск с теми же параметрами сразу
+завершается готовым значением.
+
+Сейчас исполнитель — локальный пул потоков в процессе Streamlit. Интерфейс
+(submit / get / cancel) тот же, что понадобится от заданий на бэкенде.
+Функция задачи получает Job и может сообщать прогресс через
+job.report(done, total) и проверять job.cancelled(). Запрос к API, пока он
+идёт, не прервать — отменённая задача дожидается ответа и выбрасывает его.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import telemetry
+from constants import JOB_WORKERS, JOB_HISTORY
+from result_cache import RESULT_CACHE
+
+QUEUED    = "queued"
+RUNNING   = "running"
+DONE      = "done"
+FAILED    = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    def __init__(self, job_id: str, kind: str, key):
+        self.id          = job_id
+        self.kind        = kind
+        self.key         = key
+        self.status      = QUEUED
+        self.done        = 0
+        self.total       = None
+        self.error       = None
+        self.created_at  = time.time()
+        self.started_at  = None
+        self.finished_at = None
+        self._cancel     = threading.Event()
+        self._future     = None
+
+    def report(self, done: int, total: int | None = None):
+        """Прогресс: done из total шагов (например, окон walk-forward)."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobManager:
+    def __init__(self, results, max_workers: int = JOB_WORKERS, history: int = JOB_HISTORY):
+        """
+        results — хранилище с get(key) / put(key, value) и, если умеет,
+        stale(key): устаревший результат отдаётся, но задача пересчитывает его.
+        """
+        self._pool    = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="job")
+        self._lock    = threading.Lock()
+        self._ids     = itertools.count(1)
+        self._jobs    = OrderedDict()      # id → Job (завершённые вытесняются по history)
+        self._active  = {}                 # key → Job в очереди или в работе
+        self._results = results
+        self._history = history
+
+    def submit(self, kind: str, fn, key) -> str:
+        """
+        Ставит fn(job) в очередь и возвращает id задачи.
+        Если задача с таким ключом уже идёт — её id; если свежий результат
+        уже есть в хранилище — id сразу завершённой задачи.
+        """
+        cached = self._results.get(key)
+        stale  = getattr(self._results, "stale", None)
+        if cached is not None and stale is not None and stale(key):
+            cached = None
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None:
+                telemetry.inc("jobs_total", kind=kind, result="deduplicated")
+                return job.id
+            job = Job(f"{kind}-{next(self._ids)}", kind, key)
+            self._jobs[job.id] = job
+            if cached is not None:
+                job.status      = DONE
+                job.finished_at = time.time()
+                self._evict()
+            else:
+                self._active[key] = job
+                job._future = self._pool.submit(self._run, job, fn)
+        telemetry.inc("jobs_total", kind=kind,
+                      result="cached" if cached is not None else "submitted")
+        return job.id
+
+    def _run(self, job: Job, fn):
+        if job.cancelled():
+            return
+        job.status     = RUNNING
+        job.started_at = time.time()
+        try:
+            result = fn(job)
+        except Exception as e:
+            job.error = e
+            self._finish(job, FAILED)
+        else:
+            if job.cancelled():
+                self._finish(job, CANCELLED)
+            else:
+                self._results.put(job.key, result)
+                self._finish(job, DONE)
+
+    def _finish(self, job: Job, status: str):
+        with self._lock:
+            if job.finished:
+                return
+            job.status      = status
+            job.finished_at = time.time()
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            self._evict()
+        telemetry.inc("jobs_total", kind=job.kind, result=status)
+        if job.started_at is not None:
+            telemetry.observe("job_seconds", job.elapsed, kind=job.kind, status=status)
+
+    def _evict(self):
+        """Держим не больше history завершённых задач (под self._lock)."""
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[:max(0, len(finished) - self._history)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def result(self, job: Job):
+        """Результат завершённой задачи; None — хранилище его уже не держит."""
+        return self._results.get(job.key) if job.status == DONE else None
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return
+        job._cancel.set()
+        # Из очереди снимаем сразу; выполняющаяся закончит запрос и будет выброшена
+        job._future.cancel()
+        self._finish(job, CANCELLED)
+
+    def active(self) -> int:
+        with self._lock:
+            return len(self._active)
+
+
+JOBS = JobManager(RESULT_CACHE)
@@ -0,0 +1,213 @@
+# memory.py
+"""
+Учёт памяти процесса Streamlit: кэши, сессии, крупнейшие аллокации.
+
+Пространства имён. Кэши регистрируют поставщика размеров —
+register(имя, fn), где fn() → {метка: байты}: кэш загрузчиков —
+по загрузчикам, кэш результатов — по эндпоинтам и т. д. Размер
+считает deep_size: DataFrame — memory_usage(deep=True), Arrow —
+размер буферов, ndarray — nbytes (представления чужих буферов не
+считаются повторно), контейнеры и объекты — рекурсивно.
+
+Сессии. Каждая сессия на прогоне сообщает размеры своих ключей
+st.session_state (record_session); сессии, которые не заходили
+MEMORY_SESSION_TTL секунд, забываются.
+
+Бюджеты — MEMORY_BUDGETS. Соблюдают их сами хранилища (кэш результатов
+выгружает записи на диск, кэш загрузчиков выбрасывает старые),
+budgets() только показывает заполнение.
+
+Аллокации. С MEMORY_TRACE=1 фоновый поток раз в MEMORY_TRACE_INTERVAL
+секунд делает снимок tracemalloc и запоминает MEMORY_TRACE_TOP строк
+кода с наибольшим приростом памяти от начала трассировки.
+"""
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from types import FunctionType, ModuleType
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from constants import (
+    MEMORY_BUDGETS, MEMORY_SESSION_TTL, MEMORY_TRACE_INTERVAL, MEMORY_TRACE_FRAMES,
+    MEMORY_TRACE_TOP, MEMORY_TRACE_HISTORY,
+)
+
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None),
+           type, ModuleType, FunctionType)
+
+
+def deep_size(obj) -> int:
+    """Приблизительный размер объекта со всем, на что он ссылается, байты."""
+    seen  = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+
+        if isinstance(o, pd.DataFrame):
+            total += int(o.memory_usage(deep=True, index=True).sum())
+        elif isinstance(o, (pd.Series, pd.Index)):
+            total += int(o.memory_usage(deep=True))
+        elif isinstance(o, (pa.Table, pa.RecordBatch, pa.Array, pa.ChunkedArray)):
+            total += o.get_total_buffer_size()
+        elif isinstance(o, np.ndarray):
+            # Представление (в т. ч. колонки из Arrow) — только заголовок
+            total += o.nbytes if o.flags.owndata else sys.getsizeof(o)
+            if o.dtype == object:
+                stack.extend(o.ravel().tolist())
+        elif isinstance(o, _ATOMIC):
+            total += sys.getsizeof(o)
+        elif isinstance(o, dict):
+            total += sys.getsizeof(o)
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            total += sys.getsizeof(o)
+            stack.extend(o)
+        else:
+            total += sys.getsizeof(o)
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+    return total
+
+
+# ════════════════════════════════════════════════════════════
+# Пространства имён и сессии
+# ════════════════════════════════════════════════════════════
+_lock      = threading.Lock()
+_providers = {}     # имя → fn() → {метка: байты}
+_sessions  = {}     # id сессии → (время, пользователь, {ключ: байты})
+
+
+def register(namespace: str, provider):
+    """provider() → {метка: байты}; вызывается при каждом usage()."""
+    with _lock:
+        _providers[namespace] = provider
+
+
+def record_session(session_id: str, user, sizes: dict):
+    now = time.time()
+    with _lock:
+        _sessions[session_id] = (now, user, sizes)
+        for sid in [s for s, (seen, _, _) in _sessions.items()
+                    if now - seen > MEMORY_SESSION_TTL]:
+            del _sessions[sid]
+
+
+def sessions() -> list[dict]:
+    """Строки: сессия, пользователь, ключ, байты."""
+    with _lock:
+        items = list(_sessions.items())
+    return [
+        {"session": sid[:8], "user": user, "key": key, "bytes": size}
+        for sid, (_, user, sizes) in items
+        for key, size in sizes.items()
+    ]
+
+
+def usage() -> list[dict]:
+    """Строки: пространство имён, метка, байты."""
+    with _lock:
+        providers = list(_providers.items())
+    rows = []
+    for namespace, provider in providers:
+        for label, size in provider().items():
+            rows.append({"namespace": namespace, "label": str(label), "bytes": size})
+    return rows
+
+
+def budgets(rows: list = None) -> list[dict]:
+    """Заполнение бюджетов MEMORY_BUDGETS; для session — самая большая сессия."""
+    rows   = usage() if rows is None else rows
+    used   = {}
+    for row in rows:
+        used[row["namespace"]] = used.get(row["namespace"], 0) + row["bytes"]
+    per_session = {}
+    for row in sessions():
+        per_session[row["session"]] = per_session.get(row["session"], 0) + row["bytes"]
+    used["session"] = max(per_session.values(), default=0)
+
+    return [
+        {"namespace": namespace, "used": used.get(namespace, 0), "budget": budget,
+         "over": used.get(namespace, 0) > budget}
+        for namespace, budget in MEMORY_BUDGETS.items()
+    ]
+
+
+# ════════════════════════════════════════════════════════════
+# tracemalloc
+# ════════════════════════════════════════════════════════════
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Tracer(threading.Thread):
+    """Периодические снимки tracemalloc: прирост по строкам от первого снимка."""
+
+    def __init__(self, interval: float = MEMORY_TRACE_INTERVAL,
+                 history: int = MEMORY_TRACE_HISTORY):
+        super().__init__(daemon=True, name="memory-trace")
+        self.interval = interval
+        self.history  = deque(maxlen=history)   # {"time", "current", "peak", "top"}
+        self._done    = threading.Event()
+        self._base    = None
+
+    def sample(self) -> dict:
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+        if self._base is None:
+            self._base = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        top = [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes":    stat.size,
+                "diff":     stat.size_diff,
+                "count":    stat.count,
+            }
+            for stat in snapshot.compare_to(self._base, "lineno")[:MEMORY_TRACE_TOP]
+        ]
+        record = {"time": time.time(), "current": current, "peak": peak, "top": top}
+        self.history.append(record)
+        return record
+
+    def run(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        self.sample()
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+
+
+_tracer = None
+
+
+def start_tracing() -> Tracer:
+    """Запустить трассировку (один раз на процесс)."""
+    global _tracer
+    with _lock:
+        if _tracer is None:
+            _tracer = Tracer()
+            _tracer.start()
+        return _tracer
+
+
+def tracer() -> Tracer | None:
+    return _tracer
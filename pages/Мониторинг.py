@@ -0,0 +1,322 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+st.set_page_config(
+    layout="wide",
+    page_title="Мониторинг",
+    page_icon="🩺",
+)
+
+from auth import require_admin
+from components.navigation import render_sidebar
+
+# Служебная страница: в боковом меню её нет, открывается по прямой ссылке
+require_admin()
+render_sidebar()
+
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit.components.v1 as components
+
+import circuit
+import memory
+import profiling
+import telemetry
+from constants import MB
+
+st.title("🩺 Мониторинг")
+st.caption("Метрики текущего процесса Streamlit с момента запуска")
+
+col_refresh, col_reset, _ = st.columns([1, 1, 4])
+col_refresh.button("🔄 Обновить", use_container_width=True)
+if col_reset.button("🧹 Сбросить", use_container_width=True):
+    telemetry.REGISTRY.reset()
+
+
+STATS = ['count', 'mean', 'p50', 'p95', 'p99']
+
+
+def _summary(name: str, *labels: str) -> pd.DataFrame:
+    """Сводка гистограммы с колонками и тогда, когда значений ещё нет."""
+    return pd.DataFrame(telemetry.REGISTRY.summary(name), columns=[*labels, *STATS])
+
+
+def _ms(df: pd.DataFrame) -> pd.DataFrame:
+    for col in ['mean', 'p50', 'p95', 'p99']:
+        df[col] = (df[col].astype(float) * 1000).round(1)
+    return df
+
+
+# ════════════════════════════════════════════════════════════
+# Запросы к API
+# ════════════════════════════════════════════════════════════
+st.markdown("### 🌐 Запросы к API, мс")
+
+requests_df = pd.DataFrame(telemetry.REGISTRY.summary("api_request_seconds"))
+if requests_df.empty:
+    st.info("Запросов к API ещё не было")
+else:
+    phase = st.radio(
+        "Фаза",
+        options=['total', 'ttfb', 'download', 'decompress', 'decode'],
+        format_func=lambda x: {
+            'total':      'Всего',
+            'ttfb':       'До заголовков (DNS + connect + TTFB)',
+            'download':   'Скачивание',
+            'decompress': 'Разжатие',
+            'decode':     'Декодирование',
+        }[x],
+        horizontal=True,
+    )
+    view = _ms(requests_df[requests_df['phase'] == phase].drop(columns='phase'))
+    st.dataframe(
+        view.sort_values('p95', ascending=False),
+        hide_index=True, use_container_width=True,
+    )
+
+    sizes = pd.DataFrame(telemetry.REGISTRY.summary("api_response_bytes"))
+    statuses = pd.DataFrame(telemetry.REGISTRY.counters("api_requests_total"))
+
+    col_size, col_status = st.columns(2)
+    with col_size:
+        st.markdown("#### 📦 Размер ответа, КБ")
+        if not sizes.empty:
+            for col in ['mean', 'p50', 'p95', 'p99']:
+                sizes[col] = (sizes[col] / 1024).round(1)
+            st.dataframe(sizes, hide_index=True, use_container_width=True)
+    with col_status:
+        st.markdown("#### 🚦 Статусы ответов")
+        if not statuses.empty:
+            st.dataframe(
+                statuses.pivot_table(index='endpoint', columns='status',
+                                     values='value', aggfunc='sum', fill_value=0),
+                use_container_width=True,
+            )
+
+    transfer = pd.DataFrame(telemetry.REGISTRY.counters("api_bytes_total"))
+    if not transfer.empty:
+        st.markdown("#### 🗜️ Сжатие ответов")
+        by_endpoint = transfer.pivot_table(index=['endpoint', 'encoding'], columns='stage',
+                                           values='value', aggfunc='sum', fill_value=0)
+        by_endpoint = by_endpoint.reindex(columns=['wire', 'decoded'], fill_value=0)
+        by_endpoint['ratio'] = (by_endpoint['decoded'] / by_endpoint['wire']
+                                .where(by_endpoint['wire'] > 0)).round(1)
+        for col in ['wire', 'decoded']:
+            by_endpoint[col] = (by_endpoint[col] / 1024).round(1)
+        st.dataframe(
+            by_endpoint.rename(columns={'wire': 'По сети, КБ', 'decoded': 'Разжато, КБ',
+                                        'ratio': 'Сжатие, ×'}).reset_index(),
+            hide_index=True, use_container_width=True,
+        )
+
+st.markdown("#### 🔌 Предохранитель")
+breakers = circuit.states()
+if not breakers:
+    st.caption("Запросов через предохранитель ещё не было")
+else:
+    cols = st.columns(len(breakers))
+    for col, (group, state) in zip(cols, sorted(breakers.items())):
+        col.metric(group, {
+            circuit.CLOSED:    "🟢 норма",
+            circuit.HALF_OPEN: "🟡 проверка",
+            circuit.OPEN:      "🔴 отключено",
+        }[state])
+    fallbacks = pd.DataFrame(telemetry.REGISTRY.counters("api_fallback_total"))
+    if not fallbacks.empty:
+        st.caption("Ответы с диска вместо API (бэкенд был недоступен):")
+        st.dataframe(fallbacks, hide_index=True, use_container_width=True)
+
+st.markdown("---")
+
+# ════════════════════════════════════════════════════════════
+# Кэш загрузчиков
+# ════════════════════════════════════════════════════════════
+st.markdown("### 🗄️ Кэш загрузчиков")
+
+cache_df = pd.DataFrame(telemetry.REGISTRY.counters("loader_cache_total"))
+if cache_df.empty:
+    st.info("Загрузчики ещё не вызывались")
+else:
+    cache_view = cache_df.pivot_table(index='loader', columns='result',
+                                      values='value', aggfunc='sum', fill_value=0)
+    for col in ['hit', 'stale', 'miss']:
+        if col not in cache_view.columns:
+            cache_view[col] = 0
+    # stale — тоже мгновенный ответ, обновление идёт в фоне
+    cache_view['hit_ratio'] = (
+        (cache_view['hit'] + cache_view['stale'])
+        / cache_view[['hit', 'stale', 'miss']].sum(axis=1)
+    ).round(3)
+    # Время есть только у завершившихся загрузок — после сброса или
+    # при первой загрузке в процессе сводка может быть пустой
+    loader_times = _ms(_summary("loader_seconds", 'loader'))
+    st.dataframe(
+        cache_view.join(loader_times.set_index('loader')[['p50', 'p95', 'p99']]),
+        use_container_width=True,
+    )
+
+st.markdown("---")
+
+# ════════════════════════════════════════════════════════════
+# Отрисовка страниц
+# ════════════════════════════════════════════════════════════
+st.markdown("### 🖥️ Отрисовка страниц, мс")
+
+pages_df = _summary("page_render_seconds", 'page')
+if pages_df.empty:
+    st.info("Страницы ещё не открывались")
+else:
+    st.dataframe(_ms(pages_df), hide_index=True, use_container_width=True)
+
+st.markdown("---")
+
+# ════════════════════════════════════════════════════════════
+# Память
+# ════════════════════════════════════════════════════════════
+st.markdown("### 🧠 Память, МБ")
+
+usage_rows  = memory.usage()
+budgets_df  = pd.DataFrame(memory.budgets(usage_rows))
+budget_cols = st.columns(len(budgets_df))
+for col, row in zip(budget_cols, budgets_df.itertuples()):
+    col.metric(
+        {"results": "Результаты оптимизации", "loaders": "Кэш загрузчиков",
+         "session": "Самая большая сессия"}.get(row.namespace, row.namespace),
+        f"{row.used / MB:.1f} из {row.budget / MB:.0f}",
+        delta="сверх бюджета" if row.over else None,
+        delta_color="inverse",
+    )
+spills = pd.DataFrame(
+    [{**row, 'action': 'spill'} for row in telemetry.REGISTRY.counters("memory_spill_total")]
+    + [{**row, 'action': 'evict'} for row in telemetry.REGISTRY.counters("memory_evict_total")]
+)
+if not spills.empty:
+    st.caption("Выгружено на диск (spill) и выброшено (evict) из-за бюджета:")
+    st.dataframe(spills, hide_index=True, use_container_width=True)
+
+col_ns, col_sessions = st.columns(2)
+with col_ns:
+    st.markdown("#### 🗂️ По пространствам имён")
+    usage_df = pd.DataFrame(usage_rows)
+    if usage_df.empty:
+        st.caption("Кэши пусты")
+    else:
+        usage_df['MB'] = (usage_df.pop('bytes') / MB).round(2)
+        st.dataframe(usage_df.sort_values('MB', ascending=False),
+                     hide_index=True, use_container_width=True)
+with col_sessions:
+    st.markdown("#### 👥 По сессиям и ключам")
+    sessions_df = pd.DataFrame(memory.sessions())
+    if sessions_df.empty:
+        st.caption("Сессий ещё не было")
+    else:
+        sessions_df['KB'] = (sessions_df.pop('bytes') / 1024).round(1)
+        st.dataframe(sessions_df.sort_values('KB', ascending=False),
+                     hide_index=True, use_container_width=True)
+
+tracer = memory.tracer()
+if tracer is None or not tracer.history:
+    st.caption("Трассировка аллокаций выключена — MEMORY_TRACE=1 включает tracemalloc")
+else:
+    history = list(tracer.history)
+    trend   = pd.DataFrame([
+        {"time": pd.Timestamp(r["time"], unit="s"), "current": r["current"] / MB,
+         "peak": r["peak"] / MB}
+        for r in history
+    ]).set_index("time")
+    st.markdown("#### 📈 tracemalloc: занято и пик")
+    st.line_chart(trend)
+    st.markdown("#### 🔝 Рост по строкам кода с начала трассировки")
+    top = pd.DataFrame(history[-1]["top"])
+    if not top.empty:
+        top['MB']      = (top.pop('bytes') / MB).round(2)
+        top['diff MB'] = (top.pop('diff') / MB).round(2)
+        st.dataframe(top, hide_index=True, use_container_width=True)
+
+st.markdown("---")
+
+# ════════════════════════════════════════════════════════════
+# Профили прогонов
+# ════════════════════════════════════════════════════════════
+st.markdown("### 🔬 Профили прогонов")
+st.caption(
+    "Включаются переменной PROFILE_PAGES=1 (для всех) или параметром "
+    f"?profile=1 в адресе страницы (для администратора). Профилировщик: {profiling.backend()}"
+)
+
+profiled_pages = profiling.PROFILES.pages()
+if not profiled_pages:
+    st.info("Профилей ещё нет — откройте страницу с ?profile=1")
+else:
+    col_page, col_run = st.columns(2)
+    page     = col_page.selectbox("Страница", profiled_pages)
+    profiles = profiling.PROFILES.profiles(page)
+    profile  = col_run.selectbox(
+        "Прогон",
+        profiles,
+        format_func=lambda p: (
+            f"{time.strftime('%H:%M:%S', time.localtime(p.started_at))} · "
+            f"{p.duration * 1000:.0f} мс" + ("" if p.complete else " · прерван")
+        ),
+    )
+
+    if profile.tags:
+        tags = pd.DataFrame(profile.tags, columns=['kind', 'name', 'start', 'duration', 'depth'])
+        tags = tags.sort_values('start')
+        fig  = go.Figure()
+        for kind, group in tags.groupby('kind'):
+            fig.add_trace(go.Bar(
+                y=[f"{'  ' * d}{kind}: {n}" for d, n in zip(group['depth'], group['name'])],
+                x=group['duration'] * 1000,
+                base=group['start'] * 1000,
+                orientation='h',
+                name=kind,
+                hovertemplate="%{y}<br>начало %{base:.1f} мс, %{x:.1f} мс<extra></extra>",
+            ))
+        fig.update_layout(
+            height=max(240, 22 * len(tags) + 80),
+            barmode='overlay',
+            xaxis_title="мс от начала прогона",
+            yaxis=dict(autorange='reversed', categoryorder='array',
+                       categoryarray=[f"{'  ' * d}{k}: {n}" for k, n, d in
+                                      zip(tags['kind'], tags['name'], tags['depth'])]),
+            margin=dict(l=10, r=10, t=10, b=40),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    if profile.html is not None:
+        components.html(profile.html, height=700, scrolling=True)
+        st.download_button("⬇️ Скачать профиль (HTML)", data=profile.html,
+                           file_name="profile.html", mime="text/html")
+        with st.expander("Дерево вызовов (текст)"):
+            st.code(profile.text, language="text")
+    else:
+        top = pd.DataFrame(profile.top)
+        if not top.empty:
+            top[['tottime', 'cumtime']] = (top[['tottime', 'cumtime']] * 1000).round(2)
+            st.dataframe(top.rename(columns={'tottime': 'own, ms', 'cumtime': 'total, ms'}),
+                         hide_index=True, use_container_width=True)
+        st.download_button("⬇️ Скачать профиль (.prof для snakeviz)", data=profile.pstats,
+                           file_name="profile.prof", mime="application/octet-stream")
+
+    if st.button("🧹 Очистить профили"):
+        profiling.PROFILES.clear()
+
+# ════════════════════════════════════════════════════════════
+# Экспорт
+# ════════════════════════════════════════════════════════════
+prometheus_text = telemetry.render_prometheus()
+with st.expander("📤 Prometheus"):
+    st.code(prometheus_text, language="text")
+st.download_button(
+    "⬇️ Скачать metrics.txt",
+    data=prometheus_text,
+    file_name="metrics.txt",
+    mime="text/plain",
+)
@@ -0,0 +1,224 @@
+# precompute.py
+"""
+Пакетный прогрев дашбордов для всех пользователей — без Streamlit.
+
+Для каждого пользователя в отдельном процессе: загрузчики страниц
+(метрики портфеля, вложения, купоны, активы, сравнение с рынком,
+доходность по месяцам), сводка для оптимизации, корреляции и граница
+с параметрами по умолчанию. Затем — рыночные данные по всем бумагам
+из портфелей: дневные close для Монте-Карло (с отчётным VaR), свечи и
+индикаторы за период по умолчанию, список тикеров.
+
+Результаты пишутся туда же, откуда их читает приложение:
+  загрузчики → DiskBackend(LOADER_CACHE_DIR), ключи как у data/cache.py;
+  снимки страниц → SNAPSHOT_DIR (core/snapshot.py), если версия известна;
+  оптимизация → ResultCache(RESULT_CACHE_DIR), ключи как у job_status.
+Поэтому приложение должно быть запущено с теми же каталогами, иначе
+прогрев некуда положить.
+
+Запуск из корня проекта:
+    LOADER_CACHE_DIR=.cache/loaders RESULT_CACHE_DIR=.cache/results \\
+        python precompute.py --users users.json --workers 4
+
+users.json — список {"username", "password"} или {"token", "user_id"}.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from constants import (
+    CACHE_HARD_TTL, LOADER_CACHE_DIR, RESULT_CACHE_DIR, SNAPSHOT_DIR,
+    OPT_LOOKBACK_DAYS, OPT_RF_RATE, OPT_MIN_WEIGHT, OPT_MAX_WEIGHT,
+    FRONTIER_POINTS, FRONTIER_RANDOM,
+)
+from core import analytics, loaders, snapshot
+from core.cache import DiskBackend, Entry, cache_key, to_arrow
+from core.candles import CandleStore
+from core.client import ApiClient, Credentials, login
+from core.version import current_data_version
+from result_cache import ResultCache, holdings_fingerprint, result_key
+
+# Имена — __qualname__ обёрток из data/*: по ним приложение ищет записи
+USER_LOADERS = {
+    "load_portfolio_metrics": loaders.portfolio_metrics,
+    "load_bar_money":         loaders.bar_money,
+    "load_coupon_metrics":    loaders.coupon_metrics,
+    "load_donut_top":         loaders.donut_top,
+    "load_donut_detail":      loaders.donut_detail,
+    "load_top_alltime":       loaders.top_alltime,
+    "load_top_daily":         loaders.top_daily,
+    "load_market_comparison": loaders.market_comparison,
+    "load_monthly_returns":   loaders.monthly_returns,
+}
+
+DEFAULT_PERIOD  = '1D'
+TICKERS_TTL     = 7 * 24 * 3600     # как у data.market.load_available_tickers
+MC_SIMULATIONS  = 10000
+MC_CONFIDENCE   = 0.95
+
+
+def _credentials(api_url: str, user: dict) -> Credentials:
+    if user.get("token"):
+        return Credentials(user["token"], user.get("user_id"))
+    return login(api_url, user["username"], user["password"])
+
+
+def _store(backend: DiskBackend, name: str, version: str | None, args: tuple,
+           value, hard_ttl: int | None = CACHE_HARD_TTL):
+    """Запись в формате data/cache.py: известная версия — без срока."""
+    backend.set(cache_key(name, version, args), Entry(to_arrow(value), None if version else hard_ttl))
+
+
+def precompute_user(api_url: str, user: dict) -> dict:
+    """Прогрев одного пользователя. Возвращает отчёт и FIGI его бумаг."""
+    start       = time.perf_counter()
+    credentials = _credentials(api_url, user)
+    client      = ApiClient(api_url, credentials)
+    version     = current_data_version(client)
+    backend     = DiskBackend(LOADER_CACHE_DIR)
+    results     = ResultCache(directory=RESULT_CACHE_DIR)
+    user_id     = credentials.user_id
+
+    values = {}
+    for name, loader in USER_LOADERS.items():
+        values[name] = loader(client)
+        _store(backend, name, version, (user_id,), values[name])
+    if version:
+        snapshot.write(SNAPSHOT_DIR, user_id, version, snapshot.dashboard(
+            **{name.removeprefix("load_"): value for name, value in values.items()}
+        ))
+
+    summary   = client.get_json("/api/optimization/portfolio_summary")
+    positions = summary.get("positions", [])
+    holdings  = holdings_fingerprint(positions, user_id)
+    if summary.get("n_assets", 0) >= 2:
+        corr_params = {"lookback_days": OPT_LOOKBACK_DAYS}
+        results.put(
+            result_key("/api/optimization/correlation", corr_params, holdings, version),
+            client.get_json("/api/optimization/correlation", params=corr_params),
+        )
+        frontier_payload = {
+            "lookback_days": OPT_LOOKBACK_DAYS,
+            "n_points":      FRONTIER_POINTS,
+            "n_random":      FRONTIER_RANDOM,
+            "rf_rate":       OPT_RF_RATE,
+            "constraints":   {"min_weight": OPT_MIN_WEIGHT, "max_weight": OPT_MAX_WEIGHT},
+        }
+        results.put(
+            result_key("/api/optimization/efficient_frontier", frontier_payload, holdings, version),
+            client.post_json("/api/optimization/efficient_frontier", frontier_payload),
+        )
+
+    figis = sorted({
+        loaders.TICKER_MAP_REVERSE.get(p.get("ticker"), p.get("ticker"))
+        for p in positions if p.get("ticker")
+    })
+    return {
+        "user":        user_id,
+        "figis":       figis,
+        "credentials": credentials,
+        "seconds":     time.perf_counter() - start,
+    }
+
+
+def precompute_market(api_url: str, credentials: Credentials, figi: str) -> dict:
+    """Рыночные данные одной бумаги — общие для всех пользователей."""
+    start   = time.perf_counter()
+    client  = ApiClient(api_url, credentials)
+    version = current_data_version(client)
+    backend = DiskBackend(LOADER_CACHE_DIR)
+
+    daily = loaders.candles_for_mc(client, figi)
+    _store(backend, "load_candles_for_mc", version, (figi,), daily)
+
+    # Как data.market.load_candles: окно показа с разогревом, а не вся история
+    candles = loaders.candles(client, figi, DEFAULT_PERIOD, store=CandleStore())
+    _store(backend, "load_candles", version, (figi, DEFAULT_PERIOD), candles)
+    _store(backend, "load_indicators", version, (figi, DEFAULT_PERIOD),
+           analytics.compute_indicators(candles[0], DEFAULT_PERIOD))
+
+    var_value = None
+    if len(daily) > 1:
+        _, _, var_value, _ = analytics.monte_carlo(daily['close'], MC_SIMULATIONS, MC_CONFIDENCE)
+    return {"figi": figi, "var": var_value, "seconds": time.perf_counter() - start}
+
+
+def precompute_tickers(api_url: str, credentials: Credentials) -> list:
+    client  = ApiClient(api_url, credentials)
+    version = current_data_version(client)
+    tickers = loaders.available_tickers(client)
+    _store(DiskBackend(LOADER_CACHE_DIR), "load_available_tickers", version, (),
+           tickers, hard_ttl=TICKERS_TTL)
+    return tickers
+
+
+def run(api_url: str, users: list, workers: int) -> int:
+    """Прогрев всех пользователей, затем их бумаг. Возвращает число ошибок."""
+    failures    = 0
+    figis       = set()
+    credentials = None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(precompute_user, api_url, user): user for user in users}
+        for future in as_completed(futures):
+            user  = futures[future]
+            label = user.get("username") or user.get("user_id")
+            try:
+                report = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"✗ {label}: {e}", flush=True)
+                continue
+            figis.update(report["figis"])
+            credentials = credentials or report["credentials"]
+            print(f"✓ {label}: {len(report['figis'])} бумаг, {report['seconds']:.1f} с", flush=True)
+
+        if credentials is None:
+            return failures
+
+        futures = {pool.submit(precompute_market, api_url, credentials, figi): figi
+                   for figi in sorted(figis)}
+        futures[pool.submit(precompute_tickers, api_url, credentials)] = "tickers"
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"✗ {target}: {e}", flush=True)
+                continue
+            if target == "tickers":
+                print(f"✓ тикеры: {len(report)}", flush=True)
+            else:
+                var_text = "—" if report["var"] is None else f"{report['var']:,.2f}"
+                print(f"✓ {target}: VaR {var_text}, {report['seconds']:.1f} с", flush=True)
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", required=True,
+                        help='JSON: [{"username", "password"} | {"token", "user_id"}, ...]')
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8000"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    if not LOADER_CACHE_DIR:
+        parser.error("нужен LOADER_CACHE_DIR — тот же, что у приложения")
+    if not RESULT_CACHE_DIR:
+        print("RESULT_CACHE_DIR не задан — результаты оптимизации не сохранятся", file=sys.stderr)
+
+    with open(args.users, encoding="utf-8") as f:
+        users = json.load(f)
+
+    start    = time.perf_counter()
+    failures = run(args.api_url, users, args.workers)
+    print(f"Готово за {time.perf_counter() - start:.1f} с, ошибок: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
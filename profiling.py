@@ -0,0 +1,217 @@
+# profiling.py
+"""
+Профилирование прогонов страниц.
+
+Прогон страницы оборачивается в профилировщик: pyinstrument (сэмплирующий,
+если установлен) или cProfile из стандартной библиотеки. Для каждой
+страницы хранятся последние PROFILE_HISTORY профилей:
+  pyinstrument — HTML с интерактивным деревом вызовов и текстовый вид;
+  cProfile     — таблица PROFILE_TOP функций по собственному времени
+                 и сам профиль в формате pstats (.prof) для snakeviz.
+
+Дополнительно в профиль пишутся отметки (tag / traced) — загрузчики
+data/*, построители графиков components/charts.py, запросы к API:
+по ним страница мониторинга рисует водопад прогона. Пока прогон не
+профилируется, отметка стоит одну проверку contextvar.
+
+Профилировщики следят только за потоком, в котором запущены, —
+прогоны других сессий в профиль не попадают. cProfile при этом с
+Python 3.12 может быть включён только один на процесс: пока идёт один
+такой профиль, одновременные прогоны других сессий не профилируются
+(begin возвращает None) — ждать его страницы не должны.
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import marshal
+import pstats
+import threading
+import time
+from collections import deque
+
+import memory
+import telemetry
+from constants import PROFILE_BACKEND, PROFILE_HISTORY, PROFILE_INTERVAL, PROFILE_TOP
+
+try:
+    import pyinstrument
+except ImportError:     # необязательная зависимость
+    pyinstrument = None
+
+_active   = contextvars.ContextVar("profile", default=None)
+_cprofile = threading.Lock()    # занят, пока включён cProfile какого-то прогона
+
+
+class Profile:
+    """Один прогон страницы: время, отметки и результат профилировщика."""
+
+    def __init__(self, page: str, backend: str):
+        self.page       = page
+        self.backend    = backend
+        self.started_at = time.time()
+        self.start      = time.perf_counter()
+        self.duration   = None
+        self.complete   = False     # False — прогон оборвался (st.stop, ошибка)
+        self.tags       = []        # (вид, имя, начало от старта, длительность, глубина)
+        self.top        = []        # cProfile: строки таблицы функций
+        self.pstats     = None      # cProfile: файл .prof (snakeviz, gprof2dot)
+        self.html       = None      # pyinstrument: HTML
+        self.text       = None      # pyinstrument: текстовое дерево
+        self._depth     = 0
+        self._profiler  = None
+
+    def _begin(self):
+        if self.backend == "pyinstrument":
+            self._profiler = pyinstrument.Profiler(interval=PROFILE_INTERVAL, async_mode="disabled")
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _end(self, complete: bool):
+        self.duration = time.perf_counter() - self.start
+        self.complete = complete
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+            self.html = self._profiler.output_html()
+            self.text = self._profiler.output_text(unicode=True, color=False)
+        else:
+            try:
+                self._profiler.disable()
+            finally:
+                _cprofile.release()
+            self._profiler.create_stats()
+            self.top    = _top_functions(self._profiler)
+            self.pstats = marshal.dumps(self._profiler.stats)
+        self._profiler = None
+
+
+def _top_functions(profiler: cProfile.Profile) -> list:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows  = []
+    for (filename, line, func), (_, nc, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": func,
+            "location": f"{filename}:{line}",
+            "calls":    nc,
+            "tottime":  tottime,
+            "cumtime":  cumtime,
+        })
+    rows.sort(key=lambda row: row["tottime"], reverse=True)
+    return rows[:PROFILE_TOP]
+
+
+class ProfileStore:
+    """Последние профили по страницам (потокобезопасно)."""
+
+    def __init__(self, history: int = PROFILE_HISTORY):
+        self.history = history
+        self._lock   = threading.Lock()
+        self._pages  = {}
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._pages.setdefault(profile.page, deque(maxlen=self.history)).append(profile)
+
+    def pages(self) -> list:
+        with self._lock:
+            return sorted(self._pages)
+
+    def profiles(self, page: str) -> list:
+        """Новые первыми."""
+        with self._lock:
+            return list(reversed(self._pages.get(page, ())))
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def sizes(self) -> dict:
+        """Байты по страницам — для memory.usage()."""
+        with self._lock:
+            pages = {page: list(profiles) for page, profiles in self._pages.items()}
+        return {page: memory.deep_size(profiles) for page, profiles in pages.items()}
+
+
+PROFILES = ProfileStore()
+memory.register("profiles", PROFILES.sizes)
+
+
+def backend() -> str:
+    return "pyinstrument" if PROFILE_BACKEND == "pyinstrument" and pyinstrument else "cprofile"
+
+
+def begin(page: str) -> Profile | None:
+    """
+    Начать профиль прогона в текущем потоке. Парный end() — в finally.
+    None — cProfile уже занят другим прогоном, этот не профилируем.
+    """
+    profile = Profile(page, backend())
+    if profile.backend == "cprofile":
+        if not _cprofile.acquire(blocking=False):
+            telemetry.inc("profiles_skipped_total", page=page, reason="busy")
+            return None
+        try:
+            profile._begin()
+        except ValueError:
+            # Профилировщик включён в обход нас (отладчик, coverage)
+            _cprofile.release()
+            telemetry.inc("profiles_skipped_total", page=page, reason="busy")
+            return None
+    else:
+        profile._begin()
+    _active.set(profile)
+    return profile
+
+
+def end(profile: Profile | None, complete: bool = True):
+    """Завершить профиль и сохранить его. None — профилирование было выключено."""
+    if profile is None or profile.duration is not None:
+        return
+    if _active.get() is profile:
+        _active.set(None)
+    profile._end(complete)
+    PROFILES.add(profile)
+
+
+class tag:
+    """Отметка участка прогона: with tag("loader", name): ..."""
+    __slots__ = ("kind", "name", "profile", "start")
+
+    def __init__(self, kind: str, name: str):
+        self.kind    = kind
+        self.name    = name
+        self.profile = _active.get()
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.start = time.perf_counter()
+            self.profile._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        profile = self.profile
+        if profile is not None and profile.duration is None:
+            profile._depth -= 1
+            profile.tags.append((
+                self.kind, self.name,
+                self.start - profile.start, time.perf_counter() - self.start,
+                profile._depth,
+            ))
+        return False
+
+
+def traced(kind: str):
+    """Декоратор: каждый вызов функции — отметка вида kind."""
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active.get() is None:
+                return func(*args, **kwargs)
+            with tag(kind, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,231 @@
+# result_cache.py
+"""
+Кэш результатов расчётов оптимизации (граница, оптимизация, бэктест,
+корреляции).
+
+Ключ — (отпечаток состава портфеля, версия данных, эндпоинт, параметры
+в каноническом JSON). Результат зависит только от бумаг и их стоимости,
+поэтому пользователи с одинаковым составом получают общий результат, а
+возврат к уже посчитанным параметрам отдаётся мгновенно.
+
+В памяти — LRU на RESULT_CACHE_SIZE записей и не больше
+MEMORY_BUDGETS["results"] байт. Если задан RESULT_CACHE_DIR, результаты
+дублируются на диск (JSON, gzip) и переживают перезапуск; на диске держим
+не больше RESULT_CACHE_DISK_SIZE файлов. Без него вытесненные из памяти
+записи выгружаются в MEMORY_SPILL_DIR и при обращении читаются обратно.
+
+Пока версия данных неизвестна (бэкенд без эндпоинта версии, в ключе
+None), новые рыночные данные ключ не меняют — такие результаты живут по
+срокам от момента расчёта (на диске — mtime файла): после soft_ttl
+stale(key) сообщает, что пора пересчитать в фоне, после hard_ttl get
+их больше не отдаёт.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import memory
+import telemetry
+from constants import (
+    RESULT_CACHE_SIZE, RESULT_CACHE_DIR, RESULT_CACHE_DISK_SIZE, RESULT_SOFT_TTL, RESULT_HARD_TTL,
+    MEMORY_BUDGETS, MEMORY_SPILL_DIR, MEMORY_SPILL_FILES,
+)
+
+
+def canonical_json(payload) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def result_key(endpoint: str, payload: dict, holdings: str, data_version: str | None) -> tuple:
+    """Ключ результата: отпечаток состава портфеля, версия данных, эндпоинт, параметры."""
+    return holdings, data_version, endpoint, canonical_json(payload)
+
+
+def holdings_fingerprint(positions: list, user_id=None) -> str:
+    """Отпечаток состава: бумаги и их стоимость. Без позиций — только этот пользователь."""
+    if not positions:
+        return f"user:{user_id}"
+    holdings = sorted(
+        (p.get("ticker"), p.get("instrument_type"), round(float(p.get("value") or 0), 2))
+        for p in positions
+    )
+    return hashlib.sha1(canonical_json(holdings).encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, directory: str | None = None,
+                 max_files: int = RESULT_CACHE_DISK_SIZE, max_bytes: int | None = None,
+                 spill_dir: str | None = None, spill_files: int = MEMORY_SPILL_FILES,
+                 soft_ttl: int = RESULT_SOFT_TTL, hard_ttl: int | None = RESULT_HARD_TTL):
+        """spill_dir — куда выгружать вытесненное, если нет directory."""
+        self.max_entries = max_entries
+        self.soft_ttl    = soft_ttl
+        self.hard_ttl    = hard_ttl
+        self.directory   = directory
+        self.max_files   = max_files
+        self.max_bytes   = max_bytes
+        self.spill_dir   = None if directory else spill_dir
+        self.spill_files = spill_files
+        self._lock       = threading.Lock()
+        self._entries    = OrderedDict()
+        self._sizes      = {}
+        self._stored     = {}       # ключ → time.time() расчёта
+        self._bytes      = 0
+
+    @staticmethod
+    def _path(directory: str, key) -> str:
+        digest = hashlib.sha1(canonical_json(key).encode()).hexdigest()
+        return os.path.join(directory, f"{digest}.json.gz")
+
+    @staticmethod
+    def _versioned(key) -> bool:
+        return key[1] is not None
+
+    def _age(self, key, now: float) -> float:
+        return now - self._stored.get(key, now)
+
+    def _forget(self, key):
+        """Убрать из памяти (под self._lock)."""
+        self._entries.pop(key, None)
+        self._stored.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+
+    def _remember(self, key, value, stored_at: float) -> list:
+        """
+        Положить в LRU в памяти (под self._lock).
+        Возвращает вытесненные (ключ, значение, время расчёта) — их выгружает
+        вызывающий, без блокировки.
+        """
+        if key in self._entries:
+            self._bytes -= self._sizes.pop(key)
+        size = memory.deep_size(value)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._sizes[key]  = size
+        self._stored[key] = stored_at
+        self._bytes      += size
+
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            old_key, old_value = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+            evicted.append((old_key, old_value, self._stored.pop(old_key, None)))
+        return evicted
+
+    def _spill(self, evicted: list):
+        if not self.spill_dir:
+            return
+        for key, value, stored_at in evicted:
+            self._write(self.spill_dir, self.spill_files, key, value, stored_at)
+            telemetry.inc("memory_spill_total", namespace="results")
+
+    def _expired(self, key, age: float) -> bool:
+        return (not self._versioned(key) and self.hard_ttl is not None
+                and age >= self.hard_ttl)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                if not self._expired(key, self._age(key, now)):
+                    self._entries.move_to_end(key)
+                    telemetry.inc("result_cache_total", result="hit")
+                    return self._entries[key]
+                self._forget(key)
+
+        value = None
+        for directory in (self.directory, self.spill_dir):
+            if directory:
+                value, stored_at = self._read(directory, key)
+                if value is not None and self._expired(key, now - stored_at):
+                    value = None
+                if value is not None:
+                    break
+        if value is None:
+            telemetry.inc("result_cache_total", result="miss")
+            return None
+        with self._lock:
+            evicted = self._remember(key, value, stored_at)
+        self._spill(evicted)
+        telemetry.inc("result_cache_total", result="disk")
+        return value
+
+    def stale(self, key) -> bool:
+        """Результат без версии данных старше soft_ttl — пора пересчитать в фоне."""
+        if self._versioned(key):
+            return False
+        with self._lock:
+            if key not in self._stored:
+                return False
+            return self._age(key, time.time()) >= self.soft_ttl
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            evicted = self._remember(key, value, now)
+        self._spill(evicted)
+        if self.directory:
+            self._write(self.directory, self.max_files, key, value, now)
+
+    def _read(self, directory: str, key) -> tuple:
+        """(значение, время записи) или (None, None)."""
+        path = self._path(directory, key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f), os.path.getmtime(path)
+        except (OSError, ValueError):
+            return None, None
+
+    def _write(self, directory: str, max_files: int, key, value, stored_at: float | None):
+        """stored_at — время расчёта: mtime файла, от него считаются сроки."""
+        path = self._path(directory, key)
+        tmp  = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(value, f, default=str)
+            if stored_at is not None:
+                os.utime(tmp, (stored_at, stored_at))
+            os.replace(tmp, path)
+            self._prune(directory, max_files)
+        except (OSError, TypeError, ValueError):
+            telemetry.inc("result_cache_writes_total", result="error")
+
+    @staticmethod
+    def _prune(directory: str, max_files: int):
+        files = [
+            entry for entry in os.scandir(directory)
+            if entry.name.endswith(".json.gz")
+        ]
+        if len(files) <= max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - max_files]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def sizes(self) -> dict:
+        """Байты в памяти по эндпоинтам — для memory.usage()."""
+        with self._lock:
+            result = {}
+            for key, size in self._sizes.items():
+                result[key[2]] = result.get(key[2], 0) + size
+            return result
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+RESULT_CACHE = ResultCache(directory=RESULT_CACHE_DIR, max_bytes=MEMORY_BUDGETS["results"],
+                           spill_dir=MEMORY_SPILL_DIR)
+memory.register("results", RESULT_CACHE.sizes)
@@ -0,0 +1,75 @@
+# singleflight.py
+"""
+Склейка одинаковых одновременных запросов.
+
+Если несколько сессий одновременно просят одно и то же (эндпоинт,
+параметры, область видимости), запрос уходит один раз: первый вызов
+выполняет функцию, остальные ждут и получают тот же результат
+(или то же исключение).
+
+Делятся только обычные исключения (Exception). Если первый вызов прерван
+иначе — st.stop / st.rerun в его сессии, KeyboardInterrupt, — это касается
+только его: ожидавшие выполняют функцию сами (снова склеиваясь между собой).
+"""
+import threading
+
+import telemetry
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error', 'aborted', 'waiters')
+
+    def __init__(self):
+        self.done    = threading.Event()
+        self.value   = None
+        self.error   = None
+        self.aborted = False    # первый вызов прерван не-Exception — результата нет
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name   = name
+        self._lock  = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, label: str = "") -> tuple:
+        """
+        Выполняет fn() один раз на ключ среди одновременных вызовов.
+        Возвращает (значение, shared): shared=True — результат чужого вызова.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            telemetry.inc("singleflight_coalesced_total", group=self.name, endpoint=label)
+            call.done.wait()
+            if call.aborted:
+                return self.do(key, fn, label)
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        telemetry.inc("singleflight_executed_total", group=self.name, endpoint=label)
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.aborted = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,256 @@
+# telemetry.py
+"""
+Метрики дашборда: запросы к API, попадания в кэш загрузчиков, время
+отрисовки страниц. Без зависимостей от Streamlit — можно использовать
+из фоновых потоков и скриптов.
+
+Данные живут в памяти процесса (гистограммы + последние значения для
+перцентилей), выгружаются в текстовом формате Prometheus и, если задан
+TELEMETRY_DB, дублируются в локальный SQLite. Запись на диск — в фоновом
+потоке пачками: observe / inc только кладут значение в очередь.
+"""
+import atexit
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+
+# Границы бакетов: секунды и байты
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+# Сколько последних значений держать для p50/p95/p99
+RESERVOIR_SIZE = 2000
+
+# Запись в SQLite: не чаще раза в FLUSH_INTERVAL секунд, до BATCH_SIZE
+# строк за транзакцию; сверх QUEUE_SIZE ждущих записи значения теряются
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE     = 1000
+QUEUE_SIZE     = 100_000
+
+# Последний сегмент пути с цифрами — идентификатор (FIGI и т.п.)
+_ID_SEGMENT = re.compile(r'/(?=[A-Za-z0-9]*\d)[A-Za-z0-9]{8,}$')
+
+
+def endpoint_label(endpoint: str) -> str:
+    """'/api/market/candles/BBG004730N88' → '/api/market/candles/{id}'"""
+    return _ID_SEGMENT.sub('/{id}', endpoint)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts  = [0] * (len(buckets) + 1)
+        self.sum     = 0.0
+        self.count   = 0
+        self.samples = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum   += value
+        self.count += 1
+        self.samples.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return float('nan')
+        data = sorted(self.samples)
+        return data[min(int(q * len(data)), len(data) - 1)]
+
+
+class SqliteWriter(threading.Thread):
+    """
+    Фоновая запись значений в SQLite. put() не ждёт диска: строка уходит
+    в очередь, поток раз в FLUSH_INTERVAL пишет накопленное пачками
+    по BATCH_SIZE в одной транзакции.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(name="telemetry-sqlite", daemon=True)
+        self.dropped = 0
+        self._queue  = queue.Queue(maxsize=QUEUE_SIZE)
+        # Соединение открываем здесь — ошибка пути видна сразу; дальше
+        # им пользуется только поток записи
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            "ts REAL, kind TEXT, name TEXT, labels TEXT, value REAL)"
+        )
+        self.start()
+        # Остаток очереди — на диск и при выходе процесса
+        atexit.register(self.flush)
+
+    def put(self, row: tuple):
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Дождаться записи всего, что уже в очереди."""
+        self._queue.join()
+
+    def run(self):
+        while True:
+            rows = [self._queue.get()]
+            time.sleep(FLUSH_INTERVAL)
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for i in range(0, len(rows), BATCH_SIZE):
+                batch = rows[i:i + BATCH_SIZE]
+                try:
+                    with self._db:
+                        self._db.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?)", batch)
+                except sqlite3.Error:
+                    # Метрики не должны ронять приложение — пачку теряем
+                    self.dropped += len(batch)
+            for _ in rows:
+                self._queue.task_done()
+
+
+class Registry:
+    """Потокобезопасное хранилище гистограмм и счётчиков."""
+
+    def __init__(self, sqlite_path: str | None = None):
+        self._lock       = threading.Lock()
+        self._histograms = {}
+        self._counters   = defaultdict(float)
+        self._writer     = SqliteWriter(sqlite_path) if sqlite_path else None
+
+    def _persist(self, kind: str, name: str, key: tuple, value: float):
+        if self._writer is not None:
+            labels = ",".join(f"{k}={v}" for k, v in key)
+            self._writer.put((time.time(), kind, name, labels, value))
+
+    def flush(self):
+        """Дописать в SQLite всё накопленное (скрипты — перед выходом)."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def observe(self, name: str, value: float, buckets: tuple = TIME_BUCKETS, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            hist = self._histograms.get((name, key))
+            if hist is None:
+                hist = self._histograms[(name, key)] = Histogram(buckets)
+            hist.observe(value)
+        self._persist('histogram', name, key, value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[(name, key)] += amount
+        self._persist('counter', name, key, amount)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def summary(self, name: str) -> list[dict]:
+        """Строки для таблицы: метки + count / mean / p50 / p95 / p99."""
+        with self._lock:
+            items = [(key, h) for (n, key), h in self._histograms.items() if n == name]
+            rows = []
+            for key, hist in items:
+                rows.append({
+                    **dict(key),
+                    'count': hist.count,
+                    'mean':  hist.sum / hist.count if hist.count else float('nan'),
+                    'p50':   hist.quantile(0.50),
+                    'p95':   hist.quantile(0.95),
+                    'p99':   hist.quantile(0.99),
+                })
+        return rows
+
+    def counters(self, name: str) -> list[dict]:
+        with self._lock:
+            return [
+                {**dict(key), 'value': value}
+                for (n, key), value in self._counters.items() if n == name
+            ]
+
+    def render_prometheus(self) -> str:
+        """Все метрики в текстовом формате Prometheus (exposition format 0.0.4)."""
+        def fmt_labels(key, extra=()):
+            pairs = list(key) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            counter_names = sorted({n for n, _ in self._counters})
+            for name in counter_names:
+                lines.append(f"# TYPE {name} counter")
+                for (n, key), value in self._counters.items():
+                    if n == name:
+                        lines.append(f"{name}{fmt_labels(key)} {value:g}")
+
+            hist_names = sorted({n for n, _ in self._histograms})
+            for name in hist_names:
+                lines.append(f"# TYPE {name} histogram")
+                for (n, key), hist in self._histograms.items():
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{fmt_labels(key, [('le', f'{bound:g}')])} {cumulative}"
+                        )
+                    lines.append(f"{name}_bucket{fmt_labels(key, [('le', '+Inf')])} {hist.count}")
+                    lines.append(f"{name}_sum{fmt_labels(key)} {hist.sum:g}")
+                    lines.append(f"{name}_count{fmt_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+class Span:
+    """
+    Замер времени участка кода. Работает как контекстный менеджер
+    или вручную: span = Span(...); ...; span.finish().
+    """
+
+    def __init__(self, name: str, **labels):
+        self.name    = name
+        self.labels  = labels
+        self.start   = time.perf_counter()
+        self.elapsed = None
+
+    def finish(self) -> float:
+        if self.elapsed is None:
+            self.elapsed = time.perf_counter() - self.start
+            REGISTRY.observe(self.name, self.elapsed, **self.labels)
+        return self.elapsed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+        return False
+
+
+REGISTRY = Registry(os.getenv("TELEMETRY_DB"))
+
+observe           = REGISTRY.observe
+inc               = REGISTRY.inc
+render_prometheus = REGISTRY.render_prometheus
+
+
+def span(name: str, **labels) -> Span:
+    return Span(name, **labels)
@@ -0,0 +1,22 @@
+# tests/test_cache.py
+"""Arrow-вид кэша загрузчиков: dtype колонок после кэша те же, что до."""
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from core.cache import from_arrow, to_arrow
+
+
+def test_roundtrip_keeps_string_and_category_dtypes():
+    df = pd.DataFrame({
+        'nm':    ['Облигации', 'Акции', 'Фонды'],
+        'name':  pd.Series(['b', 'a', 'b'], dtype='category'),
+        'value': [3.0, 1.0, 2.0],
+    })
+    out = from_arrow(to_arrow(df))
+
+    assert out['nm'].dtype == df['nm'].dtype
+    assert isinstance(out['name'].dtype, pd.CategoricalDtype)
+    assert list(out.sort_values('nm')['nm']) == ['Акции', 'Облигации', 'Фонды']
+    pd.testing.assert_frame_equal(out, df)
@@ -0,0 +1,67 @@
+# tests/test_candles.py
+"""Окна свечей: пропуск торгов в начале окна не докачивается повторно."""
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from core.candles import CandleStore, backend_now
+
+
+class Backend:
+    """Часовые свечи до текущего часа; торгов не было в первые span / 2."""
+
+    def __init__(self, span: pd.Timedelta):
+        end        = backend_now().floor('h')
+        index      = pd.date_range(end - span * 3, end, freq='1h')
+        self.df    = pd.DataFrame({'close': 1.0}, index=index[index >= end - span / 2])
+        self.calls = []
+
+    def fetch(self, start, end):
+        self.calls.append((start, end))
+        mask = pd.Series(True, index=self.df.index)
+        if start is not None:
+            mask &= self.df.index >= start
+        if end is not None:
+            mask &= self.df.index < end
+        return self.df[mask]
+
+
+def test_gap_at_window_start_fetched_once():
+    span    = pd.Timedelta(days=2)
+    backend = Backend(span)
+    store   = CandleStore()
+
+    store.window(backend.fetch, "FIGI", span)
+    first = len(backend.calls)
+    store.window(backend.fetch, "FIGI", span)
+
+    # Повторный вызов — только хвост от последней свечи
+    assert backend.calls[first:] == [(backend.df.index.max(), None)]
+
+
+def test_window_start_in_backend_time():
+    span    = pd.Timedelta(days=2)
+    backend = Backend(span)
+    CandleStore().window(backend.fetch, "FIGI", span)
+
+    start, end = backend.calls[0]
+    assert end is None
+    assert abs(start - (backend_now() - span)) < pd.Timedelta(minutes=2)
+
+
+def test_data_version_change_drops_stale_history():
+    pytest.importorskip("streamlit")
+    from core import version
+    from data import market
+
+    span    = pd.Timedelta(days=2)
+    backend = Backend(span)
+    market._candle_store.clear()
+    market._candle_store.window(backend.fetch, "FIGI", span)
+
+    # Ночная загрузка пересчитала историю
+    backend.df['close'] = 2.0
+    version.note_version(f"{version.latest()}-reloaded")
+    df = market._candle_store.window(backend.fetch, "FIGI", span)
+
+    assert (df['close'] == 2.0).all()
@@ -0,0 +1,91 @@
+# tests/test_circuit.py
+"""Предохранитель: медленные ответы и вызовы с долгим таймаутом."""
+import datetime
+
+import pytest
+
+import circuit
+from constants import CIRCUIT_FAILURES
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    circuit._breakers.clear()
+    yield
+    circuit._breakers.clear()
+
+
+def test_slow_calls_open_breaker():
+    breaker = circuit.CircuitBreaker("/api/market", probe=lambda: True)
+    for _ in range(CIRCUIT_FAILURES):
+        breaker.record(True, 15.0)
+    assert breaker.state == circuit.OPEN
+
+
+def test_long_timeout_calls_exempt_from_slow_rule():
+    breaker = circuit.CircuitBreaker("/api/optimization", probe=lambda: True)
+    for _ in range(CIRCUIT_FAILURES + 2):
+        breaker.record(True, 15.0, check_slow=False)
+    assert breaker.state == circuit.CLOSED
+
+
+def test_failed_calls_still_open_breaker_with_long_timeout():
+    breaker = circuit.CircuitBreaker("/api/optimization", probe=lambda: True)
+    for _ in range(CIRCUIT_FAILURES):
+        breaker.record(False, 15.0, check_slow=False)
+    assert breaker.state == circuit.OPEN
+
+
+class _Raw:
+    def __init__(self, body: bytes | Exception):
+        self.body = body
+
+    def read(self, decode_content=True):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+def _client(monkeypatch, body=b'{"ok": true}'):
+    """ApiClient, у которого каждый запрос «идёт» 15 секунд и отвечает 200."""
+    requests = pytest.importorskip("requests")
+    pytest.importorskip("pandas")
+    from core import client as client_module
+
+    def fake_request(method, url, **kwargs):
+        response             = requests.Response()
+        response.status_code = 200
+        response.elapsed     = datetime.timedelta(seconds=15)
+        response.raw         = _Raw(body)
+        return response
+
+    ticks = iter([0.0])
+    monkeypatch.setattr(client_module.requests, "request", fake_request)
+    monkeypatch.setattr(client_module.time, "perf_counter", lambda: next(ticks, 15.0))
+    return client_module.ApiClient("http://backend", client_module.Credentials("t", 1))
+
+
+def test_optimization_call_of_15s_does_not_trip_breaker(monkeypatch):
+    client = _client(monkeypatch)
+    for _ in range(CIRCUIT_FAILURES + 2):
+        assert client.post_json("/api/optimization/backtest", {}, timeout=120) == {"ok": True}
+    assert circuit.states()["/api/optimization"] == circuit.CLOSED
+
+
+def test_regular_call_of_15s_trips_breaker(monkeypatch):
+    client = _client(monkeypatch)
+    for _ in range(CIRCUIT_FAILURES):
+        client.get_json("/api/market/tickers")
+    assert circuit.states()["/api/market"] == circuit.OPEN
+
+
+def test_body_dropped_midway_is_connection_error(monkeypatch):
+    urllib3 = pytest.importorskip("urllib3")
+    client  = _client(monkeypatch, body=urllib3.exceptions.ProtocolError("connection reset"))
+    import requests
+
+    for _ in range(CIRCUIT_FAILURES):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.post_json("/api/optimization/backtest", {}, timeout=120)
+    # Долгий вызов, медленность не в счёт — предохранитель открыли обрывы
+    assert circuit.states()["/api/optimization"] == circuit.OPEN
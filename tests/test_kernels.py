@@ -0,0 +1,77 @@
+# tests/test_kernels.py
+"""Ядра core/kernels.py: оба пути (Numba и NumPy) совпадают с pandas."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from core import kernels
+
+WINDOW = 20
+
+
+@pytest.fixture(params=["numpy", "numba"])
+def path(request, monkeypatch):
+    if request.param == "numba" and kernels.numba is None:
+        pytest.skip("numba не установлена")
+    monkeypatch.setattr(kernels, "USE_NUMBA", request.param == "numba")
+    return request.param
+
+
+@pytest.fixture
+def prices():
+    rng    = np.random.default_rng(42)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1_000)))
+    values[[5, 300, 301, 700]] = np.nan
+    return values
+
+
+def test_ema_matches_pandas(path, prices):
+    expected = (pd.Series(prices).ewm(span=WINDOW, min_periods=WINDOW, adjust=False)
+                .mean().to_numpy())
+    np.testing.assert_allclose(kernels.ema(prices, WINDOW), expected, rtol=1e-12)
+
+
+def test_rolling_mean_std_matches_pandas(path, prices):
+    mean, std = kernels.rolling_mean_std(prices, WINDOW)
+    rolling   = pd.Series(prices).rolling(WINDOW)
+    np.testing.assert_allclose(mean, rolling.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(std, rolling.std(ddof=0).to_numpy(), rtol=1e-7, atol=1e-9)
+
+
+def test_rolling_shorter_than_window(path):
+    mean, std = kernels.rolling_mean_std(np.arange(5.0), WINDOW)
+    assert np.isnan(mean).all() and np.isnan(std).all()
+
+
+def test_drawdown_matches_cummax(path, prices):
+    clean     = prices[~np.isnan(prices)]
+    dd, dur   = kernels.drawdown(clean)
+    peaks     = pd.Series(clean).cummax().to_numpy()
+    np.testing.assert_allclose(dd, (clean - peaks) / peaks * 100, rtol=1e-12)
+    assert (dur[clean >= peaks] == 0).all()
+    assert (dur >= 0).all()
+
+
+def _rebalance_reference(returns, weights, every):
+    """Прямой пересчёт по барам: ребалансировка к весам каждые every баров."""
+    weights = np.atleast_2d(weights)
+    value   = weights[0].copy()
+    equity  = []
+    k       = 0
+    for t, r in enumerate(returns):
+        if every and t and t % every == 0:
+            k     = min(k + 1, len(weights) - 1)
+            value = value.sum() * weights[k]
+        value = value * (1 + r)
+        equity.append(value.sum())
+    return np.array(equity)
+
+
+@pytest.mark.parametrize("every", [0, 1, 21])
+def test_rebalance_matches_reference(path, every):
+    rng     = np.random.default_rng(7)
+    returns = rng.normal(0.0005, 0.01, (250, 4))
+    weights = rng.dirichlet(np.ones(4), size=3)
+    np.testing.assert_allclose(kernels.rebalance(returns, weights, every),
+                               _rebalance_reference(returns, weights, every), rtol=1e-12)
@@ -0,0 +1,57 @@
+# tests/test_last_good.py
+"""Запись последних удачных ответов: очередь ограничена, повторы не пишутся."""
+import threading
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from constants import LAST_GOOD_PENDING
+from core import last_good, version
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Запись стоит, пока тест не отпустит; записанное — в списке."""
+    release = threading.Event()
+    written = []
+
+    def write(key, df):
+        release.wait(5)
+        written.append((key, df['v'].iloc[0]))
+        return True
+
+    monkeypatch.setattr(last_good, "_write", write)
+    monkeypatch.setattr(last_good, "_pending", {})
+    monkeypatch.setattr(last_good, "_saved", {})
+    yield release, written
+    release.set()
+
+
+def _wait_idle():
+    last_good._writer.submit(lambda: None).result(5)
+
+
+def test_pending_bounded_and_latest_per_key(writes):
+    release, written = writes
+    last_good.save("busy", pd.DataFrame({'v': [0]}))     # занимает поток записи
+    for i in range(LAST_GOOD_PENDING + 10):
+        last_good.save(f"k{i}", pd.DataFrame({'v': [i]}))
+    last_good.save("k0", pd.DataFrame({'v': [100]}))
+
+    assert len(last_good._pending) <= LAST_GOOD_PENDING
+    release.set()
+    _wait_idle()
+    assert ("k0", 100) in written
+    assert len(written) <= LAST_GOOD_PENDING + 1
+
+
+def test_same_version_not_rewritten(writes, monkeypatch):
+    release, written = writes
+    release.set()
+    monkeypatch.setattr(version, "_version", "v1")
+    for _ in range(3):
+        last_good.save("key", pd.DataFrame({'v': [1]}))
+        _wait_idle()
+    assert written == [("key", 1)]
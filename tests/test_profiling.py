@@ -0,0 +1,27 @@
+# tests/test_profiling.py
+"""cProfile — один на процесс: одновременный прогон не профилируется."""
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import profiling
+
+
+def test_concurrent_cprofile_runs_skip_instead_of_failing(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_BACKEND", "cprofile")
+    first = profiling.begin("A")
+    assert first is not None
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(profiling.begin("B")))
+    thread.start()
+    thread.join(5)
+    assert other == [None]
+
+    profiling.end(first)
+    again = profiling.begin("B")
+    assert again is not None
+    profiling.end(again, complete=False)
+    assert not again.complete and first.complete
@@ -0,0 +1,51 @@
+# tests/test_result_cache.py
+"""Результаты без версии данных живут по срокам, с версией — до её смены."""
+import os
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from result_cache import ResultCache, result_key
+
+
+def _key(data_version):
+    return result_key("/api/optimization/efficient_frontier", {"n_points": 40}, "h", data_version)
+
+
+def _age(cache: ResultCache, key, seconds: float):
+    cache._stored[key] -= seconds
+
+
+def test_unversioned_result_goes_stale_then_expires():
+    cache = ResultCache(soft_ttl=60, hard_ttl=3600)
+    key   = _key(None)
+    cache.put(key, {"ok": 1})
+    assert not cache.stale(key)
+
+    _age(cache, key, 120)
+    assert cache.stale(key)
+    assert cache.get(key) == {"ok": 1}
+
+    _age(cache, key, 3600)
+    assert cache.get(key) is None
+
+
+def test_versioned_result_has_no_ttl():
+    cache = ResultCache(soft_ttl=60, hard_ttl=3600)
+    key   = _key("v1")
+    cache.put(key, {"ok": 1})
+    _age(cache, key, 10 * 3600)
+    assert not cache.stale(key)
+    assert cache.get(key) == {"ok": 1}
+
+
+def test_expiry_survives_disk(tmp_path):
+    key = _key(None)
+    ResultCache(directory=str(tmp_path), soft_ttl=60, hard_ttl=3600).put(key, {"ok": 1})
+    path = ResultCache._path(str(tmp_path), key)
+    old  = time.time() - 7200
+    os.utime(path, (old, old))
+
+    assert ResultCache(directory=str(tmp_path), soft_ttl=60, hard_ttl=3600).get(key) is None
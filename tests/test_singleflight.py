@@ -0,0 +1,211 @@
+# tests/test_singleflight.py
+"""
+Склейка одновременных запросов: общий результат, ошибки, чужой 401 и
+db.api_get на заглушке бэкенда — один запрос на общий ключ, по одному
+на пользователя для пользовательских данных.
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def _wait_for_waiters(flight, key, n: int):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters >= n:
+                return
+        time.sleep(0.001)
+    raise AssertionError("ожидающие не подключились")
+
+
+def _concurrently(n: int, fn) -> list:
+    """fn(i) в n потоках, стартующих одновременно; результаты или исключения."""
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        try:
+            return fn(i)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(run, range(n)))
+
+
+def test_concurrent_calls_coalesce():
+    flight = SingleFlight("test")
+    calls  = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    results = _concurrently(20, lambda i: flight.do("key", fn))
+
+    assert len(calls) == 1
+    assert {value for value, _ in results} == {"value"}
+    assert sorted(shared for _, shared in results) == [False] + [True] * 19
+    assert flight.in_flight() == 0
+
+
+def test_exception_shared_with_waiters():
+    flight = SingleFlight("test")
+    calls  = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        raise ValueError("backend")
+
+    results = _concurrently(10, lambda i: flight.do("key", fn))
+
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    # После ошибки ключ свободен — следующий вызов выполняется заново
+    assert flight.do("key", lambda: "retry") == ("retry", False)
+
+
+def test_shared_401_retried_with_own_token(monkeypatch):
+    pytest.importorskip("streamlit")
+    pd = pytest.importorskip("pandas")
+    import db
+    from core.client import Credentials, Unauthorized
+
+    release = threading.Event()
+    tokens  = []
+
+    def fetch_frame(client, endpoint, params, key):
+        tokens.append(client.credentials.token)
+        release.wait(5)
+        if client.credentials.token == "expired":
+            raise Unauthorized(endpoint)
+        return pd.DataFrame({"close": [1.0]})
+
+    monkeypatch.setattr(db, "_fetch_frame", fetch_frame)
+    endpoint = "/api/market/tickers"
+    key      = (endpoint, (), "shared")
+    results  = {}
+
+    def session(name: str, token: str):
+        with db.use_credentials(Credentials(token, name)):
+            try:
+                results[name] = db.api_get(endpoint)
+            except Unauthorized as e:
+                results[name] = e
+
+    leader = threading.Thread(target=session, args=("leader", "expired"))
+    leader.start()
+    while not tokens:
+        time.sleep(0.001)
+    waiter = threading.Thread(target=session, args=("waiter", "valid"))
+    waiter.start()
+    _wait_for_waiters(db._inflight, key, 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    # 401 — только у сессии с истёкшим токеном; вторая повторила запрос сама
+    assert isinstance(results["leader"], Unauthorized)
+    assert list(results["waiter"]["close"]) == [1.0]
+    assert tokens == ["expired", "valid"]
+
+
+class _Stop(BaseException):
+    """Как StopException Streamlit: не Exception."""
+
+
+def test_aborted_leader_not_shared():
+    flight  = SingleFlight("test")
+    release = threading.Event()
+    calls   = []
+    results = {}
+
+    def fn():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            release.wait(5)
+            raise _Stop()
+        return "value"
+
+    def run(name: str):
+        try:
+            results[name] = flight.do("key", fn)
+        except BaseException as e:
+            results[name] = e
+
+    leader = threading.Thread(target=run, args=("leader",), name="leader")
+    leader.start()
+    while not calls:
+        time.sleep(0.001)
+    waiter = threading.Thread(target=run, args=("waiter",), name="waiter")
+    waiter.start()
+    _wait_for_waiters(flight, "key", 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    # st.stop лидера остался в его сессии, ожидавший загрузил сам
+    assert isinstance(results["leader"], _Stop)
+    assert results["waiter"] == ("value", False)
+    assert calls == ["leader", "waiter"]
+
+
+# (эндпоинт, параметры): разные параметры — разные ключи
+REQUESTS = [
+    ("/api/market/candles/BBG004730N88",       {}),
+    ("/api/market/candles/BBG004730N88",       {"interval": "1h"}),
+    ("/api/market/candles_close/BBG004730N88", {}),
+    ("/api/market/tickers",                    {}),
+    ("/api/portfolio/metrics",                 {}),
+    ("/api/assets/top_daily",                  {}),
+]
+
+
+def test_api_get_coalesces_by_scope(monkeypatch):
+    pytest.importorskip("streamlit")
+    pytest.importorskip("numpy")
+    pytest.importorskip("pandas")
+    import db
+    from benchmarks.stub_backend import StubConfig, hit_label, make_server
+    from core.client import login
+
+    sessions, n_users = 12, 3
+    server = make_server(config=StubConfig(latency=0.3))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}"
+    # db.get_api_url без st.secrets берёт API_URL из окружения
+    monkeypatch.setenv("API_URL", api_url)
+    monkeypatch.setattr(db.last_good, "save", lambda key, df: None)
+
+    try:
+        users  = [login(api_url, f"user{i}", "test") for i in range(n_users)]
+        calls  = [(users[i % n_users], request)
+                  for i in range(sessions) for request in REQUESTS]
+        before = Counter(server.state.hits)
+
+        def call(i):
+            credentials, (endpoint, params) = calls[i]
+            # Поток без st.session_state — учётные данные как у фоновых потоков
+            with db.use_credentials(credentials):
+                return db.api_get(endpoint, params)
+
+        results = _concurrently(len(calls), call)
+        hits    = Counter(server.state.hits) - before
+    finally:
+        server.shutdown()
+
+    assert not [r for r in results if isinstance(r, Exception)]
+    expected = Counter()
+    for endpoint, _ in REQUESTS:
+        shared = endpoint.startswith(db.SHARED_PREFIXES)
+        expected[hit_label("GET", endpoint)] += 1 if shared else n_users
+    assert hits == expected
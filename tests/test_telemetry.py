@@ -0,0 +1,46 @@
+# tests/test_telemetry.py
+"""Запись метрик в SQLite: фоновым потоком, пачками, без ожидания диска."""
+import sqlite3
+import threading
+
+import telemetry
+
+
+def test_samples_written_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry, "FLUSH_INTERVAL", 0.0)
+    path     = tmp_path / "telemetry.db"
+    registry = telemetry.Registry(str(path))
+
+    registry.observe("loader_seconds", 0.5, loader="candles")
+    for _ in range(3):
+        registry.inc("cache_hits_total", loader="candles")
+    registry.flush()
+
+    rows = sqlite3.connect(path).execute(
+        "SELECT kind, name, labels, value FROM samples ORDER BY kind").fetchall()
+    assert rows == [
+        ("counter",   "cache_hits_total", "loader=candles", 1.0),
+        ("counter",   "cache_hits_total", "loader=candles", 1.0),
+        ("counter",   "cache_hits_total", "loader=candles", 1.0),
+        ("histogram", "loader_seconds",   "loader=candles", 0.5),
+    ]
+
+
+def test_observe_does_not_wait_for_disk(tmp_path, monkeypatch):
+    path     = tmp_path / "telemetry.db"
+    registry = telemetry.Registry(str(path))
+    # Держим базу заблокированной: запись в ней стоит, а метрики — нет
+    blocker  = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+
+    done = threading.Event()
+
+    def record():
+        for _ in range(100):
+            registry.observe("page_render_seconds", 0.1, page="Главная")
+        done.set()
+
+    threading.Thread(target=record, daemon=True).start()
+    assert done.wait(1.0)
+    assert registry.summary("page_render_seconds")[0]["count"] == 100
+    blocker.execute("ROLLBACK")